@@ -0,0 +1,151 @@
+# Experiment/benchmark/fakes.py
+#
+# In-process stand-ins for S3 and Postgres so the real RawLoader,
+# IngestionOrchestrator and engines can be benchmarked offline.
+
+import io
+import json
+import hashlib
+import threading
+from datetime import datetime, timezone
+from src.repository.rule_store import RuleStore
+from src.repository.sample_repository import SampleRepository
+
+
+class FakeBody:
+    """Subset of botocore's StreamingBody used by RawLoader."""
+
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    def read(self, amt=None):
+        return self._stream.read(amt)
+
+    def iter_chunks(self, chunk_size=1024):
+        while True:
+            chunk = self._stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        self._stream.close()
+
+
+class FakePaginator:
+    def __init__(self, objects: dict):
+        self._objects = objects
+
+    def paginate(self, Bucket, Prefix="", PageSize=1000):
+        keys = sorted(key for (bucket, key) in self._objects if bucket == Bucket and key.startswith(Prefix))
+        for start in range(0, len(keys), PageSize):
+            yield {"Contents": [
+                {"Key": key, **self._objects.meta[(Bucket, key)]} for key in keys[start:start + PageSize]
+            ]}
+
+
+class _ObjectStore(dict):
+    """{(bucket, key): bytes} plus listing metadata in .meta."""
+
+    def __init__(self):
+        super().__init__()
+        self.meta = {}
+
+
+class FakeS3Client:
+    """Dict-backed S3: {(bucket, key): bytes}, with ranged / conditional GETs."""
+
+    def __init__(self):
+        self.objects = _ObjectStore()
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+        self.objects.meta[(Bucket, Key)] = {
+            "ETag": f'"{hashlib.md5(Body).hexdigest()}"',
+            "LastModified": datetime.now(timezone.utc),
+        }
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        from botocore.exceptions import ClientError
+
+        try:
+            data = self.objects[(Bucket, Key)]
+        except KeyError:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": Key}}, "GetObject")
+
+        etag = self.objects.meta[(Bucket, Key)]["ETag"]
+        if IfMatch is not None and IfMatch != etag:
+            raise ClientError({"Error": {"Code": "PreconditionFailed", "Message": Key}}, "GetObject")
+
+        if Range is None:
+            return {"Body": FakeBody(data), "ContentLength": len(data), "ETag": etag}
+
+        start, end = (int(bound) for bound in Range[len("bytes="):].split("-"))
+        if start >= len(data):
+            raise ClientError({"Error": {"Code": "InvalidRange", "Message": Range}}, "GetObject")
+
+        part = data[start:end + 1]
+        return {
+            "Body": FakeBody(part),
+            "ContentLength": len(part),
+            "ContentRange": f"bytes {start}-{start + len(part) - 1}/{len(data)}",
+            "ETag": etag,
+        }
+
+    def get_paginator(self, operation):
+        return FakePaginator(self.objects)
+
+
+class FakeSampleRepository:
+    """
+    In-memory structured_biomarker_samples with the same upsert semantics
+    as SampleRepository (content-hash guarded). Rows are JSON-serialized,
+    so serialization cost stays in the measurement.
+    """
+
+    def __init__(self, batch_size: int = 100):
+        self.batch_size = batch_size
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    def get_input_hashes(self, sample_ids: list) -> dict:
+        with self._lock:
+            return {
+                sample_id: self.rows[sample_id]["input_hash"]
+                for sample_id in sample_ids if sample_id in self.rows
+            }
+
+    def _upsert(self, sample: dict) -> str:
+        row = SampleRepository._row(sample)
+        stored = self.rows.get(sample["sample_id"])
+        if stored is not None and stored["content_hash"] == row[6] and stored["input_hash"] == row[7]:
+            return "unchanged"
+
+        self.rows[sample["sample_id"]] = {"payload": row[3], "content_hash": row[6], "input_hash": row[7]}
+        return "inserted" if stored is None else "updated"
+
+    def save_structured_sample(self, sample: dict):
+        with self._lock:
+            self._upsert(sample)
+        return True
+
+    def save_structured_samples(self, batch: list) -> dict:
+        report = {"inserted": [], "updated": [], "unchanged": []}
+        with self._lock:
+            for sample in batch:
+                report[self._upsert(sample)].append(sample["sample_id"])
+        return report
+
+
+def fake_rule_store(generator) -> RuleStore:
+    """RuleStore serving the generator's rule tables, no DB access."""
+    alias_rows, conversion_rows, weightage_rows, plausibility_rows = generator.rule_rows()
+    snapshot = RuleStore.build_snapshot(
+        alias_rows, conversion_rows, weightage_rows,
+        version="benchmark", plausibility_rows=plausibility_rows
+    )
+    return RuleStore({}, snapshot=snapshot)
+
+
+def stored_payload(repo: FakeSampleRepository, sample_id: str) -> dict:
+    return json.loads(repo.rows[sample_id]["payload"])
@@ -0,0 +1,148 @@
+# Experiment/benchmark/payloads.py
+#
+# Deterministic synthetic payloads seeded from the 40-marker panel in
+# exp_1, plus the matching rule tables (aliases, conversions, weightage,
+# plausibility) so the whole pipeline runs against realistic rules.
+
+import json
+import random
+from Experiment.exp_1 import SAMPLE_PAYLOAD
+
+
+# canonical marker -> (alternate unit, factor to the panel unit)
+ALTERNATE_UNITS = {
+    "LDL-C": ("mmol/L", 38.67),
+    "HDL Cholesterol": ("mmol/L", 38.67),
+    "Cholesterol Total": ("mmol/L", 38.67),
+    "Non-HDL Cholesterol": ("mmol/L", 38.67),
+    "Triglycerides": ("mmol/L", 88.57),
+    "Fasting Glucose": ("mmol/L", 18.0),
+    "Creatinine": ("umol/L", 0.0113),
+    "ApoB": ("g/L", 100.0),
+    "ApoA1": ("g/L", 100.0),
+    "Uric Acid": ("umol/L", 0.0168),
+    "Hemoglobin": ("g/L", 0.1),
+    "25-OH Vitamin D": ("nmol/L", 0.4),
+}
+
+DOMINANT = {
+    "Lipids": ["ApoB", "LDL-C", "Lp(a)"],
+    "Glycemic": ["HbA1c", "Fasting Glucose"],
+    "Inflammation": ["CRP High Sensitivity"],
+}
+
+# spelling variants seen in lab exports; all resolve through the alias map
+_ODD_UNIT_SPELLINGS = ["mg/dL", "MG/DL", " mg/dl ", "mg/dL "]
+
+
+def _alias_variants(name: str) -> list:
+    variants = [name, name.upper(), f"  {name} ", name.replace(" ", "_"), name.replace("-", " ")]
+    seen, unique = set(), []
+    for variant in variants:
+        key = variant.strip().lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(variant)
+    return unique
+
+
+class PayloadGenerator:
+    """
+    seed:        makes every run byte-identical
+    panel_size:  markers per sample; beyond the 40 real markers, synthetic
+                 "Marker-N" entries (with aliases and rules) are added
+    range_rate / alternate_unit_rate / unmapped_rate: mix of edge cases
+    """
+
+    def __init__(self, seed: int = 42, panel_size: int = 40, range_rate: float = 0.1,
+                 alternate_unit_rate: float = 0.3, unmapped_rate: float = 0.05):
+        self.rng = random.Random(seed)
+        self.range_rate = range_rate
+        self.alternate_unit_rate = alternate_unit_rate
+        self.unmapped_rate = unmapped_rate
+
+        self.panel = dict(SAMPLE_PAYLOAD["biomarkers"])
+        for n in range(max(panel_size - len(self.panel), 0)):
+            self.panel[f"Marker-{n}"] = round(self.rng.uniform(1, 500), 2)
+        self.panel = dict(list(self.panel.items())[:panel_size])
+
+        self.alternate_units = dict(ALTERNATE_UNITS)
+        for name in self.panel:
+            if name.startswith("Marker-") and self.rng.random() < 0.3:
+                self.alternate_units[name] = ("umol/L", round(self.rng.uniform(0.01, 10), 4))
+
+    # ----------------------------------------------------------------------
+    # Rule tables (rows shaped like the DB queries in RuleStore)
+    # ----------------------------------------------------------------------
+    def rule_rows(self):
+        alias_rows = [
+            {"alias_name": alias, "canonical_name": name}
+            for name in self.panel for alias in _alias_variants(name)
+        ]
+
+        conversion_rows = [
+            {"biomarker_name": name, "unit_from": unit, "unit_to": "mg/dL",
+             "factor": factor, "additive_offset": 0}
+            for name, (unit, factor) in self.alternate_units.items() if name in self.panel
+        ]
+
+        weightage_rows = []
+        for bucket, names in DOMINANT.items():
+            for name in names:
+                weightage_rows.append({"biomarker_name": name, "bucket_name": bucket, "role": "Dominant"})
+        for name in self.panel:
+            weightage_rows.append({"biomarker_name": name, "bucket_name": "Panel", "role": "Supporting"})
+
+        plausibility_rows = []
+        for name, typical in self.panel.items():
+            plausibility_rows.append({
+                "biomarker_name": name, "unit": "mg/dL", "sex": None, "age_min": None, "age_max": None,
+                "min_value": 0, "max_value": typical * 20
+            })
+            plausibility_rows.append({
+                "biomarker_name": name, "unit": "mg/dL", "sex": "male", "age_min": 18, "age_max": 65,
+                "min_value": 0, "max_value": typical * 10
+            })
+
+        return alias_rows, conversion_rows, weightage_rows, plausibility_rows
+
+    # ----------------------------------------------------------------------
+    # Samples
+    # ----------------------------------------------------------------------
+    def _biomarker(self, name: str, typical: float) -> dict:
+        rng = self.rng
+        value = round(typical * rng.uniform(0.6, 1.4), 3)
+        unit = rng.choice(_ODD_UNIT_SPELLINGS)
+
+        if name in self.alternate_units and rng.random() < self.alternate_unit_rate:
+            alt_unit, factor = self.alternate_units[name]
+            value = round(value / factor, 4)
+            unit = alt_unit.upper() if rng.random() < 0.2 else alt_unit
+
+        if rng.random() < self.range_rate:
+            return {"raw_value": {"min": value, "max": round(value * 1.1, 4)}, "raw_unit": unit,
+                    "is_range": True, "comment": "reported as range"}
+
+        return {"raw_value": value, "raw_unit": unit, "is_range": False, "comment": ""}
+
+    def sample(self, n: int) -> dict:
+        rng = self.rng
+        biomarkers = {}
+
+        for name, typical in self.panel.items():
+            alias = rng.choice(_alias_variants(name))
+            biomarkers[alias] = self._biomarker(name, typical)
+
+        if rng.random() < self.unmapped_rate:
+            biomarkers[f"Unlisted Marker {n}"] = self._biomarker("Unlisted", 1.0)
+
+        return {
+            "user_id": f"USR{n % 1000:05d}",
+            "sample_id": f"BENCH-{n:08d}",
+            "biomarkers": biomarkers,
+            "metadata": dict(SAMPLE_PAYLOAD["metadata"], age=rng.randint(20, 80),
+                             sex=rng.choice(["male", "female"])),
+        }
+
+    def sample_bytes(self, n: int) -> bytes:
+        return json.dumps(self.sample(n)).encode("utf-8")
@@ -0,0 +1,230 @@
+# Experiment/benchmark/run_benchmark.py
+#
+# Offline throughput benchmark of the full ingestion pipeline
+# (RawLoader -> SampleProcessor -> repository) on synthetic payloads,
+# with S3 and Postgres replaced by in-process stand-ins.
+#
+# Scenarios:
+#   single       orchestrator.run() per file, exact per-sample latency
+#   batch        orchestrator.run_batch() through the threaded pipeline
+#   large_panel  single-sample path with a 400-marker panel
+#   rerun        batch over already-ingested files (idempotent skip path)
+#
+# Reports samples/s, p50/p99 latency, per-stage latency (from the metrics
+# registry) and peak traced memory per stage, as JSON.
+#
+#   python -m Experiment.benchmark.run_benchmark --output bench.json
+
+import gc
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+
+from Experiment.benchmark.payloads import PayloadGenerator
+from Experiment.benchmark.fakes import FakeS3Client, FakeSampleRepository, fake_rule_store
+from src.ingestion.raw_loader import RawLoader
+from src.orchestration.ingestion_orchestrator import IngestionOrchestrator
+from src.utils.metrics import metrics
+
+
+BUCKET = "bench-bucket"
+PREFIX = "raw/"
+
+
+def _percentile(values: list, q: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def build_orchestrator(generator, samples: int, config_overrides=None):
+    s3 = FakeS3Client()
+    filenames = []
+    for n in range(samples):
+        filename = f"sample_{n:08d}.json"
+        s3.put_object(Bucket=BUCKET, Key=f"{PREFIX}{filename}", Body=generator.sample_bytes(n))
+        filenames.append(filename)
+
+    config = {
+        "REGION": "local",
+        "S3_INPUT_BUCKET": BUCKET,
+        "S3_INPUT_PREFIX": PREFIX,
+        "BATCH_FETCH_WORKERS": 4,
+        "BATCH_PROCESS_WORKERS": 2,
+        "BATCH_PERSIST_WORKERS": 1,
+        "DB_WRITE_BATCH_SIZE": 100,
+    }
+    config.update(config_overrides or {})
+
+    orchestrator = IngestionOrchestrator(
+        config,
+        loader=RawLoader(config, s3_client=s3),
+        rule_store=fake_rule_store(generator),
+        sample_repo=FakeSampleRepository(config["DB_WRITE_BATCH_SIZE"]),
+    )
+    return orchestrator, filenames
+
+
+# --------------------------------------------------------------------------
+# Per-stage peak memory: one sample stepped through the stages by hand
+# --------------------------------------------------------------------------
+def stage_memory(orchestrator, filename: str) -> dict:
+    processor = orchestrator.processor
+    peaks = {}
+
+    def traced(stage, func, *args):
+        gc.collect()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = func(*args)
+        peaks[stage] = round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1)
+        return result
+
+    tracemalloc.start()
+    try:
+        raw = traced("s3_fetch", orchestrator.loader.load_bytes, filename)
+        model, input_hash = traced("validate", processor.fingerprint, raw)
+        validated = traced("canonicalize", processor._canonicalize, model, input_hash, {})
+        normalized = traced("convert", orchestrator.unit_converter.normalize_all, validated["biomarkers"])
+        validated = traced("qc", processor._quality_check, validated, normalized)
+        traced("persist", orchestrator.sample_repo.save_structured_sample, validated)
+    finally:
+        tracemalloc.stop()
+
+    return peaks
+
+
+# --------------------------------------------------------------------------
+# Scenarios
+# --------------------------------------------------------------------------
+def _stage_report() -> dict:
+    return {
+        stage: {key: h[key] for key in ("count", "mean_ms", "p50_ms", "p99_ms", "max_ms")}
+        for stage, h in metrics.snapshot()["stages"].items()
+    }
+
+
+def run_single(generator, samples: int) -> dict:
+    orchestrator, filenames = build_orchestrator(generator, samples)
+    orchestrator.run(filenames[0])      # warm-up (schema, indexes)
+    metrics.reset()
+
+    latencies = []
+    started = time.perf_counter()
+    for filename in filenames[1:]:
+        t0 = time.perf_counter()
+        orchestrator.run(filename)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "samples": len(latencies),
+        "samples_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "stages": _stage_report(),
+        "stage_peak_memory_kib": stage_memory(orchestrator, filenames[0]),
+    }
+
+
+def run_batch(seed: int, samples: int, rerun: bool = False) -> dict:
+
+    def prepared():
+        orchestrator, filenames = build_orchestrator(PayloadGenerator(seed), samples)
+        if rerun:
+            orchestrator.run_batch(filenames)   # first pass stores everything
+        metrics.reset()
+        return orchestrator, filenames
+
+    # timing pass (untraced)
+    orchestrator, filenames = prepared()
+    started = time.perf_counter()
+    result = orchestrator.run_batch(filenames).to_dict()
+    elapsed = time.perf_counter() - started
+    stages = _stage_report()
+
+    # memory pass on an identical, freshly built run
+    orchestrator, filenames = prepared()
+    gc.collect()
+    tracemalloc.start()
+    orchestrator.run_batch(filenames)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    per_sample = stages.get("pipeline_process") or {}
+
+    return {
+        "samples": samples,
+        "succeeded": result["succeeded"],
+        "skipped": result["skipped"],
+        "failed": result["failed"],
+        "samples_per_sec": round(samples / elapsed, 1),
+        "p50_ms": per_sample.get("p50_ms"),
+        "p99_ms": per_sample.get("p99_ms"),
+        "peak_memory_kib": round(peak / 1024, 1),
+        "stages": stages,
+        "note": "batch latencies are bucketed histogram estimates of the process stage",
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline ingestion pipeline benchmark")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--large-panel-size", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", default="single,batch,large_panel,rerun")
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)   # measure the pipeline, not log I/O
+
+    scenarios = {
+        "single": lambda: run_single(PayloadGenerator(args.seed), args.samples),
+        "batch": lambda: run_batch(args.seed, args.samples),
+        "large_panel": lambda: run_single(PayloadGenerator(args.seed, panel_size=args.large_panel_size),
+                                          max(args.samples // 5, 2)),
+        "rerun": lambda: run_batch(args.seed, args.samples, rerun=True),
+    }
+
+    results = {
+        "benchmark": "ingestion_pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": vars(args),
+        "scenarios": {},
+    }
+
+    for name in args.scenarios.split(","):
+        name = name.strip()
+        if name not in scenarios:
+            parser.error(f"unknown scenario: {name}")
+        results["scenarios"][name] = scenarios[name]()
+        print(f"{name:<12} {results['scenarios'][name]['samples_per_sec']:>10,.1f} samples/s", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
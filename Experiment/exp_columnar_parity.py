@@ -0,0 +1,75 @@
+# Experiment/exp_columnar_parity.py
+#
+# Parity check: ColumnarUnitConversionEngine.normalize_batch must produce
+# exactly the same output as UnitConversionEngine.normalize_all applied
+# sample by sample (same floats, same units, same shape).
+#
+#   python -m Experiment.exp_columnar_parity
+
+import random
+from src.repository.rule_store import RuleStore
+from src.canonicalizer.unit_conversion import UnitConversionEngine
+from src.canonicalizer.columnar_conversion import ColumnarUnitConversionEngine
+from src.schemas.biomarker_record import BiomarkerRecord
+
+
+CONVERSION_ROWS = [
+    {"biomarker_name": "LDL-C", "unit_from": "mmol/L", "unit_to": "mg/dL", "factor": 38.67, "additive_offset": 0},
+    {"biomarker_name": "HDL-C", "unit_from": "mmol/L", "unit_to": "mg/dL", "factor": 38.67, "additive_offset": 0},
+    {"biomarker_name": "Triglycerides", "unit_from": "mmol/L", "unit_to": "mg/dL", "factor": 88.57, "additive_offset": 0},
+    {"biomarker_name": "Fasting Glucose", "unit_from": "mmol/L", "unit_to": "mg/dL", "factor": 18.0, "additive_offset": 0},
+    {"biomarker_name": "HbA1c", "unit_from": "mmol/mol", "unit_to": "%", "factor": 0.0915, "additive_offset": 2.15},
+    {"biomarker_name": "Creatinine", "unit_from": "umol/L", "unit_to": "mg/dL", "factor": 0.0113, "additive_offset": 0},
+    {"biomarker_name": "ApoB", "unit_from": "g/L", "unit_to": "mg/dL", "factor": 100.0, "additive_offset": 0},
+]
+
+UNITS = {
+    "LDL-C": ["mmol/L", "mg/dL"],
+    "HDL-C": ["mmol/L", "mg/dL"],
+    "Triglycerides": ["MMOL/L ", "mg/dL"],
+    "Fasting Glucose": ["mmol/L", "mg/dL"],
+    "HbA1c": ["mmol/mol", "%"],
+    "Creatinine": ["umol/L", "mg/dL"],
+    "ApoB": ["g/L", "mg/dL"],
+    "Ferritin": ["ng/mL"],
+}
+
+
+def random_biomarker(rng, name):
+    unit = rng.choice(UNITS[name])
+    if rng.random() < 0.25:
+        low = round(rng.uniform(0.1, 50), 3)
+        value = {"min": low, "max": low + rng.randint(1, 20)}
+        return BiomarkerRecord(name, value, unit, True)
+
+    value = rng.randint(1, 300) if rng.random() < 0.3 else round(rng.uniform(0.01, 300), 4)
+    return BiomarkerRecord(name, value, unit, False)
+
+
+def exp(samples=2000, seed=7):
+    snapshot = RuleStore.build_snapshot([], CONVERSION_ROWS, [])
+    rule_store = RuleStore({}, snapshot=snapshot)
+
+    scalar = UnitConversionEngine({}, rule_store)
+    columnar = ColumnarUnitConversionEngine({}, rule_store)
+
+    def random_batch(rng):
+        return [
+            [random_biomarker(rng, name) for name in rng.sample(sorted(UNITS), rng.randint(1, len(UNITS)))]
+            for _ in range(samples)
+        ]
+
+    # records are normalized in place: each engine gets its own identical batch
+    batch = random_batch(random.Random(seed))
+    expected = [[b.to_dict() for b in scalar.normalize_all(sample)] for sample in batch]
+    actual = [[b.to_dict() for b in sample] for sample in columnar.normalize_batch(random_batch(random.Random(seed)))]
+
+    mismatches = [i for i, (e, a) in enumerate(zip(expected, actual)) if e != a]
+    assert len(expected) == len(actual)
+    assert not mismatches, f"{len(mismatches)} samples differ, first at index {mismatches[0]}"
+
+    print(f"parity OK: {samples} samples, {sum(len(s) for s in batch)} biomarkers")
+
+
+if __name__ == '__main__':
+    exp()
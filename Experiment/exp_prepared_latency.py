@@ -0,0 +1,131 @@
+# Experiment/exp_prepared_latency.py
+#
+# Per-query latency of the hot statements under concurrent load, plain SQL
+# vs PREPAREd once per pooled connection (DB_PREPARED_STATEMENTS):
+#
+#   rules_version   RuleStore.RULES_VERSION_STATEMENT (every refresh poll)
+#   input_hashes    SampleRepository.INPUT_HASH_STATEMENT (idempotency check)
+#   upsert          SampleRepository.UPSERT_STATEMENT (single-sample write)
+#
+# Needs a real Postgres with the CIS schema. Every iteration runs in a
+# transaction that is rolled back, so nothing is written. Envelopes are
+# real SampleProcessor output on the benchmark panel.
+#
+#   python -m Experiment.exp_prepared_latency --threads 8 --iterations 500
+#   python -m Experiment.exp_prepared_latency --config db.json   # RDS_* keys
+
+import json
+import time
+import logging
+import argparse
+import threading
+from Experiment.benchmark.payloads import PayloadGenerator
+from Experiment.benchmark.fakes import fake_rule_store
+from src.canonicalizer.name_mapper import NameMapper
+from src.canonicalizer.unit_conversion import UnitConversionEngine
+from src.qc.quality_check import QCEngine
+from src.orchestration.sample_processor import SampleProcessor
+from src.repository.rule_store import RuleStore
+from src.repository.sample_repository import SampleRepository
+from src.utils.db_pool import ConnectionPool
+from src.utils.prepared_statements import execute_prepared
+
+
+def _percentile(values: list, q: float):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def envelopes(count: int) -> list:
+    generator = PayloadGenerator(42)
+    rule_store = fake_rule_store(generator)
+    processor = SampleProcessor(
+        NameMapper({}, rule_store),
+        UnitConversionEngine({}, rule_store),
+        QCEngine({}, rule_store),
+        rule_store=rule_store
+    )
+    return [processor.process(generator.sample_bytes(n)) for n in range(count)]
+
+
+def run(config: dict, prepared: bool, threads: int, iterations: int, rows: list) -> dict:
+    pool = ConnectionPool({
+        **config,
+        "DB_PREPARED_STATEMENTS": prepared,
+        "DB_POOL_MIN_SIZE": threads,
+        "DB_POOL_MAX_SIZE": threads,
+    })
+    timings = {"rules_version": [], "input_hashes": [], "upsert": []}
+    lock = threading.Lock()
+
+    def timed(cur, statement, vars=None):
+        started = time.perf_counter()
+        execute_prepared(cur, statement, vars)
+        if cur.description is not None:
+            cur.fetchall()
+        return (time.perf_counter() - started) * 1000
+
+    def worker(offset: int):
+        local = {name: [] for name in timings}
+        for n in range(iterations):
+            row = rows[(offset + n) % len(rows)]
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    local["rules_version"].append(timed(cur, RuleStore.RULES_VERSION_STATEMENT))
+                    local["input_hashes"].append(timed(cur, SampleRepository.INPUT_HASH_STATEMENT, ([row[0]],)))
+                    local["upsert"].append(timed(cur, SampleRepository.UPSERT_STATEMENT, row))
+                conn.rollback()     # leave nothing behind
+
+        with lock:
+            for name, values in local.items():
+                timings[name].extend(values)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n * iterations,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    pool.close()
+
+    return {
+        "mode": "prepared" if prepared else "plain",
+        "queries_per_s": round(sum(len(v) for v in timings.values()) / elapsed, 1),
+        "latency_ms": {
+            name: {
+                "p50": round(_percentile(values, 0.50), 3),
+                "p95": round(_percentile(values, 0.95), 3),
+                "p99": round(_percentile(values, 0.99), 3),
+            }
+            for name, values in timings.items()
+        },
+    }
+
+
+def exp(argv=None):
+    parser = argparse.ArgumentParser(description="Hot statement latency, plain vs prepared.")
+    parser.add_argument("--config", help="JSON file with RDS_* keys (default: ingestion config)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=500, help="per thread")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as fh:
+            config = json.load(fh)
+    else:
+        from src.config.config_loader import get_ingestion_config
+        config = get_ingestion_config()
+
+    rows = [SampleRepository._row(envelope) for envelope in envelopes(200)]
+    # sample ids that cannot collide with real ones
+    rows = [(f"BENCH-PREPARED-{row[0]}",) + row[1:] for row in rows]
+
+    for prepared in (False, True):
+        print(json.dumps(run(config, prepared, args.threads, args.iterations, rows)))
+
+
+if __name__ == '__main__':
+    exp()
@@ -0,0 +1,106 @@
+# Experiment/exp_record_memory.py
+#
+# Memory per processed sample, BiomarkerRecord envelopes vs the per-marker
+# dict envelopes the pipeline used to carry (one dict per step:
+# canonical dict -> normalized dict -> + qc_check), on the benchmark panel.
+#
+#   before: every biomarker as the dict chain (rebuilt from the records)
+#   after:  SampleProcessor output as-is (one __slots__ record per biomarker)
+#
+# Reports retained and peak traced bytes per sample and gen-0 GC runs.
+#
+#   python -m Experiment.exp_record_memory
+
+import gc
+import time
+import logging
+import tracemalloc
+from Experiment.benchmark.payloads import PayloadGenerator
+from Experiment.benchmark.fakes import fake_rule_store
+from src.canonicalizer.name_mapper import NameMapper
+from src.canonicalizer.unit_conversion import UnitConversionEngine
+from src.canonicalizer.columnar_conversion import ColumnarUnitConversionEngine
+from src.qc.quality_check import QCEngine
+from src.orchestration.sample_processor import SampleProcessor
+
+
+def as_dict_chain(envelope: dict) -> dict:
+    """The same envelope with biomarkers as the old per-step dicts."""
+    biomarkers = []
+    for record in envelope["biomarkers"]:
+        canonical = {                                   # _canonicalize
+            "raw_value": record.raw_value,
+            "raw_unit": record.raw_unit,
+            "is_range": record.is_range,
+            "comment": record.comment,
+            "canonical_name": record.canonical_name,
+        }
+        normalized = {                                  # normalize_value
+            "canonical_name": canonical["canonical_name"],
+            "normalized_value": record.normalized_value,
+            "normalized_unit": record.normalized_unit,
+            "is_range": canonical["is_range"],
+            "comment": canonical["comment"],
+        }
+        normalized["qc_check"] = record.qc_check         # run_qc
+        biomarkers.append(normalized)
+
+    return {**envelope, "biomarkers": biomarkers}
+
+
+def measure(label, func, samples: int):
+    gc.collect()
+    gen0_runs = [0]
+
+    def count(phase, info):
+        if phase == "start" and info["generation"] == 0:
+            gen0_runs[0] += 1
+
+    gc.callbacks.append(count)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(count)
+
+    print(f"{label:<10} retained {(current - baseline) / samples:>9,.0f} B/sample   "
+          f"peak {(peak - baseline) / samples:>9,.0f} B/sample   "
+          f"gen0 GC runs {gen0_runs[0]:>5}   ({elapsed:.2f}s traced)")
+    return result
+
+
+def exp(samples=5000, batch_size=500):
+    logging.disable(logging.CRITICAL)
+
+    generator = PayloadGenerator(42)
+    rule_store = fake_rule_store(generator)
+    processor = SampleProcessor(
+        NameMapper({}, rule_store),
+        UnitConversionEngine({}, rule_store),
+        QCEngine({}, rule_store),
+        ColumnarUnitConversionEngine({}, rule_store),
+        rule_store=rule_store
+    )
+
+    payloads = [generator.sample_bytes(n) for n in range(samples)]
+    processor.process_batch(payloads[:50])      # warm-up (indexes, caches)
+
+    def process():
+        return [
+            envelope
+            for start in range(0, samples, batch_size)
+            for envelope in processor.process_batch(payloads[start:start + batch_size])
+        ]
+
+    print(f"{samples} samples, {len(generator.panel)}-marker panel, batches of {batch_size}")
+    measure("before", lambda: [as_dict_chain(envelope) for envelope in process()], samples)
+    measure("after", process, samples)
+
+
+if __name__ == '__main__':
+    exp()
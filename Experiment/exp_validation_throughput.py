@@ -0,0 +1,81 @@
+# Experiment/exp_validation_throughput.py
+#
+# Validation + canonicalization throughput on the 40-marker panel from
+# exp_1, comparing:
+#   before: bytes.decode -> json.loads -> RawInputSchema(**) -> .dict() -> mutate copies
+#   after:  RawInputSchema.model_validate_json(bytes) -> build canonical dicts from the model
+#   batch:  cached TypeAdapter(List[RawInputSchema]).validate_json(array bytes)
+#
+#   python -m Experiment.exp_validation_throughput
+
+import json
+import time
+import logging
+from Experiment.exp_1 import SAMPLE_PAYLOAD
+from src.repository.rule_store import RuleStore
+from src.schemas.raw_input_schema import RawInputSchema, validate_raw_batch
+from src.orchestration.sample_processor import SampleProcessor
+
+
+def panel_payload() -> dict:
+    payload = dict(SAMPLE_PAYLOAD)
+    payload["biomarkers"] = {
+        name: {"raw_value": value, "raw_unit": "mg/dL", "is_range": False, "comment": ""}
+        for name, value in SAMPLE_PAYLOAD["biomarkers"].items()
+    }
+    return payload
+
+
+def before(raw_bytes: bytes, rule_store: RuleStore) -> list:
+    raw_data = json.loads(raw_bytes.decode("utf-8"))
+    validated = RawInputSchema(**raw_data).model_dump()     # what the deprecated .dict() does
+
+    biomarkers = validated["biomarkers"]
+    canonical_names = rule_store.map_names(list(biomarkers))
+
+    canonical_biomarkers = []
+    for raw_name, value in biomarkers.items():
+        if canonical_names[raw_name] is None:
+            continue
+        value["canonical_name"] = canonical_names[raw_name]
+        canonical_biomarkers.append(value)
+    return canonical_biomarkers
+
+
+def measure(label, func, iterations, samples_per_call=1):
+    func()   # warm-up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    rate = iterations * samples_per_call / elapsed
+    print(f"{label:<34} {rate:>10,.0f} samples/s  ({elapsed / iterations / samples_per_call * 1e6:,.1f} us/sample)")
+    return rate
+
+
+def exp(iterations=5000, batch_size=100):
+    logging.disable(logging.CRITICAL)
+
+    payload = panel_payload()
+    raw_bytes = json.dumps(payload).encode("utf-8")
+    array_bytes = json.dumps([payload] * batch_size).encode("utf-8")
+
+    aliases = [{"alias_name": name, "canonical_name": name} for name in payload["biomarkers"]]
+    rule_store = RuleStore({}, snapshot=RuleStore.build_snapshot(aliases, [], []))
+
+    # RuleStore.map_names has the NameMapper signature, minus per-marker logging
+    processor = SampleProcessor(rule_store, None, None)
+
+    print(f"40-marker panel, {len(raw_bytes)} bytes per sample")
+    base = measure("before (.dict() round trip)", lambda: before(raw_bytes, rule_store), iterations)
+    fast = measure("after (validate bytes directly)",
+                   lambda: processor._canonicalize(RawInputSchema.model_validate_json(raw_bytes)), iterations)
+    batch = measure(f"after, batch of {batch_size} (TypeAdapter)",
+                    lambda: [processor._canonicalize(m) for m in validate_raw_batch(array_bytes)],
+                    max(iterations // batch_size, 1), batch_size)
+
+    print(f"speed-up: single {fast / base:.2f}x, batch {batch / base:.2f}x")
+
+
+if __name__ == '__main__':
+    exp()
@@ -1,21 +1,154 @@
 # main.py
 
+import time
+
+_IMPORT_STARTED_AT = time.perf_counter()
+
+import threading
+from urllib.parse import unquote_plus
 from src.config.config_loader import get_ingestion_config
-from src.logger.logging_config import logger
-from src.utils.unit_utils import db_connection
-from src.orchestration.ingestion_orchestrator import IngestionOrchestrator
+from src.logger.logging_config import logger, flush_logs
+
+# Heavy modules (boto3, psycopg2, numpy, the orchestrator graph) are imported
+# on first use, so the Lambda import phase stays minimal.
+_IMPORT_MS = (time.perf_counter() - _IMPORT_STARTED_AT) * 1000
+
+# Warm-container state, reused across invocations
+_orchestrator = None
+_orchestrator_config = None
+_orchestrator_lock = threading.Lock()
+_invocations = 0
+
+
+def get_orchestrator(config: dict):
+    """
+    Lazily build the IngestionOrchestrator once per container and reuse it
+    (S3 client, DB pool, rule snapshot) across warm invocations.
+    Rebuilt only when the cached config itself changes (e.g. secret rotation).
+    """
+    global _orchestrator, _orchestrator_config
+
+    with _orchestrator_lock:
+        if _orchestrator is not None and config == _orchestrator_config:
+            return _orchestrator
+
+        from src.orchestration.ingestion_orchestrator import IngestionOrchestrator
+        from src.utils.db_pool import close_all_pools
+
+        if _orchestrator is not None:
+            logger.info("ingestion config changed, rebuilding orchestrator")
+            _orchestrator.close()
+            close_all_pools()
+
+        _orchestrator = IngestionOrchestrator(config)
+        _orchestrator_config = config
+        return _orchestrator
+
+
+def _filenames_from_event(event: dict, prefix: str) -> list:
+    """
+    Accepts:
+        {"filename": "user_12345.json"}
+        {"filenames": ["a.json", "b.json"]}
+        S3 put notifications ({"Records": [{"s3": {"object": {"key": ...}}}]})
+    ({"incremental": true} is handled by run_incremental instead)
+    """
+    if event.get("filename"):
+        return [event["filename"]]
+
+    if event.get("filenames"):
+        return list(event["filenames"])
+
+    filenames = []
+    for record in event.get("Records", []):
+        key = unquote_plus(record["s3"]["object"]["key"])
+        filenames.append(key[len(prefix):] if key.startswith(prefix) else key)
+    return filenames
+
+
+def lambda_handler(event, context=None):
+    """
+    AWS Lambda entry point (handler: main.lambda_handler).
+    Reports cold/warm start and per-phase timings with every response.
+    """
+    try:
+        return _handle(event)
+    finally:
+        # log I/O runs on a background thread: drain it before the
+        # container may be frozen
+        flush_logs()
+
+
+def _handle(event):
+    global _invocations
+
+    started = time.perf_counter()
+    cold_start = _invocations == 0
+    _invocations += 1
+
+    config = get_ingestion_config()
+    config_ms = (time.perf_counter() - started) * 1000
+
+    init_started = time.perf_counter()
+    orchestrator = get_orchestrator(config)
+    # warm containers pick up rule changes without a redeploy
+    rules_reloaded = not cold_start and orchestrator.refresh_rules_if_due()
+    init_ms = (time.perf_counter() - init_started) * 1000
+
+    filenames = _filenames_from_event(event or {}, config["S3_INPUT_PREFIX"])
+
+    run_started = time.perf_counter()
+    if event and event.get("incremental"):
+        # scheduled run: only new / changed objects under the prefix
+        result = orchestrator.run_incremental().to_dict()
+    elif len(filenames) == 1:
+        validated = orchestrator.run(filenames[0])
+        if validated is None:
+            # already ingested with the same input and rules
+            result = {"succeeded": 0, "skipped": 1, "failed": 0}
+        else:
+            result = {
+                "succeeded": 1,
+                "skipped": 0,
+                "failed": 0,
+                "sample_id": validated["sample_id"],
+                "qc_overall_status": validated["qc_summary"]["overall_status"],
+            }
+    else:
+        result = orchestrator.run_batch(filenames).to_dict()
+    run_ms = (time.perf_counter() - run_started) * 1000
+
+    timings = {
+        "cold_start": cold_start,
+        "rules_reloaded": rules_reloaded,
+        "import_ms": round(_IMPORT_MS, 2) if cold_start else 0.0,
+        "config_ms": round(config_ms, 2),
+        "orchestrator_init_ms": round(init_ms, 2),
+        "run_ms": round(run_ms, 2),
+        "total_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+    logger.info("lambda invocation complete", files=len(filenames), **timings)
+
+    return {"status": "ok", "result": result, "timings": timings}
 
 
 def run_ingestion(filename: str):
+    from src.orchestration.ingestion_orchestrator import IngestionOrchestrator
+    from src.utils.db_pool import close_all_pools
+
     logger.info("starting ingestion pipeline", filename=filename)
 
     # 1. Load config
     config = get_ingestion_config()
-    config["DB_CONN"] = db_connection(config)
 
-    # 2. Run validation
+    # 2. Run validation (all components borrow from one shared DB pool)
     orchestrator = IngestionOrchestrator(config)
-    validated_payload = orchestrator.run(filename)
+    try:
+        validated_payload = orchestrator.run(filename)
+    finally:
+        orchestrator.close()
+        close_all_pools()
 
     logger.info("ingestion step complete", validated=validated_payload)
 
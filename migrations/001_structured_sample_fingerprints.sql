@@ -0,0 +1,9 @@
+-- migrations/001_structured_sample_fingerprints.sql
+--
+-- Idempotency columns written by SampleRepository (see docs/payload_contract.md).
+-- Required before deploying the idempotent ingestion path; safe to re-run.
+
+ALTER TABLE structured_biomarker_samples
+    ADD COLUMN IF NOT EXISTS content_hash  TEXT,   -- sha256 of the canonical envelope, trace_id / input_hash excluded
+    ADD COLUMN IF NOT EXISTS input_hash    TEXT,   -- sha256 of the raw input + rules version
+    ADD COLUMN IF NOT EXISTS rules_version TEXT;   -- RuleStore snapshot version used for normalization
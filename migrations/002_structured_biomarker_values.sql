@@ -0,0 +1,23 @@
+-- migrations/002_structured_biomarker_values.sql
+--
+-- Typed per-biomarker rows written by BiomarkerValueSink when
+-- BIOMARKER_VALUES_ENABLED is set (see docs/payload_contract.md).
+-- Requires 001; safe to re-run.
+
+CREATE TABLE IF NOT EXISTS structured_biomarker_values (
+    sample_id      TEXT     NOT NULL
+                   REFERENCES structured_biomarker_samples (sample_id) ON DELETE CASCADE,
+    user_id        TEXT     NOT NULL,
+    position       SMALLINT NOT NULL,   -- index in the envelope's biomarkers list
+    canonical_name TEXT     NOT NULL,
+    value          DOUBLE PRECISION,    -- single values
+    value_min      DOUBLE PRECISION,    -- ranges
+    value_max      DOUBLE PRECISION,
+    unit           TEXT,
+    qc_check       TEXT,
+    rules_version  TEXT,
+    PRIMARY KEY (sample_id, position)
+);
+
+CREATE INDEX IF NOT EXISTS structured_biomarker_values_marker_idx
+    ON structured_biomarker_values (canonical_name, user_id);
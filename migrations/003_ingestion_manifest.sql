@@ -0,0 +1,17 @@
+-- migrations/003_ingestion_manifest.sql
+--
+-- Incremental-run checkpoints read and written by DbManifest
+-- (INGESTION_MANIFEST=db, see docs/ingestion_flow.md). Safe to re-run.
+--
+-- The primary key matches DbManifest's ON CONFLICT (bucket, object_key).
+-- object_key is byte-ordered (COLLATE "C") so the key's btree index also
+-- serves the starts_with(object_key, prefix) load on PostgreSQL 15+.
+
+CREATE TABLE IF NOT EXISTS ingestion_manifest (
+    bucket        TEXT        NOT NULL,
+    object_key    TEXT        COLLATE "C" NOT NULL,   -- full key, prefix included
+    etag          TEXT,
+    last_modified TEXT,                               -- ISO-8601, exactly as listed
+    ingested_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (bucket, object_key)
+);
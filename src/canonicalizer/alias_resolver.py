@@ -0,0 +1,210 @@
+# src/canonicalizer/alias_resolver.py
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from src.logger.logging_config import logger
+
+# characters folded before punctuation is stripped
+_CHAR_FOLDS = str.maketrans({
+    "µ": "u", "μ": "u",          # micro sign / greek mu
+    "α": "alpha", "β": "beta", "γ": "gamma",
+    "‐": "-", "‑": "-", "–": "-", "—": "-",
+    "’": "'", "´": "'",
+})
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_DIGITS = re.compile(r"\d+")
+_RATIO = re.compile(r"[/:]")
+
+# words that change which measurement a name refers to: a fuzzy match must
+# carry exactly the same ones ("Bone Alkaline Phosphatase" is not
+# "Alkaline Phosphatase", "LDL Cholesterol calc" is not "LDL Cholesterol")
+_QUALIFIERS = frozenset({
+    "free", "total", "direct", "indirect", "bound", "unbound", "non",
+    "calc", "calculated", "measured", "estimated", "ratio", "index", "percent",
+    "bone", "liver", "intestinal", "serum", "plasma", "urine", "blood", "whole",
+    "fasting", "random", "high", "low", "sensitivity", "reverse", "ionized",
+    "corrected", "specific", "antibody", "antigen",
+})
+
+
+def fold_name(name: str) -> str:
+    """
+    Aggressive name normalization: unicode compatibility folding, accents
+    and case removed, punctuation / parentheses / underscores → single
+    spaces. "HDL-Cholesterol", " hdl  (cholesterol) " → "hdl cholesterol".
+    """
+    name = unicodedata.normalize("NFKD", name.translate(_CHAR_FOLDS))
+    name = "".join(c for c in name if not unicodedata.combining(c)).casefold()
+    return _NON_ALNUM.sub(" ", name).strip()
+
+
+def _distinguishing(tokens) -> frozenset:
+    """Short tokens (single letters, "hdl", "t4"), digit tokens and qualifier words."""
+    return frozenset(
+        token for token in tokens
+        if len(token) <= 3 or token in _QUALIFIERS or _DIGITS.search(token)
+    )
+
+
+def _trigrams(folded: str) -> frozenset:
+    padded = f"  {folded} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class AliasResolver:
+    """
+    Second-chance alias resolution for names the exact alias map misses.
+
+    Tiers, in order:
+        1. folded      fold_name(raw) equals a folded alias
+        2. compact     same with spaces removed ("hs crp" ↔ "hscrp")
+        3. token set   same words in any order ("cholesterol hdl")
+        4. fuzzy       trigram Dice similarity ≥ threshold, with a unique
+                       best canonical, the same number of words and of
+                       ratio separators ("/", ":"), and identical
+                       distinguishing tokens: digit groups, words of up to
+                       three letters and qualifier words ("IL-6" never
+                       matches "IL-8", "Apolipoprotein A" never matches
+                       "Apolipoprotein B", "Cholesterol Total/HDL" never
+                       matches "Cholesterol Total")
+
+    Fuzzy results are candidates, not mappings: callers must flag them for
+    review instead of storing them as canonical (see NameMapper).
+    Folded keys that map to different canonicals are ambiguous and dropped.
+    Outcomes, including misses, are kept in a bounded LRU so repeat
+    unknowns cost one dict lookup.
+    """
+
+    def __init__(self, alias_map, threshold: float = 0.85, cache_size: int = 4096):
+        self.threshold = float(threshold)
+        self.cache_size = max(int(cache_size), 0)
+
+        self._folded = self._unambiguous(alias_map, fold_name)
+        self._compact = self._unambiguous(alias_map, lambda a: fold_name(a).replace(" ", ""))
+        self._token_set = self._unambiguous(alias_map, lambda a: " ".join(sorted(fold_name(a).split())))
+
+        ratios = {}
+        for alias in alias_map:
+            folded = fold_name(alias)
+            ratios[folded] = max(ratios.get(folded, 0), len(_RATIO.findall(alias)))
+
+        # trigram inverted index over folded aliases
+        self._entries = []                   # (canonical, trigrams, guard)
+        self._postings = {}                  # trigram -> [entry position]
+        for folded, canonical in self._folded.items():
+            if not folded:
+                continue
+            grams = _trigrams(folded)
+            position = len(self._entries)
+            self._entries.append((canonical, grams, self._guard(folded, ratios[folded])))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()          # raw name -> (canonical | None, method, score)
+
+    @staticmethod
+    def _guard(folded: str, ratios: int) -> tuple:
+        """What a fuzzy match must share exactly: word count, ratio separators, distinguishing tokens."""
+        tokens = folded.split()
+        return len(tokens), ratios, tuple(_DIGITS.findall(folded)), _distinguishing(tokens)
+
+    @staticmethod
+    def _unambiguous(alias_map, key_func) -> dict:
+        index, conflicts = {}, set()
+        for alias, canonical in alias_map.items():
+            key = key_func(alias)
+            if index.setdefault(key, canonical) != canonical:
+                conflicts.add(key)
+        for key in conflicts:
+            del index[key]
+        return index
+
+    # ----------------------------------------------------------------------
+    # Public API
+    # ----------------------------------------------------------------------
+    def resolve(self, raw_name: str):
+        """
+        Returns (canonical_name | None, method, score).
+        method: folded | compact | token_set | fuzzy | miss
+        """
+        with self._lock:
+            cached = self._cache.get(raw_name)
+            if cached is not None:
+                self._cache.move_to_end(raw_name)
+                return cached
+
+        result = self._resolve(raw_name)
+        if result[1] == "fuzzy":
+            # once per computed result; cached repeats are not logged again
+            logger.info("fuzzy alias candidate", raw_name=raw_name, suggested_canonical=result[0],
+                        score=result[2])
+
+        if self.cache_size:
+            with self._lock:
+                self._cache[raw_name] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return result
+
+    def cache_info(self) -> dict:
+        with self._lock:
+            misses = sum(1 for canonical, _, _ in self._cache.values() if canonical is None)
+            return {"size": len(self._cache), "misses": misses, "max_size": self.cache_size}
+
+    # ----------------------------------------------------------------------
+    # Resolution tiers
+    # ----------------------------------------------------------------------
+    def _resolve(self, raw_name: str):
+        folded = fold_name(raw_name)
+        if not folded:
+            return None, "miss", 0.0
+
+        canonical = self._folded.get(folded)
+        if canonical:
+            return canonical, "folded", 1.0
+
+        canonical = self._compact.get(folded.replace(" ", ""))
+        if canonical:
+            return canonical, "compact", 1.0
+
+        canonical = self._token_set.get(" ".join(sorted(folded.split())))
+        if canonical:
+            return canonical, "token_set", 1.0
+
+        return self._fuzzy(folded, len(_RATIO.findall(raw_name)))
+
+    def _fuzzy(self, folded: str, ratios: int):
+        grams = _trigrams(folded)
+        guard = self._guard(folded, ratios)
+
+        shared = {}
+        for gram in grams:
+            for position in self._postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        by_canonical = {}
+        for position, overlap in shared.items():
+            canonical, entry_grams, entry_guard = self._entries[position]
+            if entry_guard != guard:
+                continue
+
+            score = 2.0 * overlap / (len(grams) + len(entry_grams))
+            if score > by_canonical.get(canonical, 0.0):
+                by_canonical[canonical] = score
+
+        ranked = sorted(by_canonical.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None, "miss", 0.0
+
+        best_canonical, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+
+        # a close second pointing elsewhere makes the match untrustworthy
+        if best_score >= self.threshold and best_score - runner_up >= 0.05:
+            return best_canonical, "fuzzy", round(best_score, 3)
+
+        return None, "miss", round(best_score, 3)
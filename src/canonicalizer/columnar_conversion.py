@@ -0,0 +1,116 @@
+# src/canonicalizer/columnar_conversion.py
+
+import numpy as np
+from src.repository.rule_store import RuleStore, normalize_key
+from src.canonicalizer.unit_graph import normalize_unit
+from src.logger.logging_config import logger
+
+
+class ColumnarUnitConversionEngine:
+    """
+    Batch counterpart of UnitConversionEngine.
+
+    Gathers every (biomarker, unit, value) triple across many samples into
+    flat columns, resolves each triple to a conversion rule index, and
+    applies factor/additive_offset for all of them in one NumPy pass,
+    writing the results back into the BiomarkerRecords.
+    Range values contribute two entries (min and max) to the same columns.
+
+    Output is identical to UnitConversionEngine.normalize_all applied to
+    each sample in turn.
+    """
+
+    def __init__(self, config, rule_store: RuleStore | None = None):
+        self.config = config
+        self.rule_store = rule_store or RuleStore(config)
+
+    @property
+    def conversion_map(self):
+        return self.rule_store.snapshot.conversion_map
+
+    # ----------------------------------------------------------------------
+    # Normalize a batch of samples
+    # samples: list of BiomarkerRecord lists (one list per sample), updated
+    # in place and returned
+    # stats: optional list of per-sample dicts, "converted" / "unchanged"
+    # counters are added as in UnitConversionEngine.normalize_all
+    # ----------------------------------------------------------------------
+    def normalize_batch(self, samples: list, stats: list | None = None) -> list:
+        conversion_map = self.conversion_map
+
+        rule_index = {}         # rule key -> position in factor/offset arrays
+        factors = []
+        offsets = []
+
+        values = []             # flat value column
+        value_rules = []        # rule position per value
+        targets = []            # (record, part) per value; part: None | "min" | "max"
+        unchanged = 0
+
+        for sample_no, biomarkers in enumerate(samples):
+            sample_unchanged = 0
+
+            for biomarker in biomarkers:
+                key = (normalize_key(biomarker.canonical_name), normalize_unit(biomarker.raw_unit))
+                rule = conversion_map.get(key)
+
+                if not rule:
+                    sample_unchanged += 1
+                    continue
+
+                biomarker.normalized_unit = rule["unit_to"]
+                if rule["factor"] == 1.0 and rule["offset"] == 0.0:
+                    # relabel-only rule: nothing to compute
+                    continue
+
+                position = rule_index.get(key)
+                if position is None:
+                    position = rule_index[key] = len(factors)
+                    factors.append(rule["factor"])
+                    offsets.append(rule["offset"])
+
+                raw_value = biomarker.raw_value
+                if biomarker.is_range:
+                    biomarker.normalized_value = {}
+                    values.append(raw_value["min"])
+                    values.append(raw_value["max"])
+                    value_rules.append(position)
+                    value_rules.append(position)
+                    targets.append((biomarker, "min"))
+                    targets.append((biomarker, "max"))
+                else:
+                    values.append(raw_value)
+                    value_rules.append(position)
+                    targets.append((biomarker, None))
+
+            unchanged += sample_unchanged
+            if stats is not None:
+                sample_stats = stats[sample_no]
+                sample_stats["converted"] = sample_stats.get("converted", 0) + len(biomarkers) - sample_unchanged
+                sample_stats["unchanged"] = sample_stats.get("unchanged", 0) + sample_unchanged
+
+        # ----------------------------------------------------------
+        # One vectorized pass: value * factor + offset, written back
+        # into the records
+        # ----------------------------------------------------------
+        if values:
+            rule_positions = np.asarray(value_rules, dtype=np.intp)
+            result = (
+                np.asarray(values, dtype=np.float64) * np.asarray(factors, dtype=np.float64)[rule_positions]
+                + np.asarray(offsets, dtype=np.float64)[rule_positions]
+            ).tolist()
+
+            for (biomarker, part), normalized in zip(targets, result):
+                if part is None:
+                    biomarker.normalized_value = normalized
+                else:
+                    biomarker.normalized_value[part] = normalized
+
+        logger.info(
+            "columnar unit conversion complete",
+            samples=len(samples),
+            converted_values=len(values),
+            rules_used=len(factors),
+            unchanged=unchanged
+        )
+        return samples
@@ -1,60 +1,104 @@
 # src/canonicalizer/name_mapper.py
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from src.logger.logging_config import logger
+from src.repository.rule_store import RuleStore, SnapshotCache
+from src.canonicalizer.alias_resolver import AliasResolver
+from src.utils.metrics import metrics
+from src.logger.logging_config import log_detail, detail_enabled
+from src.config.flags import config_flag
 
 
 class NameMapper:
     """
     Maps raw biomarker names to canonical names using the
-    cis_biomarker_alias_map table in RDS PostgreSQL.
+    cis_biomarker_alias_map index held by the shared RuleStore.
+
+    Exact-only by default. With ALIAS_FUZZY_ENABLED, names the exact alias
+    map misses get a second chance through an AliasResolver: normalized
+    matches (case, punctuation, word order) are mapped; fuzzy matches are
+    never mapped, only reported as review candidates.
+
+    Config keys (all optional):
+        ALIAS_FUZZY_ENABLED     second-chance resolution (default False)
+        ALIAS_FUZZY_THRESHOLD   minimum trigram similarity (default 0.85)
+        ALIAS_MISS_CACHE_SIZE   LRU size for resolved / unknown names (default 4096)
     """
 
-    def __init__(self, config):
+    def __init__(self, config, rule_store: RuleStore | None = None):
         self.config = config
+        self.rule_store = rule_store or RuleStore(config)
+
+        self.fuzzy_enabled = config_flag(config, "ALIAS_FUZZY_ENABLED")
+        self.fuzzy_threshold = float(config.get("ALIAS_FUZZY_THRESHOLD", 0.85))
+        self.miss_cache_size = int(config.get("ALIAS_MISS_CACHE_SIZE", 4096))
 
-        # RDS connection details
-        self.host = config["RDS_HOST"]
-        self.port = config["RDS_PORT"]
-        self.db = config["RDS_DB"]
-        self.user = config["RDS_USER"]
-        self.password = config["RDS_PASSWORD"]
-
-        self.conn = psycopg2.connect(
-            host=self.host,
-            port=self.port,
-            database=self.db,
-            user=self.user,
-            password=self.password,
-            cursor_factory=RealDictCursor
+        # AliasResolver per snapshot, prebuilt on rule reload
+        self._resolvers = SnapshotCache(
+            lambda snapshot: AliasResolver(snapshot.alias_map, self.fuzzy_threshold, self.miss_cache_size)
         )
+        if self.fuzzy_enabled:
+            self.rule_store.add_warmer(self._resolvers.get)
 
-    def map_name(self, raw_name: str) -> str | None:
+    # ----------------------------------------------------------------------
+    # Resolver compiled per rule snapshot
+    # ----------------------------------------------------------------------
+    def _alias_resolver(self) -> AliasResolver:
+        return self._resolvers.get(self.rule_store.snapshot)
+
+    def _second_chance(self, raw_name: str, review: dict | None = None) -> str | None:
         """
-        Return the canonical name for the raw alias.
-        If no mapping found, return None.
+        Normalized match → canonical name. A fuzzy candidate is not
+        returned: it goes into `review` as {raw_name: {"suggested_canonical", "score"}}.
         """
+        canonical, method, score = self._alias_resolver().resolve(raw_name)
+
+        if canonical and method == "fuzzy":
+            metrics.incr("alias_second_chance", result="review")
+            if review is not None:
+                review[raw_name] = {"suggested_canonical": canonical, "score": score}
+            return None
 
-        raw_clean = raw_name.strip().lower()
+        metrics.incr("alias_second_chance", result="hit" if canonical else "miss")
+        return canonical
 
-        query = """
-            SELECT canonical_name
-            FROM cis_biomarker_alias_map
-            WHERE LOWER(alias_name) = %s
-            AND is_active = TRUE
-            LIMIT 1;
+    def map_name(self, raw_name: str) -> str | None:
+        """
+        Return the canonical name for the raw alias.
+        If no mapping found, return None.
         """
 
-        with self.conn.cursor() as cur:
-            cur.execute(query, (raw_clean,))
-            result = cur.fetchone()
+        canonical = self.rule_store.map_name(raw_name)
+        if canonical is None and self.fuzzy_enabled:
+            canonical = self._second_chance(raw_name)
 
-        if result:
-            canonical = result["canonical_name"]
-            logger.info("canonical name matched", raw_name=raw_name, canonical_name=canonical)
+        if canonical:
+            log_detail("canonical name matched", raw_name=raw_name, canonical_name=canonical)
             return canonical
 
         # No match found
-        logger.warn("no canonical match found", raw_name=raw_name)
+        log_detail("no canonical match found", raw_name=raw_name)
         return None
+
+    def map_names(self, raw_names: list, review: dict | None = None) -> dict:
+        """
+        Resolve many raw aliases in one in-memory pass.
+        Returns {raw_name: canonical_name or None}.
+        review: optional dict receiving fuzzy candidates for unmapped names
+        (see _second_chance); their biomarkers stay unmapped.
+        Per-name events are detail only; counts go in the sample summary.
+        """
+
+        mapped = self.rule_store.map_names(raw_names)
+
+        if self.fuzzy_enabled:
+            for raw_name, canonical in mapped.items():
+                if canonical is None:
+                    mapped[raw_name] = self._second_chance(raw_name, review)
+
+        if detail_enabled():
+            for raw_name, canonical in mapped.items():
+                if canonical:
+                    log_detail("canonical name matched", raw_name=raw_name, canonical_name=canonical)
+                else:
+                    log_detail("no canonical match found", raw_name=raw_name)
+
+        return mapped
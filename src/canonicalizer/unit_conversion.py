@@ -1,128 +1,86 @@
 # src/canonicalizer/unit_conversion.py
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from src.logger.logging_config import logger
+from src.repository.rule_store import RuleStore, normalize_key
+from src.canonicalizer.unit_graph import normalize_unit
+from src.logger.logging_config import log_detail, detail_enabled
 
 
 class UnitConversionEngine:
     """
-    Loads unit conversion rules from DB and provides fast normalization.
+    Serves unit conversion rules from the shared RuleStore and provides fast normalization.
     Table: cis_unit_conversion
     Columns:
         biomarker_name, unit_from, unit_to, factor, additive_offset, is_active
     """
 
-    def __init__(self, config):
+    def __init__(self, config, rule_store: RuleStore | None = None):
         self.config = config
-        self.conn = psycopg2.connect(
-            host=config["RDS_HOST"],
-            port=config["RDS_PORT"],
-            dbname=config["RDS_DB"],
-            user=config["RDS_USER"],
-            password=config["RDS_PASSWORD"],
-            cursor_factory=RealDictCursor
-        )
-
-        self.conversion_map = self._load_rules()
+        self.rule_store = rule_store or RuleStore(config)
 
     # ----------------------------------------------------------------------
-    # Load all active conversion rules from DB
+    # Active conversion rules, keyed on (biomarker, normalize_unit(unit_from));
+    # multi-hop conversions are precomputed by the RuleStore
     # ----------------------------------------------------------------------
-    def _load_rules(self):
-        query = """
-            SELECT biomarker_name, unit_from, unit_to, factor, additive_offset
-            FROM cis_unit_conversion
-            WHERE is_active = TRUE;
-        """
-
-        rules = {}
-
-        with self.conn.cursor() as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
-
-        for row in rows:
-            biomarker = row["biomarker_name"].strip().lower()
-            unit_from = row["unit_from"].strip().lower()
-
-            rules[(biomarker, unit_from)] = {
-                "unit_to": row["unit_to"],
-                "factor": float(row["factor"]),
-                "offset": float(row["additive_offset"])
-            }
-
-        logger.info("unit conversion rules loaded", count=len(rules))
-        return rules
+    @property
+    def conversion_map(self):
+        return self.rule_store.snapshot.conversion_map
 
     # ----------------------------------------------------------------------
-    # Normalize a single biomarker value object
-    # biomarker_name: canonical biomarker name
-    # biomarker_value: dict with raw_value, raw_unit, is_range, comment
+    # Normalize a single biomarker in place
+    # biomarker: BiomarkerRecord (canonical_name, raw_value, raw_unit, is_range);
+    # normalized_value / normalized_unit are overwritten when a rule applies
+    # Returns True if a conversion rule was found
     # ----------------------------------------------------------------------
-    def normalize_value(self, biomarker_name: str, biomarker_obj: dict):
-        biomarker_key = biomarker_name.strip().lower()
-        raw_unit = biomarker_obj["raw_unit"].strip().lower()
+    def normalize_value(self, biomarker) -> bool:
+        raw_unit = normalize_unit(biomarker.raw_unit)
 
-        # Lookup rule in DB
-        rule = self.conversion_map.get((biomarker_key, raw_unit))
+        # Lookup rule in the in-memory index
+        rule = self.conversion_map.get((normalize_key(biomarker.canonical_name), raw_unit))
 
         # If no conversion rule → keep raw values
         if not rule:
-            logger.info(
-                "no unit conversion required — keeping raw values",
-                biomarker=biomarker_name,
-                raw_unit=raw_unit
-            )
-            return {
-                "canonical_name": biomarker_name,
-                "normalized_value": biomarker_obj["raw_value"],
-                "normalized_unit": biomarker_obj["raw_unit"],
-                "is_range": biomarker_obj["is_range"],
-                "comment": biomarker_obj.get("comment", "")
-            }
+            if detail_enabled():
+                log_detail(
+                    "no unit conversion required — keeping raw values",
+                    biomarker=biomarker.canonical_name,
+                    raw_unit=raw_unit
+                )
+            return False
 
         factor = rule["factor"]
         offset = rule["offset"]
-        unit_to = rule["unit_to"]
+        biomarker.normalized_unit = rule["unit_to"]
+
+        # Same unit, other spelling: relabel only, value untouched
+        if factor == 1.0 and offset == 0.0:
+            return True
 
         # Single numeric value
-        if not biomarker_obj["is_range"]:
-            raw_value = biomarker_obj["raw_value"]
-            normalized = raw_value * factor + offset
-
-            return {
-                "canonical_name": biomarker_name,
-                "normalized_value": normalized,
-                "normalized_unit": unit_to,
-                "is_range": False,
-                "comment": biomarker_obj.get("comment", "")
-            }
+        if not biomarker.is_range:
+            biomarker.normalized_value = biomarker.raw_value * factor + offset
+            return True
 
         # Range value
-        raw_min = biomarker_obj["raw_value"]["min"]
-        raw_max = biomarker_obj["raw_value"]["max"]
-
-        return {
-            "canonical_name": biomarker_name,
-            "normalized_value": {
-                "min": raw_min * factor + offset,
-                "max": raw_max * factor + offset
-            },
-            "normalized_unit": unit_to,
-            "is_range": True,
-            "comment": biomarker_obj.get("comment", "")
+        raw_value = biomarker.raw_value
+        biomarker.normalized_value = {
+            "min": raw_value["min"] * factor + offset,
+            "max": raw_value["max"] * factor + offset
         }
+        return True
 
     # ----------------------------------------------------------------------
-    # Normalize all biomarkers in the validated payload
+    # Normalize all biomarkers of a sample (BiomarkerRecords, in place)
+    # stats: optional dict, "converted" / "unchanged" counters are added
     # ----------------------------------------------------------------------
-    def normalize_all(self, biomarkers: dict):
-        normalized_biomarkers = []
+    def normalize_all(self, biomarkers: list, stats: dict | None = None) -> list:
+        converted = 0
+
+        for biomarker in biomarkers:
+            if self.normalize_value(biomarker):
+                converted += 1
 
-        for sample in biomarkers:
-            b_name = sample['canonical_name']
-            normalized_sample = self.normalize_value(b_name, sample)
-            normalized_biomarkers.append(normalized_sample)
+        if stats is not None:
+            stats["converted"] = stats.get("converted", 0) + converted
+            stats["unchanged"] = stats.get("unchanged", 0) + len(biomarkers) - converted
 
-        return normalized_biomarkers
+        return biomarkers
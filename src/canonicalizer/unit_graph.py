@@ -0,0 +1,118 @@
+# src/canonicalizer/unit_graph.py
+
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+_WHITESPACE = re.compile(r"\s+")
+
+# spelled-out or legacy unit tokens -> canonical token (applied after folding)
+_UNIT_TOKENS = (
+    ("mg%", "mg/dl"),
+    ("mcg", "ug"),
+    ("litre", "l"),
+    ("liter", "l"),
+)
+
+
+@lru_cache(maxsize=4096)
+def normalize_unit(unit: str) -> str:
+    """
+    Canonical unit token used for every rule lookup:
+    unicode folded (µ/μ → u), case-insensitive, whitespace removed,
+    legacy spellings mapped ("mg %" → "mg/dl", "mcg/L" → "ug/l").
+    Cached: lab exports repeat a small set of unit strings.
+    """
+    token = unicodedata.normalize("NFKC", unit).casefold().replace("μ", "u")
+    token = _WHITESPACE.sub("", token)
+    for legacy, canonical in _UNIT_TOKENS:
+        token = token.replace(legacy, canonical)
+    return token
+
+
+def _compose(first, then):
+    """Affine transform applying `first` then `then`: (factor, offset)."""
+    return then[0] * first[0], then[0] * first[1] + then[1]
+
+
+def build_conversion_closure(direct_rules: dict) -> dict:
+    """
+    Precompute every reachable conversion per biomarker.
+
+    direct_rules: {(biomarker, normalized unit_from): {"unit_to", "factor", "offset"}}
+
+    Each biomarker's rules form a graph over normalized units (rules are
+    affine, so every edge with factor != 0 is also walked in reverse).
+    Targets are the rule's unit_to values that are never themselves
+    converted further. Every unit that can reach a target gets one composed
+    rule (fewest hops wins, then the alphabetically first target).
+    Targets also get an identity rule, so differently spelled
+    units (e.g. "mg / dL") are relabelled to the canonical spelling.
+    Direct rules win over derived ones unless they stop at an
+    intermediate unit (umol/L → mmol/L → mg/dL is followed to mg/dL).
+    """
+    graphs = {}          # biomarker -> {unit: [(neighbour, (factor, offset))]}
+    spelling = {}        # (biomarker, normalized unit_to) -> unit_to as configured
+    sources = {}         # biomarker -> set of normalized unit_from
+
+    for (biomarker, unit_from), rule in direct_rules.items():
+        unit_to = normalize_unit(rule["unit_to"])
+        factor, offset = float(rule["factor"]), float(rule["offset"])
+
+        spelling.setdefault((biomarker, unit_to), rule["unit_to"])
+        sources.setdefault(biomarker, set()).add(unit_from)
+
+        edges = graphs.setdefault(biomarker, {})
+        edges.setdefault(unit_from, []).append((unit_to, (factor, offset)))
+        if factor != 0:
+            edges.setdefault(unit_to, []).append((unit_from, (1.0 / factor, -offset / factor)))
+
+    closure = {}
+    sinks_by_biomarker = {}
+
+    for biomarker, edges in graphs.items():
+        targets = sorted(unit for (b, unit) in spelling if b == biomarker)
+        sinks = [unit for unit in targets if unit not in sources[biomarker]] or targets
+        sinks_by_biomarker[biomarker] = set(sinks)
+
+        # best[unit] = (hops, target, transform unit -> target)
+        best = {}
+        for target in sinks:
+            # walk backwards from the target: transform[u] maps u -> target
+            transform = {target: (1.0, 0.0)}
+            hops = {target: 0}
+            queue = deque([target])
+
+            while queue:
+                current = queue.popleft()
+                for unit, unit_edges in edges.items():
+                    if unit in transform:
+                        continue
+                    for neighbour, edge in unit_edges:
+                        if neighbour == current:
+                            transform[unit] = _compose(edge, transform[current])
+                            hops[unit] = hops[current] + 1
+                            queue.append(unit)
+                            break
+
+            for unit, composed in transform.items():
+                candidate = (hops[unit], target, composed)
+                if unit not in best or candidate[:2] < best[unit][:2]:
+                    best[unit] = candidate
+
+        for unit, (_, target, (factor, offset)) in best.items():
+            closure[(biomarker, unit)] = {
+                "unit_to": spelling[(biomarker, target)],
+                "factor": factor,
+                "offset": offset,
+            }
+
+    # configured rules that already land on a target are authoritative;
+    # ones into an intermediate unit are replaced by the full chain
+    for (biomarker, unit_from), rule in direct_rules.items():
+        if (biomarker, unit_from) not in closure \
+                or normalize_unit(rule["unit_to"]) in sinks_by_biomarker[biomarker]:
+            closure[(biomarker, unit_from)] = dict(rule)
+
+    return closure
@@ -1,37 +1,67 @@
 # src/config/config_loader.py
 
 import json
-import boto3
+import time
+import threading
 from src.config.settings import get_settings
 from src.logger.logging_config import logger
 
 
-def get_ingestion_config() -> dict:
+# Warm-container cache: survives across Lambda invocations
+_config_cache = {"config": None, "loaded_at": 0.0}
+_config_lock = threading.Lock()
+_secrets_client = None
+
+
+def _get_secrets_client(region: str):
+    global _secrets_client
+
+    if _secrets_client is None:
+        import boto3    # deferred: keeps the import phase of cold starts small
+        _secrets_client = boto3.client("secretsmanager", region_name=region)
+
+    return _secrets_client
+
+
+def get_ingestion_config(force_refresh: bool = False) -> dict:
     """
     Loads ingestion configuration:
     1. Load environment variables via Settings
     2. Fetch secret from AWS Secrets Manager
     3. Merge values
+
+    The merged config is cached for CONFIG_CACHE_TTL_SECONDS so warm
+    invocations skip Secrets Manager. Callers get a copy they may mutate.
     """
 
     settings = get_settings()
 
-    logger.info("loading ingestion configuration", env=settings.INGESTION_ENV, region=settings.AWS_SECRET_REGION)
+    with _config_lock:
+        cached = _config_cache["config"]
+        age = time.monotonic() - _config_cache["loaded_at"]
+
+        if cached is not None and not force_refresh and age < settings.CONFIG_CACHE_TTL_SECONDS:
+            return dict(cached)
+
+        logger.info("loading ingestion configuration", env=settings.INGESTION_ENV, region=settings.AWS_SECRET_REGION)
+
+        # --------------------------------
+        # 1. Load Secrets Manager values
+        # --------------------------------
+        client = _get_secrets_client(settings.AWS_SECRET_REGION)
 
-    # --------------------------------
-    # 1. Load Secrets Manager values
-    # --------------------------------
-    client = boto3.client("secretsmanager", region_name=settings.AWS_SECRET_REGION)
+        secret_response = client.get_secret_value(SecretId=settings.CARDIO_INGESTION_SECRET_NAME)
 
-    secret_response = client.get_secret_value(SecretId=settings.CARDIO_INGESTION_SECRET_NAME)
+        secret_config = json.loads(secret_response["SecretString"])
 
-    secret_config = json.loads(secret_response["SecretString"])
+        # --------------------------------
+        # 2. Attach runtime environment
+        # --------------------------------
+        secret_config["RUNTIME_ENV"] = settings.INGESTION_ENV
 
-    # --------------------------------
-    # 2. Attach runtime environment
-    # --------------------------------
-    secret_config["RUNTIME_ENV"] = settings.INGESTION_ENV
+        _config_cache["config"] = secret_config
+        _config_cache["loaded_at"] = time.monotonic()
 
-    logger.info("ingestion config loaded successfully")
+        logger.info("ingestion config loaded successfully", ttl_seconds=settings.CONFIG_CACHE_TTL_SECONDS)
 
-    return secret_config
+        return dict(secret_config)
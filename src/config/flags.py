@@ -0,0 +1,26 @@
+# src/config/flags.py
+
+_TRUE = frozenset({"1", "true", "yes", "on", "y", "t"})
+_FALSE = frozenset({"0", "false", "no", "off", "n", "f", ""})
+
+
+def config_flag(config: dict, key: str, default: bool = False) -> bool:
+    """
+    Boolean config value. Values from env vars / Secrets Manager arrive as
+    strings, so "false", "0", "no" and "off" are False (bool("false") is
+    True). Missing or None → default; anything unrecognized raises.
+    """
+    value = config.get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+
+    token = str(value).strip().lower()
+    if token in _TRUE:
+        return True
+    if token in _FALSE:
+        return False
+    raise ValueError(f"invalid boolean for {key}: {value!r}")
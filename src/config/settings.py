@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     CARDIO_INGESTION_SECRET_NAME: str = "cardio/ingestion/config"
     AWS_SECRET_REGION: str = "us-east-1"
     INGESTION_ENV: str = "dev"   # dev / qa / prod
+    CONFIG_CACHE_TTL_SECONDS: int = 300   # secret cache lifetime in warm containers
 
     class Config:
         env_file = ".env"  # loaded only in local development
@@ -0,0 +1,138 @@
+# src/ingestion/manifest.py
+"""
+Manifest of ingested S3 objects for incremental runs.
+
+Each entry records the ETag and LastModified of an object when it was
+last ingested (successfully or as an unchanged skip). An object is
+pending when it is missing from the manifest or either value differs.
+Entries are checkpointed after every chunk, so an interrupted run
+resumes with the objects it had not finished.
+
+Backends (INGESTION_MANIFEST):
+    local  JSON file at INGESTION_MANIFEST_PATH, rewritten atomically
+    db     ingestion_manifest table (see docs/ingestion_flow.md)
+"""
+
+import os
+import json
+import tempfile
+from psycopg2.extras import execute_values
+from src.utils.unit_utils import db_connection
+from src.logger.logging_config import logger
+
+
+class LocalManifest:
+    """{filename: [etag, last_modified]} in one JSON file per bucket/prefix."""
+
+    def __init__(self, path: str, bucket: str, prefix: str):
+        self.path = path
+        self.bucket = bucket
+        self.prefix = prefix
+        self._entries = None
+
+    def load(self) -> dict:
+        """Returns {filename: (etag, last_modified)}."""
+        entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            if data.get("bucket") == self.bucket and data.get("prefix") == self.prefix:
+                entries = {filename: tuple(version) for filename, version in data["objects"].items()}
+            else:
+                logger.warning("manifest belongs to another bucket/prefix, starting empty",
+                               path=self.path, bucket=data.get("bucket"), prefix=data.get("prefix"))
+
+        self._entries = entries
+        return dict(entries)
+
+    def record(self, objects: list):
+        if not objects:
+            return
+        if self._entries is None:
+            self.load()
+
+        for obj in objects:
+            self._entries[obj.filename] = obj.fingerprint
+
+        data = {
+            "bucket": self.bucket,
+            "prefix": self.prefix,
+            "objects": {filename: list(version) for filename, version in sorted(self._entries.items())},
+        }
+
+        # temp file + rename: a crash never leaves a truncated manifest
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class DbManifest:
+    """ingestion_manifest rows, shared by every worker of the pipeline."""
+
+    LOAD_QUERY = """
+        SELECT object_key, etag, last_modified
+        FROM ingestion_manifest
+        WHERE bucket = %s AND starts_with(object_key, %s);
+    """
+
+    UPSERT_QUERY = """
+        INSERT INTO ingestion_manifest (bucket, object_key, etag, last_modified)
+        VALUES %s
+        ON CONFLICT (bucket, object_key) DO UPDATE SET
+            etag          = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            ingested_at   = now();
+    """
+
+    def __init__(self, config, bucket: str, prefix: str):
+        self.config = config
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def load(self) -> dict:
+        with db_connection(self.config) as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.LOAD_QUERY, (self.bucket, self.prefix))
+                return {
+                    object_key[len(self.prefix):]: (etag, last_modified)
+                    for object_key, etag, last_modified in cur.fetchall()
+                }
+
+    def record(self, objects: list):
+        if not objects:
+            return
+
+        with db_connection(self.config) as conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    self.UPSERT_QUERY,
+                    [(self.bucket, f"{self.prefix}{obj.filename}", obj.etag, obj.last_modified)
+                     for obj in objects],
+                    page_size=len(objects)
+                )
+
+
+def open_manifest(config: dict, bucket: str, prefix: str):
+    """
+    Config keys (optional):
+        INGESTION_MANIFEST       "local" (default) or "db"
+        INGESTION_MANIFEST_PATH  local manifest file (default ingestion_manifest.json)
+    """
+    backend = config.get("INGESTION_MANIFEST", "local")
+
+    if backend == "db":
+        return DbManifest(config, bucket, prefix)
+    if backend == "local":
+        return LocalManifest(config.get("INGESTION_MANIFEST_PATH", "ingestion_manifest.json"), bucket, prefix)
+
+    raise ValueError(f"unknown INGESTION_MANIFEST backend: {backend}")
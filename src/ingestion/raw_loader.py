@@ -1,28 +1,52 @@
 # src/ingestion/raw_loader.py
 
 import json
-import boto3
-from botocore.exceptions import ClientError
+from typing import NamedTuple
+from src.utils.json_stream import iter_json_documents
+from src.utils.s3_client import get_s3_client
+from src.ingestion.s3_object_reader import S3ObjectReader
+from src.utils.metrics import metrics
 from src.logger.logging_config import logger
 
 
+class ObjectVersion(NamedTuple):
+    """One listed object: key relative to S3_INPUT_PREFIX + change markers."""
+    filename: str
+    etag: str | None
+    last_modified: str | None       # ISO-8601
+
+    @property
+    def fingerprint(self):
+        return self.etag, self.last_modified
+
+
 class RawLoader:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, s3_client=None):
+        """
+        s3_client: optional pre-built client (anything with get_object /
+        get_paginator), e.g. a local stand-in for benchmarks; the shared,
+        tuned client from get_s3_client() otherwise.
+
+        Reads go through S3ObjectReader: parallel ranged GETs for large
+        objects and streaming gzip / zstd decoding (see its config keys).
+        """
         self.config = config
-        self.s3 = boto3.client("s3", region_name=config["REGION"])
+
+        self.s3 = s3_client or get_s3_client(config)
+        self.reader = S3ObjectReader(self.s3, config)
         self.bucket = config["S3_INPUT_BUCKET"]
         self.prefix = config["S3_INPUT_PREFIX"]
 
     def load_from_s3(self, filename: str) -> dict:
         """Load raw JSON file from S3."""
+        from botocore.exceptions import ClientError
+
         key = f"{self.prefix}{filename}"
 
         logger.info("loading file from S3", bucket=self.bucket, key=key)
 
         try:
-            response = self.s3.get_object(Bucket=self.bucket, Key=key)
-            text = response["Body"].read().decode("utf-8")
-            data = json.loads(text)
+            data = json.loads(self.reader.read(self.bucket, key))
 
             logger.info("file loaded successfully", key=key)
             return data
@@ -34,3 +58,89 @@ class RawLoader:
         except json.JSONDecodeError as e:
             logger.error("invalid json format", error=str(e), key=key)
             raise
+
+    def load_bytes_from_s3(self, filename: str) -> bytes:
+        """
+        Load the raw object bytes from S3 (decompressed, but not decoded
+        or parsed); validation parses them directly (see validate_raw_input).
+        """
+        from botocore.exceptions import ClientError
+
+        key = f"{self.prefix}{filename}"
+
+        logger.info("loading file from S3", bucket=self.bucket, key=key)
+
+        try:
+            with metrics.timer("s3_fetch"):
+                data = self.reader.read(self.bucket, key)
+
+            logger.info("file loaded successfully", key=key, size=len(data))
+            return data
+
+        except ClientError as e:
+            logger.error("s3 read error", error=str(e), bucket=self.bucket, key=key)
+            raise
+
+    # source interface (see src.ingestion.sources)
+    load_bytes = load_bytes_from_s3
+
+    def iter_samples(self, filename: str):
+        """
+        Stream raw samples from a (possibly very large) S3 object.
+        Supports a single JSON object, NDJSON / JSON Lines and a top-level
+        array of samples, optionally gzip / zstd compressed; the body is
+        read part by part and decoded incrementally, so memory stays
+        constant regardless of export size. A bad NDJSON line is yielded
+        as a MalformedLine so the caller can fail just that sample.
+        """
+        from botocore.exceptions import ClientError
+
+        key = f"{self.prefix}{filename}"
+
+        logger.info("streaming file from S3", bucket=self.bucket, key=key)
+
+        count = 0
+        try:
+            for sample in iter_json_documents(self.reader.iter_decoded(self.bucket, key)):
+                count += 1
+                yield sample
+
+        except ClientError as e:
+            logger.error("s3 read error", error=str(e), bucket=self.bucket, key=key, samples_read=count)
+            raise
+
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error("invalid json stream", error=str(e), key=key, samples_read=count)
+            raise
+
+        logger.info("file streamed successfully", key=key, samples=count)
+
+    def list_keys(self):
+        """
+        Yield every object under S3_INPUT_PREFIX as a filename relative to
+        the prefix (paginated, so arbitrarily large prefixes are fine).
+        """
+        for obj in self.list_objects():
+            yield obj.filename
+
+    def list_objects(self):
+        """
+        Same listing as list_keys(), yielding ObjectVersion entries with the
+        ETag and LastModified returned by ListObjectsV2 (no extra requests).
+        """
+        paginator = self.s3.get_paginator("list_objects_v2")
+
+        logger.info("listing S3 prefix", bucket=self.bucket, prefix=self.prefix)
+
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                if key.endswith("/"):
+                    continue
+
+                last_modified = obj.get("LastModified")
+                yield ObjectVersion(
+                    key[len(self.prefix):],
+                    obj.get("ETag"),
+                    last_modified.isoformat() if last_modified is not None else None
+                )
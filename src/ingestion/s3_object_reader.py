@@ -0,0 +1,201 @@
+# src/ingestion/s3_object_reader.py
+
+import re
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.metrics import metrics
+
+_CONTENT_RANGE = re.compile(r"bytes \d+-\d+/(\d+)")
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class S3ObjectReader:
+    """
+    Reads S3 objects as an ordered stream of byte chunks.
+
+    - Every object is fetched with a ranged GET of its first part; the
+      Content-Range of that response gives the total size, so small
+      objects cost exactly one request and no HEAD is needed.
+    - Objects larger than one part have their remaining parts fetched by
+      up to S3_RANGE_WORKERS parallel GETs, pinned to the first
+      response's ETag (If-Match), and yielded in order. At most
+      S3_RANGE_WORKERS parts are held in memory.
+    - gzip and zstd objects (detected by magic bytes) are decompressed
+      incrementally as parts arrive: compressed parts are dropped once
+      decoded, never buffered alongside the full decompressed output.
+      zstd needs the optional `zstandard` package.
+
+    Config keys (all optional):
+        S3_RANGE_PART_SIZE     bytes per ranged GET (default 8 MiB)
+        S3_RANGE_WORKERS       parallel GETs per object (default 8)
+        S3_STREAM_CHUNK_SIZE   chunk size when streaming the first part (default 256 KiB)
+    """
+
+    def __init__(self, s3_client, config: dict):
+        self.s3 = s3_client
+        self.part_size = max(int(config.get("S3_RANGE_PART_SIZE", 8 * 1024 * 1024)), 1)
+        self.range_workers = max(int(config.get("S3_RANGE_WORKERS", 8)), 1)
+        self.chunk_size = int(config.get("S3_STREAM_CHUNK_SIZE", 256 * 1024))
+
+    # ----------------------------------------------------------------------
+    # Public API
+    # ----------------------------------------------------------------------
+    def read(self, bucket: str, key: str) -> bytes:
+        """Whole object, decompressed."""
+        return b"".join(self.iter_decoded(bucket, key))
+
+    def iter_decoded(self, bucket: str, key: str):
+        """Decompressed byte chunks, in order."""
+        return decode_chunks(self.iter_chunks(bucket, key))
+
+    def iter_chunks(self, bucket: str, key: str):
+        """Raw (possibly compressed) byte chunks, in order."""
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{self.part_size - 1}")
+        except ClientError as e:
+            # empty objects cannot satisfy any range
+            if e.response.get("Error", {}).get("Code") != "InvalidRange":
+                raise
+            response = self.s3.get_object(Bucket=bucket, Key=key)
+
+        metrics.incr("s3_objects_read")
+        total = _total_size(response)
+        body = response["Body"]
+
+        # no ContentRange (Range ignored, or the InvalidRange fallback):
+        # the body is already the whole object
+        if total is None or total <= self.part_size:
+            try:
+                yield from _counted(body.iter_chunks(self.chunk_size))
+            finally:
+                body.close()
+            return
+
+        metrics.incr("s3_ranged_objects")
+        starts = iter(range(self.part_size, total, self.part_size))
+        etag = response.get("ETag")
+
+        pool = ThreadPoolExecutor(self.range_workers, thread_name_prefix="s3-range")
+        pending = deque()
+
+        def submit_next():
+            start = next(starts, None)
+            if start is not None:
+                end = min(start + self.part_size, total) - 1
+                pending.append(pool.submit(self._read_range, bucket, key, start, end, etag))
+
+        try:
+            # remaining parts download while the first one is streamed
+            for _ in range(self.range_workers):
+                submit_next()
+
+            try:
+                yield from _counted(body.iter_chunks(self.chunk_size))
+            finally:
+                body.close()
+
+            while pending:
+                part = pending.popleft().result()
+                submit_next()
+                metrics.incr("s3_bytes_read", len(part))
+                yield part
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    # ----------------------------------------------------------------------
+    # Internals
+    # ----------------------------------------------------------------------
+    def _read_range(self, bucket: str, key: str, start: int, end: int, etag: str | None) -> bytes:
+        kwargs = {"IfMatch": etag} if etag else {}
+        with metrics.timer("s3_range_get"):
+            response = self.s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", **kwargs)
+            body = response["Body"]
+            try:
+                part = body.read()
+            finally:
+                body.close()
+
+        if len(part) != end - start + 1:
+            raise ValueError(f"s3://{bucket}/{key}: range {start}-{end} returned {len(part)} bytes")
+        return part
+
+
+def _total_size(response: dict) -> int | None:
+    """Object size from ContentRange; None when the response is not a partial one."""
+    match = _CONTENT_RANGE.match(response.get("ContentRange") or "")
+    return int(match.group(1)) if match else None
+
+
+def _counted(chunks):
+    for chunk in chunks:
+        metrics.incr("s3_bytes_read", len(chunk))
+        yield chunk
+
+
+# ----------------------------------------------------------------------
+# Streaming decompression (format sniffed from the first bytes)
+# ----------------------------------------------------------------------
+def _decompressor(head: bytes):
+    if head.startswith(GZIP_MAGIC):
+        return "gzip", zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+    if head.startswith(ZSTD_MAGIC):
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd-compressed input requires the 'zstandard' package")
+        return "zstd", zstandard.ZstdDecompressor().decompressobj()
+
+    return None, None
+
+
+def decode_chunks(chunks):
+    """
+    Byte chunks → decompressed byte chunks. gzip / zstd are detected from
+    the first bytes; anything else passes through unchanged.
+    """
+    chunks = iter(chunks)
+
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= len(ZSTD_MAGIC):
+            break
+
+    fmt, decoder = _decompressor(head)
+    if decoder is None:
+        if head:
+            yield head
+        yield from chunks
+        return
+
+    metrics.incr("s3_objects_decompressed", format=fmt)
+    pending = head
+
+    while True:
+        if pending:
+            out = decoder.decompress(pending)
+            if out:
+                yield out
+
+            # concatenated gzip members (e.g. appended exports)
+            if fmt == "gzip" and decoder.eof and decoder.unused_data:
+                pending = decoder.unused_data
+                decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                continue
+
+        pending = next(chunks, None)
+        if pending is None:
+            break
+
+    out = decoder.flush()
+    if out:
+        yield out
+
+    if fmt == "gzip" and not decoder.eof:
+        raise ValueError("truncated gzip stream")
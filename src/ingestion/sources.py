@@ -0,0 +1,297 @@
+# src/ingestion/sources.py
+"""
+Input sources for IngestionOrchestrator.
+
+A source is anything with the loader interface RawLoader implements:
+
+    load_bytes(filename) -> bytes    one raw payload, decompressed
+    iter_samples(filename)           raw samples of a multi-sample export
+    list_keys() / list_objects()     filenames / ObjectVersion entries
+    bucket, prefix                   identify the source (manifest key)
+
+Optionally:
+
+    iter_payloads()                  (filename, bytes) in source order, for
+                                     sources that read best sequentially
+    close()
+
+Backends (INGESTION_SOURCE):
+    s3       RawLoader over S3_INPUT_BUCKET / S3_INPUT_PREFIX (default)
+    local    LocalDirectorySource over the directory INGESTION_SOURCE_PATH
+    archive  ArchiveSource over the .zip / .tar[.gz|.bz2|.xz] INGESTION_SOURCE_PATH
+
+Local files and uncompressed tarballs are memory-mapped, so fetching a
+payload is a page-cache copy instead of a request.
+"""
+
+import os
+import mmap
+import posixpath
+import tarfile
+import zipfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from src.ingestion.raw_loader import RawLoader, ObjectVersion
+from src.ingestion.s3_object_reader import decode_chunks, GZIP_MAGIC, ZSTD_MAGIC
+from src.utils.json_stream import iter_json_documents
+from src.utils.metrics import metrics
+from src.logger.logging_config import logger
+
+
+def open_source(config: dict):
+    """
+    Build the configured source.
+
+    Config keys (optional):
+        INGESTION_SOURCE       "s3" (default), "local" or "archive"
+        INGESTION_SOURCE_PATH  directory / archive path (local, archive)
+        SOURCE_CHUNK_SIZE      bytes per slice when streaming a mapped
+                               file (default 1 MiB)
+    """
+    source = config.get("INGESTION_SOURCE", "s3")
+
+    if source == "s3":
+        return RawLoader(config)
+    if source == "local":
+        return LocalDirectorySource(config["INGESTION_SOURCE_PATH"], config)
+    if source == "archive":
+        return ArchiveSource(config["INGESTION_SOURCE_PATH"], config)
+
+    raise ValueError(f"unknown INGESTION_SOURCE: {source}")
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _member_name(name: str) -> str:
+    """Archive member name as a filename ("./a/b.json" → "a/b.json")."""
+    return posixpath.normpath(name).lstrip("/")
+
+
+def _hidden(name: str) -> bool:
+    return any(part.startswith(".") for part in name.split("/"))
+
+
+def _slices(buffer, chunk_size: int):
+    for start in range(0, len(buffer), chunk_size):
+        yield buffer[start:start + chunk_size]
+
+
+def _decoded_bytes(buffer, chunk_size: int) -> bytes:
+    """
+    Whole payload as bytes: one copy out of the mapping, or the
+    decompressed output for gzip / zstd members.
+    """
+    head = bytes(buffer[:len(ZSTD_MAGIC)])
+    if head.startswith(GZIP_MAGIC) or head.startswith(ZSTD_MAGIC):
+        return b"".join(decode_chunks(_slices(buffer, chunk_size)))
+    return bytes(buffer)
+
+
+@contextmanager
+def _mapped(path: str):
+    """Read-only mapping of a file (b"" for empty files, which cannot be mapped)."""
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield b""
+            return
+
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+class LocalDirectorySource:
+    """
+    Every regular file under a directory (recursively, hidden files
+    skipped), addressed by its path relative to the directory with "/"
+    separators. Files are memory-mapped; gzip / zstd files are
+    decompressed like S3 objects.
+
+    list_objects() reports "<size>-<mtime_ns>" as the ETag and the mtime
+    as LastModified, so incremental runs work against a directory too.
+    """
+
+    def __init__(self, root: str, config: dict | None = None):
+        config = config or {}
+        self.root = os.path.abspath(root)
+        if not os.path.isdir(self.root):
+            raise ValueError(f"source directory not found: {root}")
+
+        self.chunk_size = int(config.get("SOURCE_CHUNK_SIZE", 1024 * 1024))
+        self.bucket = "file"
+        self.prefix = self.root + "/"
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.root, *filename.split("/"))
+
+    def load_bytes(self, filename: str) -> bytes:
+        with metrics.timer("source_fetch"):
+            with _mapped(self._path(filename)) as mapped:
+                data = _decoded_bytes(mapped, self.chunk_size)
+
+        metrics.incr("source_bytes_read", len(data))
+        return data
+
+    def iter_samples(self, filename: str):
+        """Stream the samples of a mapped NDJSON / JSON-array export."""
+        count = 0
+        with _mapped(self._path(filename)) as mapped:
+            for sample in iter_json_documents(decode_chunks(_slices(mapped, self.chunk_size))):
+                count += 1
+                yield sample
+
+        logger.info("file streamed successfully", path=self._path(filename), samples=count)
+
+    def list_keys(self):
+        for obj in self.list_objects():
+            yield obj.filename
+
+    def list_objects(self):
+        logger.info("listing source directory", root=self.root)
+
+        for directory, subdirectories, files in os.walk(self.root):
+            # sorted, deterministic order; hidden directories are not entered
+            subdirectories[:] = sorted(d for d in subdirectories if not d.startswith("."))
+
+            for name in sorted(files):
+                if name.startswith("."):
+                    continue
+
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                yield ObjectVersion(
+                    os.path.relpath(path, self.root).replace(os.sep, "/"),
+                    f"{stat.st_size:x}-{stat.st_mtime_ns:x}",
+                    _iso(stat.st_mtime)
+                )
+
+
+class ArchiveSource:
+    """
+    Every regular member of a zip or tar archive (hidden members and
+    directories skipped), addressed by its member name.
+
+    - zip and uncompressed tar allow random access, so they work with
+      every orchestrator mode. Uncompressed tarballs are memory-mapped
+      once and a member is a slice of the mapping at its data offset.
+    - Compressed tarballs (.tar.gz / .bz2 / .xz) can only be read
+      front to back: use iter_payloads() (IngestionOrchestrator.run_replay).
+      load_bytes() raises for them instead of re-decompressing the
+      archive up to each member.
+
+    gzip / zstd compressed members are decompressed like S3 objects.
+    """
+
+    def __init__(self, path: str, config: dict | None = None):
+        config = config or {}
+        self.path = os.path.abspath(path)
+        self.chunk_size = int(config.get("SOURCE_CHUNK_SIZE", 1024 * 1024))
+        self.bucket = "archive"
+        self.prefix = self.path + "!"
+
+        self._lock = threading.Lock()
+        self._zip = None
+        self._mapped = None
+        self._members = None            # name -> ZipInfo / TarInfo
+
+        if zipfile.is_zipfile(self.path):
+            self.kind = "zip"
+        elif tarfile.is_tarfile(self.path):
+            with open(self.path, "rb") as fh:
+                head = fh.read(6)
+            compressed = head.startswith((GZIP_MAGIC, b"BZh", b"\xfd7zXZ"))
+            self.kind = "tar_stream" if compressed else "tar"
+        else:
+            raise ValueError(f"not a zip or tar archive: {path}")
+
+    # ----------------------------------------------------------------------
+    # Member index (random-access archives)
+    # ----------------------------------------------------------------------
+    def _index(self) -> dict:
+        with self._lock:
+            if self._members is not None:
+                return self._members
+
+            if self.kind == "zip":
+                self._zip = zipfile.ZipFile(self.path)
+                members = {_member_name(info.filename): info for info in self._zip.infolist() if not info.is_dir()}
+            elif self.kind == "tar":
+                with tarfile.open(self.path, "r:") as archive:
+                    members = {_member_name(info.name): info for info in archive.getmembers() if info.isfile()}
+                with open(self.path, "rb") as fh:
+                    self._mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                raise ValueError(f"compressed tarball {self.path} can only be read sequentially "
+                                 "(iter_payloads / run_replay)")
+
+            self._members = {name: info for name, info in sorted(members.items()) if not _hidden(name)}
+            return self._members
+
+    def load_bytes(self, filename: str) -> bytes:
+        info = self._index().get(filename)
+        if info is None:
+            raise KeyError(f"{filename} not found in {self.path}")
+
+        with metrics.timer("source_fetch"):
+            if self.kind == "zip":
+                data = _decoded_bytes(self._zip.read(info), self.chunk_size)
+            else:
+                member = memoryview(self._mapped)[info.offset_data:info.offset_data + info.size]
+                try:
+                    data = _decoded_bytes(member, self.chunk_size)
+                finally:
+                    member.release()
+
+        metrics.incr("source_bytes_read", len(data))
+        return data
+
+    def iter_samples(self, filename: str):
+        return iter_json_documents(iter((self.load_bytes(filename),)))
+
+    def list_keys(self):
+        if self.kind == "tar_stream":
+            return (filename for filename, _ in self._iter_tar_members())
+        return iter(self._index())
+
+    def list_objects(self):
+        for filename, info in self._index().items():
+            if self.kind == "zip":
+                modified = datetime(*info.date_time, tzinfo=timezone.utc).isoformat()
+                yield ObjectVersion(filename, f"{info.CRC:08x}-{info.file_size:x}", modified)
+            else:
+                yield ObjectVersion(filename, f"{info.size:x}-{int(info.mtime):x}", _iso(info.mtime))
+
+    def iter_payloads(self):
+        """(filename, bytes) for every member, in archive order, one member in memory at a time."""
+        if self.kind != "tar_stream":
+            for filename in self._index():
+                yield filename, self.load_bytes(filename)
+            return
+
+        for filename, fh in self._iter_tar_members():
+            data = _decoded_bytes(fh.read(), self.chunk_size)
+            metrics.incr("source_bytes_read", len(data))
+            yield filename, data
+
+    def _iter_tar_members(self):
+        logger.info("reading archive sequentially", path=self.path)
+        with tarfile.open(self.path, "r|*") as archive:
+            for info in archive:
+                name = _member_name(info.name)
+                if info.isfile() and not _hidden(name):
+                    yield name, archive.extractfile(info)
+
+    def close(self):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+            if self._mapped is not None:
+                self._mapped.close()
+                self._mapped = None
+            self._members = None
@@ -1,13 +1,23 @@
 # src/logger/custom_logger.py
 
 import os
+import queue
+import atexit
 import logging
+import threading
+import multiprocessing
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 import structlog
 
 
 class CustomLogger:
     _initialized = False   # prevent multiple setups
+    _listener = None       # background thread doing the actual file/console I/O
+    _handlers = ()         # console + file handlers, shared by both listeners
+    _worker_queue = None   # multiprocessing queue fed by worker processes
+    _worker_listener = None
+    _worker_lock = threading.Lock()
 
     def __init__(self, log_dir="logs"):
         self.logs_dir = os.path.join(os.getcwd(), log_dir)
@@ -16,6 +26,11 @@ class CustomLogger:
         log_file = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
         self.log_file_path = os.path.join(self.logs_dir, log_file)
 
+        # LOG_LEVEL=DEBUG enables per-biomarker detail events
+        self.level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+        if not isinstance(self.level, int):
+            self.level = logging.INFO
+
     def get_logger(self, name="cardio_ingestion"):
         if not CustomLogger._initialized:
             self._configure()
@@ -23,23 +38,50 @@ class CustomLogger:
 
         return structlog.get_logger(name)
 
-    def _configure(self):
-        file_handler = logging.FileHandler(self.log_file_path)
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(logging.Formatter("%(message)s"))
+    @classmethod
+    def flush(cls):
+        """
+        Block until every queued record has been written.
+        Call before the process may be frozen (end of a Lambda invocation).
+        """
+        for listener in (cls._worker_listener, cls._listener):
+            if listener is not None:
+                listener.stop()      # drains the queue, joins the thread
+                listener.start()
 
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(logging.Formatter("%(message)s"))
+    # ----------------------------------------------------------------------
+    # Worker processes: records travel back to the parent's handlers
+    # ----------------------------------------------------------------------
+    @classmethod
+    def worker_queue(cls, context):
+        """
+        Queue for configure_worker() in child processes of `context`
+        (a multiprocessing context), drained into this process's console
+        and file handlers by a second listener thread.
+        """
+        with cls._worker_lock:
+            if cls._worker_queue is None:
+                cls._worker_queue = context.Queue()
+                cls._worker_listener = QueueListener(
+                    cls._worker_queue, *cls._handlers, respect_handler_level=True
+                )
+                cls._worker_listener.start()
+                atexit.register(cls._worker_listener.stop)
+            return cls._worker_queue
 
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(message)s",
-            handlers=[console_handler, file_handler]
-        )
+    @staticmethod
+    def configure_worker(log_queue):
+        """Send this worker process's records to the parent's worker_queue()."""
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(QueueHandler(log_queue))
 
+    def _configure(self):
         structlog.configure(
             processors=[
+                # drop disabled levels before any timestamping / rendering
+                structlog.stdlib.filter_by_level,
                 structlog.processors.TimeStamper(fmt="iso", utc=True, key="timestamp"),
                 structlog.processors.add_log_level,
                 structlog.processors.EventRenamer(to="event"),
@@ -49,6 +91,34 @@ class CustomLogger:
             cache_logger_on_first_use=True,
         )
 
+        if multiprocessing.current_process().name != "MainProcess":
+            # worker process: no log file or listener of its own, records
+            # are shipped to the parent by configure_worker()
+            logging.getLogger().setLevel(self.level)
+            return
+        file_handler = logging.FileHandler(self.log_file_path)
+        file_handler.setLevel(self.level)
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(self.level)
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        # ingestion threads only enqueue; the listener thread does the I/O
+        log_queue = queue.SimpleQueue()
+        CustomLogger._handlers = (console_handler, file_handler)
+        CustomLogger._listener = QueueListener(
+            log_queue, *CustomLogger._handlers, respect_handler_level=True
+        )
+        CustomLogger._listener.start()
+        atexit.register(CustomLogger._listener.stop)
+
+        logging.basicConfig(
+            level=self.level,
+            format="%(message)s",
+            handlers=[QueueHandler(log_queue)]
+        )
+
 
 # if __name__ == "__main__":
 #     logger = CustomLogger().get_logger(__file__)
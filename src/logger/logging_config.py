@@ -1,5 +1,41 @@
 # src/logger/logging_config.py
 
+import os
+import random
+import logging
+import contextvars
 from src.logger.custom_logger import CustomLogger
 
 logger = CustomLogger().get_logger("cardio_ingestion")
+
+# fraction of samples whose per-biomarker detail is logged at INFO
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0"))
+
+_detail_sampled = contextvars.ContextVar("detail_sampled", default=False)
+
+
+def flush_logs():
+    CustomLogger.flush()
+
+
+def sample_detail() -> bool:
+    """
+    Decide once per sample whether its per-biomarker events are logged at
+    INFO (sampled) or only at DEBUG. Applies to the current thread/context.
+    """
+    sampled = LOG_SAMPLE_RATE > 0 and random.random() < LOG_SAMPLE_RATE
+    _detail_sampled.set(sampled)
+    return sampled
+
+
+def detail_enabled() -> bool:
+    """True when per-biomarker events would be emitted at all."""
+    return _detail_sampled.get() or logging.getLogger("cardio_ingestion").isEnabledFor(logging.DEBUG)
+
+
+def log_detail(event: str, **fields):
+    """Per-biomarker event: INFO for sampled samples, DEBUG otherwise."""
+    if _detail_sampled.get():
+        logger.info(event, **fields)
+    else:
+        logger.debug(event, **fields)
@@ -0,0 +1,265 @@
+# src/orchestration/batch_pipeline.py
+
+import queue
+import threading
+from src.utils.metrics import metrics
+from src.logger.logging_config import logger
+
+
+_DONE = object()   # end-of-stream sentinel
+
+
+class SkipItem(Exception):
+    """
+    Raised by a stage to stop an item without failing it
+    (e.g. an unchanged sample that needs no reprocessing).
+    """
+
+
+class Stage:
+    """
+    One pipeline stage: `func(item) -> item` run by `workers` threads.
+
+    With batch_size > 1 the stage receives lists: each worker collects
+    up to batch_size items (or whatever arrived within max_wait seconds)
+    and calls `func([item, ...])` once. The last stage is a sink and its
+    return value is ignored; any other batched stage returns one output
+    per input, in order, where an exception instance (e.g. SkipItem)
+    drops that item as if it had been raised for it alone.
+    """
+
+    def __init__(self, name: str, func, workers: int = 1, batch_size: int = 1, max_wait: float = 1.0):
+        self.name = name
+        self.func = func
+        self.workers = max(int(workers), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self.max_wait = float(max_wait)
+
+
+class BatchResult:
+    """
+    Outcome of a batch run. Per-file errors are recorded, never raised.
+    """
+
+    def __init__(self):
+        self.succeeded = []
+        self.skipped = []
+        self.failed = {}
+        self._lock = threading.Lock()
+
+    def record_success(self, key):
+        with self._lock:
+            self.succeeded.append(key)
+
+    def record_skipped(self, key):
+        with self._lock:
+            self.skipped.append(key)
+
+    def record_failure(self, key, stage: str, error: Exception):
+        with self._lock:
+            self.failed[key] = {"stage": stage, "error": str(error)}
+
+    def merge(self, other: "BatchResult"):
+        """Fold another run's outcome into this one (e.g. checkpointed chunks)."""
+        with self._lock:
+            self.succeeded.extend(other.succeeded)
+            self.skipped.extend(other.skipped)
+            self.failed.update(other.failed)
+
+    def to_dict(self) -> dict:
+        return {
+            "total": len(self.succeeded) + len(self.skipped) + len(self.failed),
+            "succeeded": len(self.succeeded),
+            "skipped": len(self.skipped),
+            "failed": len(self.failed),
+            "errors": dict(self.failed),
+        }
+
+
+class BatchPipeline:
+    """
+    Streams keys through a chain of stages connected by bounded queues.
+
+    - every stage runs its own worker threads, so S3/DB I/O overlaps with
+      validation and normalization
+    - queues are bounded (queue_size), so at most a fixed number of
+      payloads is in memory regardless of batch size
+    - an exception in any stage is recorded against the key and the item
+      is dropped; the rest of the batch continues
+    - a stage raising SkipItem drops the item and records it as skipped
+    """
+
+    def __init__(self, stages: list, queue_size: int = 32):
+        self.stages = stages
+        self.queue_size = max(int(queue_size), 1)
+
+    def run(self, keys) -> BatchResult:
+        """Run keys through the stages; the first stage receives the key itself."""
+        return self.run_items((key, key) for key in keys)
+
+    def run_items(self, items, source_key: str = "source") -> BatchResult:
+        """
+        Run (key, payload) pairs through the stages; errors are recorded per key.
+        If the items iterator itself fails (S3 listing, malformed stream),
+        the failure is recorded under source_key and the items already fed
+        still complete. An Exception yielded as a payload (e.g. a malformed
+        NDJSON line) is recorded as that key's failure and not fed.
+        """
+        result = BatchResult()
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            is_last = index + 1 == len(self.stages)
+            out_queue = None if is_last else queues[index + 1]
+            downstream_workers = 0 if is_last else self.stages[index + 1].workers
+
+            for worker_no in range(stage.workers):
+                t = threading.Thread(
+                    target=self._worker,
+                    args=(stage, queues[index], out_queue,
+                          remaining, lock, downstream_workers, result),
+                    name=f"{stage.name}-{worker_no}",
+                    daemon=True
+                )
+                t.start()
+                threads.append(t)
+
+        # feed items into the first queue (blocks when the pipeline is full)
+        try:
+            for key, payload in items:
+                if isinstance(payload, Exception):
+                    logger.error("batch item failed", stage="source", key=key, error=str(payload))
+                    result.record_failure(key, "source", payload)
+                    continue
+                queues[0].put((key, payload))
+
+        except Exception as e:
+            logger.error("batch source failed", key=source_key, error=str(e))
+            result.record_failure(source_key, "source", e)
+
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+
+        for t in threads:
+            t.join()
+
+        summary = result.to_dict()
+        logger.info(
+            "batch pipeline finished",
+            total=summary["total"],
+            succeeded=summary["succeeded"],
+            skipped=summary["skipped"],
+            failed=summary["failed"]
+        )
+        return result
+
+    # ----------------------------------------------------------------------
+    # Worker loop
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _worker(stage, in_queue, out_queue, remaining, lock, downstream_workers, result):
+        is_last = out_queue is None
+
+        if stage.batch_size > 1:
+            BatchPipeline._batch_worker(stage, in_queue, out_queue, remaining, lock, downstream_workers, result)
+            return
+
+        while True:
+            item = in_queue.get()
+
+            if item is _DONE:
+                with lock:
+                    remaining[0] -= 1
+                    last_worker = remaining[0] == 0
+                # last worker of this stage closes the next stage
+                if last_worker and not is_last:
+                    for _ in range(downstream_workers):
+                        out_queue.put(_DONE)
+                return
+
+            key, payload = item
+            try:
+                with metrics.timer(f"pipeline_{stage.name}"):
+                    output = stage.func(payload)
+            except SkipItem as e:
+                logger.info("batch item skipped", stage=stage.name, key=key, reason=str(e))
+                result.record_skipped(key)
+                continue
+            except Exception as e:
+                logger.error("batch item failed", stage=stage.name, key=key, error=str(e))
+                result.record_failure(key, stage.name, e)
+                continue
+
+            if is_last:
+                result.record_success(key)
+            else:
+                out_queue.put((key, output))
+
+    @staticmethod
+    def _batch_worker(stage, in_queue, out_queue, remaining, lock, downstream_workers, result):
+        is_last = out_queue is None
+        done = False
+
+        while not done:
+            keys, payloads = [], []
+
+            # block for the first item, then top up until full or max_wait
+            item = in_queue.get()
+            while True:
+                if item is _DONE:
+                    done = True
+                    break
+
+                keys.append(item[0])
+                payloads.append(item[1])
+                if len(payloads) >= stage.batch_size:
+                    break
+
+                try:
+                    item = in_queue.get(timeout=stage.max_wait)
+                except queue.Empty:
+                    break
+
+            if payloads:
+                BatchPipeline._run_chunk(stage, keys, payloads, out_queue, result)
+
+        # only after the final chunk is forwarded, or it could trail the sentinels
+        with lock:
+            remaining[0] -= 1
+            last_worker = remaining[0] == 0
+
+        # last worker of this stage closes the next stage
+        if last_worker and not is_last:
+            for _ in range(downstream_workers):
+                out_queue.put(_DONE)
+
+    @staticmethod
+    def _run_chunk(stage, keys, payloads, out_queue, result):
+        try:
+            with metrics.timer(f"pipeline_{stage.name}"):
+                outputs = stage.func(payloads)
+        except Exception as e:
+            logger.error("batch chunk failed", stage=stage.name, size=len(keys), error=str(e))
+            for key in keys:
+                result.record_failure(key, stage.name, e)
+            return
+
+        if out_queue is None:
+            for key in keys:
+                result.record_success(key)
+            return
+
+        for key, output in zip(keys, outputs):
+            if isinstance(output, SkipItem):
+                logger.info("batch item skipped", stage=stage.name, key=key, reason=str(output))
+                result.record_skipped(key)
+            elif isinstance(output, Exception):
+                logger.error("batch item failed", stage=stage.name, key=key, error=str(output))
+                result.record_failure(key, stage.name, output)
+            else:
+                out_queue.put((key, output))
@@ -1,62 +1,451 @@
 # src/orchestration/ingestion_orchestrator.py
-from src.ingestion.raw_loader import RawLoader
-from src.schemas.raw_input_schema import RawInputSchema
-from src.utils.id_generator import trace_id_generator
+from src.ingestion.sources import open_source
 from src.canonicalizer.name_mapper import NameMapper
 from src.canonicalizer.unit_conversion import UnitConversionEngine
 from src.qc.quality_check import QCEngine
 from src.repository.sample_repository import SampleRepository
+from src.repository.rule_store import RuleStore
+from src.orchestration.sample_processor import SampleProcessor
+from src.schemas.biomarker_record import envelope_to_dict
+from src.orchestration.batch_pipeline import BatchPipeline, BatchResult, Stage, SkipItem
+from src.utils.metrics import metrics
 
 from src.logger.logging_config import logger
+from src.config.flags import config_flag
 
 
 class IngestionOrchestrator:
-    def __init__(self, config):
+    def __init__(self, config, loader=None, rule_store=None, sample_repo=None):
+        """
+        loader / rule_store / sample_repo: optional pre-built components
+        (e.g. offline stand-ins for benchmarks); built from config otherwise.
+
+        Config keys (optional):
+            RULES_REFRESH_MODE  "poll" (default): refresh_rules_if_due() is
+                                called between runs (e.g. per Lambda invocation);
+                                "background": a daemon thread polls every
+                                RULES_REFRESH_INTERVAL_SECONDS
+            INGESTION_SOURCE    "s3" (default), "local" or "archive" (see
+                                src.ingestion.sources)
+            DRY_RUN             persist nothing: envelopes (and diffs against
+                                DRY_RUN_BASELINE_DIR) go to DRY_RUN_OUTPUT_DIR
+                                (see DryRunSink); rules come from
+                                RULE_SNAPSHOT_PATH without a database when set
+            BATCH_SINK          "parquet": multi-sample runs only export (see
+                                run_batch); no SampleRepository is built and
+                                the idempotency skip is off, so every sample
+                                is exported
+        """
         self.config = config
-        self.loader = RawLoader(config)
-        self.canonicalizer = NameMapper(config)
-        self.unit_converter = UnitConversionEngine(config)
-        self.qc_engine = QCEngine(config)
-        self.sample_repo = SampleRepository(config)
+        self.loader = loader or open_source(config)
+        self.dry_run = config_flag(config, "DRY_RUN")
 
-    def run(self, filename: str):
+        if rule_store is None and self.dry_run and config.get("RULE_SNAPSHOT_PATH"):
+            rule_store = RuleStore.from_snapshot_file(config, config["RULE_SNAPSHOT_PATH"])
+        if sample_repo is None and self.dry_run:
+            # deferred: only dry runs write local outputs
+            from src.repository.dry_run_sink import DryRunSink
+            sample_repo = DryRunSink(config)
 
-        raw_data = self.loader.load_from_s3(filename)
+        # dry runs persist nothing, exports included
+        self.batch_sink = "db" if self.dry_run else config.get("BATCH_SINK", "db")
+        if self.batch_sink not in ("db", "parquet", "both"):
+            raise ValueError(f"unknown BATCH_SINK: {self.batch_sink}")
+        self.export_only = self.batch_sink == "parquet"
 
-        # 2. Validate payload
-        validated_model = RawInputSchema(**raw_data)
-        validated = validated_model.dict()
+        # one rule bootstrap shared by all engines
+        self.rule_store = rule_store or RuleStore(config)
+        self.canonicalizer = NameMapper(config, self.rule_store)
+        self.unit_converter = UnitConversionEngine(config, self.rule_store)
+        self.qc_engine = QCEngine(config, self.rule_store)
+        if sample_repo is None and not self.export_only:
+            sample_repo = SampleRepository(config)
+        self.sample_repo = sample_repo
 
-        # 3. Attach trace_id
-        validated["trace_id"] = trace_id_generator()
+        self.processor = SampleProcessor(self.canonicalizer, self.unit_converter, self.qc_engine,
+                                         rule_store=self.rule_store)
 
-        # 4. Canonicalize biomarker names
-        biomarkers = validated["biomarkers"]
-        canonical_biomarkers = []
+        # skip samples whose input and rules version are already stored
+        self.idempotent = config_flag(config, "IDEMPOTENCY_ENABLED", True) and not self.export_only
 
-        for raw_name, value in biomarkers.items():
-            canonical_name = self.canonicalizer.map_name(raw_name)
+        # long-running workers pick up rule changes without a restart
+        if config.get("RULES_REFRESH_MODE") == "background":
+            self.rule_store.start_refresh_poller()
 
-            if canonical_name is None:
-                # DROP biomarker cleanly
-                logger.warning("biomarker dropped (no canonical mapping found)", raw_name=raw_name)
-                continue
-            value['canonical_name'] = canonical_name
-            canonical_biomarkers.append(value)
+    def refresh_rules_if_due(self) -> bool:
+        """
+        Poll the rules version (at most every RULES_REFRESH_INTERVAL_SECONDS)
+        and swap in rebuilt rules if they changed. Called between runs;
+        in-flight samples keep the snapshot they pinned.
+        """
+        return self.rule_store.refresh_if_due()
 
-        validated["biomarkers"] = canonical_biomarkers
+    def close(self):
+        self.rule_store.stop_refresh_poller()
+        if hasattr(self.loader, "close"):
+            self.loader.close()
 
-        # 5. Unit conversion (VALUE + UNIT ONLY)
-        normalized_biomarkers = self.unit_converter.normalize_all(canonical_biomarkers)
-        validated["biomarkers"] = normalized_biomarkers
+    def run(self, filename: str):
+        """
+        Ingest one file. Returns the structured envelope, or None when the
+        same input was already ingested under the current rules.
+        """
+        if self.sample_repo is None:
+            raise ValueError("BATCH_SINK=parquet only exports multi-sample runs "
+                             "(run_batch / run_stream / run_replay)")
+        try:
+            with metrics.timer("sample_total"):
+                return self._run(filename)
+        finally:
+            self._finish_run()
 
-        # 6. QC VALIDATION
-        validated["biomarkers"], qc_summary = self.qc_engine.run_qc(validated["biomarkers"])
-        validated["qc_summary"] = qc_summary
+    def _run(self, filename: str):
+        raw_bytes = self.loader.load_bytes(filename)
+
+        # 2-6. Validate (straight from bytes), canonicalize, convert, QC
+        try:
+            validated = self._process_if_changed(raw_bytes)
+        except SkipItem as e:
+            logger.info("sample unchanged, ingestion skipped", filename=filename, reason=str(e))
+            return None
 
         # 7. load the sample
         self.sample_repo.save_structured_sample(validated)
 
         logger.info("payload validated successfully", user_id=validated['user_id'], trace_id=validated['trace_id'], sample_id=validated['sample_id'])
 
-        return validated
+        return envelope_to_dict(validated)
+
+    def _process_if_changed(self, raw_data) -> dict:
+        """
+        Validate and fingerprint the input; raise SkipItem before any
+        normalization work if the stored row has the same fingerprint.
+        """
+        output = self._process_chunk([raw_data])[0]
+        if isinstance(output, Exception):
+            raise output
+        return output
+
+    def _process_chunk(self, raw_payloads: list) -> list:
+        """
+        _process_if_changed() for a chunk of payloads, with one stored-hash
+        lookup for the whole chunk. Returns one envelope per payload, or
+        the exception (SkipItem for unchanged samples) that dropped it.
+        Fingerprints and envelopes share one pinned rules version.
+        """
+        with self.processor.pinned_rules():
+            return self._process_chunk_pinned(raw_payloads)
+
+    def _process_chunk_pinned(self, raw_payloads: list) -> list:
+        fingerprints = []
+        for raw_data in raw_payloads:
+            try:
+                fingerprints.append(self.processor.fingerprint(raw_data))
+            except Exception as e:
+                fingerprints.append(e)
+
+        stored = {}
+        if self.idempotent:
+            stored = self.sample_repo.get_input_hashes([
+                fingerprint[0].sample_id for fingerprint in fingerprints
+                if not isinstance(fingerprint, Exception) and fingerprint[1] is not None
+            ])
+
+        outputs = []
+        for fingerprint in fingerprints:
+            if isinstance(fingerprint, Exception):
+                outputs.append(fingerprint)
+                continue
+
+            model, input_hash = fingerprint
+            if input_hash is not None and stored.get(model.sample_id) == input_hash:
+                metrics.incr("samples_skipped")
+                outputs.append(SkipItem(f"sample {model.sample_id} unchanged"))
+                continue
+
+            try:
+                outputs.append(self.processor.process(model, input_hash))
+            except Exception as e:
+                outputs.append(e)
+
+        return outputs
+
+    def _process_stage(self) -> Stage:
+        """
+        Thread-mode process stage: chunks of BATCH_PROCESS_CHUNK_SIZE
+        payloads (default 32), one idempotency lookup per chunk.
+        """
+        return Stage("process", self._process_chunk,
+                     self.config.get("BATCH_PROCESS_WORKERS", 2),
+                     batch_size=self.config.get("BATCH_PROCESS_CHUNK_SIZE", 32),
+                     max_wait=0.05)
+
+    # ----------------------------------------------------------------------
+    # Batch mode: fetch → validate/normalize → persist, each stage with its
+    # own workers, connected by bounded queues
+    # ----------------------------------------------------------------------
+    def run_batch(self, filenames):
+        """
+        Ingest many files concurrently.
+        Per-file errors are recorded in the returned BatchResult and never
+        abort the batch.
+
+        Config keys (all optional):
+            BATCH_EXECUTION_MODE  "thread" (default) or "process" to run
+                                  validation/normalization on all cores
+            BATCH_FETCH_WORKERS   (default 8)
+            BATCH_PROCESS_WORKERS (default 2; ignored in process mode)
+            BATCH_PROCESS_CHUNK_SIZE payloads per process call and per
+                                  idempotency lookup (default 32; thread mode)
+            BATCH_PERSIST_WORKERS (default 2, keep <= DB_POOL_MAX_SIZE)
+            BATCH_QUEUE_SIZE      (default 32)
+            DB_WRITE_BATCH_SIZE   samples per upsert transaction (default 100)
+            BATCH_SINK            "db" (default), "parquet" (ParquetExportSink
+                                  only, every sample exported) or "both" (DB
+                                  write, then export); also run_stream / run_replay
+            IDEMPOTENCY_ENABLED   skip unchanged inputs (default True); in
+                                  process mode unchanged rows are only
+                                  detected at write time
+            PROCESS_POOL_SHARD_SIZE payloads per worker-process task
+                                  (default 16; process mode)
+        """
+        process_pool = self._open_process_pool()
+        try:
+            return self._run_batch(filenames, process_pool)
+        finally:
+            if process_pool is not None:
+                process_pool.close()
+
+    def _open_process_pool(self, current=None):
+        """
+        ProcessPoolNormalizer in process mode, else None. `current` is kept
+        while the rule snapshot it was started with is still current.
+        """
+        if self.config.get("BATCH_EXECUTION_MODE", "thread") != "process":
+            return None
+
+        snapshot = self.rule_store.snapshot
+        if current is not None:
+            if current.snapshot is snapshot:
+                return current
+            current.close()
+
+        # deferred: pulls in multiprocessing + numpy only when used
+        from src.orchestration.process_pool import ProcessPoolNormalizer
+        return ProcessPoolNormalizer(self.config, snapshot)
+
+    def _run_batch(self, filenames, process_pool):
+        export = self._open_export()
+
+        if process_pool is not None:
+            # two feeder threads per worker process keep every core busy,
+            # each shipping PROCESS_POOL_SHARD_SIZE payloads per task
+            process_stage = Stage("process", process_pool.process_shard, process_pool.workers * 2,
+                                  batch_size=process_pool.shard_size, max_wait=0.05)
+        else:
+            process_stage = self._process_stage()
+
+        pipeline = BatchPipeline(
+            stages=[
+                Stage("fetch", self.loader.load_bytes,
+                      self.config.get("BATCH_FETCH_WORKERS", 8)),
+                process_stage,
+                self._persist_stage(export),
+            ],
+            queue_size=self.config.get("BATCH_QUEUE_SIZE", 32)
+        )
+
+        try:
+            with metrics.timer("batch_total"):
+                return pipeline.run(filenames)
+        finally:
+            if export is not None:
+                export.close()
+            self._finish_run()
+
+    def _open_export(self):
+        """ParquetExportSink for this run when BATCH_SINK includes parquet."""
+        if self.batch_sink == "db":
+            return None
+
+        # deferred: pyarrow is only needed when exporting
+        from src.repository.parquet_export import ParquetExportSink
+
+        snapshot = self.rule_store.snapshot
+        return ParquetExportSink(
+            self.config,
+            set(snapshot.alias_map.values()) | snapshot.all_expected_biomarkers
+        )
+
+    def _persist_stage(self, export) -> Stage:
+        batch_size = self.sample_repo.batch_size if self.sample_repo is not None \
+            else self.config.get("DB_WRITE_BATCH_SIZE", 100)
+        return Stage("persist", self._persist_func(export),
+                     self.config.get("BATCH_PERSIST_WORKERS", 2),
+                     batch_size=batch_size)
+
+    def _persist_func(self, export):
+        if export is None:
+            return self.sample_repo.save_structured_samples
+        if self.export_only:
+            return export.save_structured_samples
+
+        def persist_and_export(batch):
+            # export only what the database accepted
+            report = self.sample_repo.save_structured_samples(batch)
+            export.save_structured_samples(batch)
+            return report
+
+        return persist_and_export
+
+    def run_stream(self, filename: str):
+        """
+        Ingest a multi-sample export (NDJSON or JSON array) one sample at a
+        time: samples are streamed from S3 straight into the process and
+        persist stages, so memory is bounded by the queue sizes rather than
+        the export size. Failed samples are recorded as "<filename>#<n>",
+        including malformed NDJSON lines (the error names the line number).
+        """
+        export = self._open_export()
+        pipeline = BatchPipeline(
+            stages=[
+                self._process_stage(),
+                self._persist_stage(export),
+            ],
+            queue_size=self.config.get("BATCH_QUEUE_SIZE", 32)
+        )
+
+        samples = self.loader.iter_samples(filename)
+        try:
+            with metrics.timer("stream_total"):
+                return pipeline.run_items(
+                    ((f"{filename}#{n}", raw_data) for n, raw_data in enumerate(samples)),
+                    source_key=filename
+                )
+        finally:
+            if export is not None:
+                export.close()
+            self._finish_run()
+
+    def run_replay(self):
+        """
+        Re-ingest everything the source holds, e.g. a local directory or
+        archive of historical payloads (INGESTION_SOURCE), usually with
+        DRY_RUN to validate a rule change against the corpus.
+
+        Sources that read best front to back (iter_payloads(), e.g.
+        compressed tarballs) feed their payloads straight into the process
+        stage; every other source is fetched through run_prefix().
+        """
+        if not hasattr(self.loader, "iter_payloads"):
+            return self.run_prefix()
+
+        export = self._open_export()
+        pipeline = BatchPipeline(
+            stages=[
+                self._process_stage(),
+                self._persist_stage(export),
+            ],
+            queue_size=self.config.get("BATCH_QUEUE_SIZE", 32)
+        )
+
+        try:
+            with metrics.timer("replay_total"):
+                return pipeline.run_items(self.loader.iter_payloads(), source_key=self.loader.prefix)
+        finally:
+            if export is not None:
+                export.close()
+            self._finish_run()
+
+    def _finish_run(self):
+        self._export_metrics()
+        if self.dry_run and hasattr(self.sample_repo, "write_summary"):
+            self.sample_repo.write_summary()
+
+    # ----------------------------------------------------------------------
+    # Metrics: per-stage latency, DB round trips, S3 bytes, rule hit rates
+    # ----------------------------------------------------------------------
+    def metrics_snapshot(self) -> dict:
+        return metrics.snapshot()
+
+    def _export_metrics(self):
+        """
+        Config keys (optional):
+            METRICS_OUTPUT_PATH  file to (over)write after every run; "-" = stdout
+            METRICS_FORMAT       "prometheus" (default, cumulative) or "emf"
+                                 (CloudWatch; counters reset after each export)
+        """
+        path = self.config.get("METRICS_OUTPUT_PATH")
+        if not path:
+            return
+
+        fmt = self.config.get("METRICS_FORMAT", "prometheus")
+        try:
+            metrics.write(path, fmt)
+        except (OSError, ValueError) as e:
+            logger.error("metrics export failed", path=path, format=fmt, error=str(e))
+            return
+
+        if fmt == "emf":
+            metrics.reset()
+
+    def run_prefix(self):
+        """Ingest every object under S3_INPUT_PREFIX (or in the configured source)."""
+        return self.run_batch(self.loader.list_keys())
+
+    def run_incremental(self):
+        """
+        Ingest only the objects under S3_INPUT_PREFIX that are new or
+        changed (ETag / LastModified) since they were last ingested.
+
+        The listing is streamed in chunks of INGESTION_CHECKPOINT_SIZE
+        objects (default 500); after each chunk, succeeded and skipped
+        objects are checkpointed to the manifest. Failed objects are not,
+        so they are retried by the next run, as is everything after an
+        interruption. Dry runs read the manifest but never record to it.
+        """
+        from src.ingestion.manifest import open_manifest
+
+        manifest = open_manifest(self.config, self.loader.bucket, self.loader.prefix)
+        ingested = manifest.load()
+        checkpoint_size = max(int(self.config.get("INGESTION_CHECKPOINT_SIZE", 500)), 1)
+
+        result = BatchResult()
+        listed = unchanged = 0
+        # one worker-process pool for the whole run, not one per chunk
+        process_pool = None
+
+        def ingest(chunk):
+            nonlocal process_pool
+            process_pool = self._open_process_pool(process_pool)
+            chunk_result = self._run_batch([obj.filename for obj in chunk], process_pool)
+            done = set(chunk_result.succeeded) | set(chunk_result.skipped)
+            if not self.dry_run:
+                manifest.record([obj for obj in chunk if obj.filename in done])
+            result.merge(chunk_result)
+            logger.info("incremental checkpoint", objects=len(chunk), recorded=0 if self.dry_run else len(done),
+                        failed=len(chunk_result.failed), dry_run=self.dry_run)
+
+        chunk = []
+        try:
+            for obj in self.loader.list_objects():
+                listed += 1
+                if ingested.get(obj.filename) == obj.fingerprint:
+                    unchanged += 1
+                    continue
+
+                chunk.append(obj)
+                if len(chunk) >= checkpoint_size:
+                    ingest(chunk)
+                    chunk = []
+
+            if chunk:
+                ingest(chunk)
+        finally:
+            if process_pool is not None:
+                process_pool.close()
+
+        metrics.incr("incremental_unchanged_objects", unchanged)
+        logger.info("incremental run complete", listed=listed, unchanged=unchanged,
+                    succeeded=len(result.succeeded), skipped=len(result.skipped), failed=len(result.failed))
+        return result
@@ -0,0 +1,113 @@
+# src/orchestration/process_pool.py
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from src.canonicalizer.name_mapper import NameMapper
+from src.canonicalizer.unit_conversion import UnitConversionEngine
+from src.canonicalizer.columnar_conversion import ColumnarUnitConversionEngine
+from src.qc.quality_check import QCEngine
+from src.repository.rule_store import RuleStore, RuleSnapshot
+from src.orchestration.sample_processor import SampleProcessor
+from src.schemas.biomarker_record import envelope_to_dict
+from src.logger.custom_logger import CustomLogger
+from src.logger.logging_config import logger
+
+
+# ----------------------------------------------------------------------
+# Worker-side state: built once per process from the shipped snapshot
+# ----------------------------------------------------------------------
+_worker_processor = None
+
+
+def _init_worker(config: dict, snapshot: RuleSnapshot, log_queue):
+    global _worker_processor
+
+    CustomLogger.configure_worker(log_queue)
+
+    rule_store = RuleStore(config, snapshot=snapshot)
+    _worker_processor = SampleProcessor(
+        NameMapper(config, rule_store),
+        UnitConversionEngine(config, rule_store),
+        QCEngine(config, rule_store),
+        ColumnarUnitConversionEngine(config, rule_store),
+        rule_store=rule_store
+    )
+
+
+# envelopes leave the worker as plain dicts: they pickle smaller than records
+def _process_payload(raw_data) -> dict:
+    try:
+        return envelope_to_dict(_worker_processor.process(raw_data))
+    except Exception as e:
+        # returned, not raised: one bad payload must not fail its shard, and
+        # library exceptions (e.g. pydantic's) do not always pickle
+        return ValueError(f"{type(e).__name__}: {e}")
+
+
+def _process_shard(raw_payloads: list) -> list:
+    try:
+        return [envelope_to_dict(envelope) for envelope in _worker_processor.process_batch(raw_payloads)]
+    except Exception:
+        # redo one by one, so only the bad payloads fail
+        return [_process_payload(raw_data) for raw_data in raw_payloads]
+
+
+class ProcessPoolNormalizer:
+    """
+    Multi-core execution of the CPU-bound part of ingestion
+    (schema validation, canonicalization, unit conversion, QC).
+
+    Each worker process receives the read-only RuleSnapshot once at
+    startup and never touches the database; finished envelopes are
+    returned to the parent for persistence.
+
+    Workers are spawned, not forked: a forked child would inherit the
+    parent's threads' locks but not its log listener thread. Their log
+    records are sent back over a queue and written by the parent.
+
+    Payloads travel in shards (one task per shard), and each shard is
+    unit-converted in one columnar pass inside its worker.
+
+    Config keys (all optional):
+        PROCESS_POOL_WORKERS    worker processes (default: os.cpu_count())
+        PROCESS_POOL_SHARD_SIZE payloads shipped per task (default 16)
+    """
+
+    def __init__(self, config: dict, snapshot: RuleSnapshot):
+        self.workers = int(config.get("PROCESS_POOL_WORKERS") or os.cpu_count() or 1)
+        self.shard_size = max(int(config.get("PROCESS_POOL_SHARD_SIZE", 16)), 1)
+        self.snapshot = snapshot
+
+        # workers only need the rule snapshot, never DB credentials
+        worker_config = {
+            key: value for key, value in config.items()
+            if not key.startswith("RDS_")
+        }
+
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(worker_config, snapshot, CustomLogger.worker_queue(context))
+        )
+
+        logger.info("process pool started", workers=self.workers, shard_size=self.shard_size)
+
+    def process_shard(self, raw_payloads: list) -> list:
+        """
+        Normalize one shard in a worker process (blocks the caller thread).
+        Returns one envelope per payload, in order, or the exception that
+        failed it (a batched pipeline stage).
+        """
+        return self._executor.submit(_process_shard, list(raw_payloads)).result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,71 @@
+# src/orchestration/replay.py
+"""
+Replay a local corpus (directory, .zip or .tar[.gz]) through the pipeline.
+
+    # baseline with the current rules, then the candidate rules, diffed
+    python -m src.orchestration.replay corpus.tar.gz --output out/current \
+        --rules current.snapshot
+    python -m src.orchestration.replay corpus.tar.gz --output out/candidate \
+        --rules candidate.snapshot --baseline out/current
+
+--output makes the run a dry run (DryRunSink: nothing is persisted).
+With --rules the run is fully offline; otherwise rules and, without
+--output, the database come from the ingestion config (or --config).
+"""
+
+import os
+import sys
+import json
+import argparse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a local corpus through the ingestion pipeline.")
+    parser.add_argument("source", help="directory, .zip or .tar[.gz|.bz2|.xz] of raw payloads")
+    parser.add_argument("--output", help="dry run: write envelopes / diffs / summary here")
+    parser.add_argument("--baseline", help="earlier --output directory to diff against")
+    parser.add_argument("--rules", help="compiled rule snapshot file (no database needed)")
+    parser.add_argument("--config", help="JSON file of config keys (default: ingestion config)")
+    parser.add_argument("--workers", type=int, help="BATCH_PROCESS_WORKERS")
+    args = parser.parse_args(argv)
+
+    if args.baseline and not args.output:
+        parser.error("--baseline requires --output")
+    if not args.output and args.rules:
+        parser.error("--rules requires --output (offline runs are dry runs)")
+
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as fh:
+            config = json.load(fh)
+    elif args.rules:
+        config = {}
+    else:
+        from src.config.config_loader import get_ingestion_config
+        config = get_ingestion_config()
+
+    config["INGESTION_SOURCE"] = "local" if os.path.isdir(args.source) else "archive"
+    config["INGESTION_SOURCE_PATH"] = args.source
+    if args.output:
+        config.update(DRY_RUN=True, DRY_RUN_OUTPUT_DIR=args.output, DRY_RUN_BASELINE_DIR=args.baseline)
+    if args.rules:
+        config["RULE_SNAPSHOT_PATH"] = args.rules
+    if args.workers:
+        config["BATCH_PROCESS_WORKERS"] = args.workers
+
+    from src.orchestration.ingestion_orchestrator import IngestionOrchestrator
+
+    orchestrator = IngestionOrchestrator(config)
+    try:
+        result = orchestrator.run_replay()
+    finally:
+        orchestrator.close()
+
+    report = result.to_dict()
+    if orchestrator.dry_run:
+        report["dry_run"] = orchestrator.sample_repo.summary()
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
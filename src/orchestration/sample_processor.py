@@ -0,0 +1,243 @@
+# src/orchestration/sample_processor.py
+from contextlib import nullcontext
+from src.schemas.raw_input_schema import RawInputSchema, validate_raw_input, validate_raw_batch
+from src.schemas.biomarker_record import BiomarkerRecord
+from src.utils.id_generator import trace_id_generator
+from src.utils.content_hash import input_fingerprint
+from src.utils.metrics import metrics
+from src.logger.logging_config import logger, sample_detail, log_detail
+
+
+class SampleProcessor:
+    """
+    Pure, DB-free transformation of one raw payload into the structured
+    CIS envelope: validate → trace_id → canonicalize → convert → QC.
+    Shared by the single-file and batch ingestion paths.
+
+    Envelope biomarkers are BiomarkerRecords, updated in place by every
+    step; sinks turn them into JSON with envelope_to_dict().
+    """
+
+    def __init__(self, canonicalizer, unit_converter, qc_engine, columnar_converter=None, rule_store=None):
+        self.canonicalizer = canonicalizer
+        self.unit_converter = unit_converter
+        self.qc_engine = qc_engine
+        self.columnar_converter = columnar_converter
+        # optional: stamps rules_version / input_hash on the envelope
+        self.rule_store = rule_store
+
+    @property
+    def rules_version(self):
+        return self.rule_store.snapshot.version if self.rule_store is not None else None
+
+    def pinned_rules(self):
+        """
+        Context in which every engine sees one rule snapshot, even if a
+        rule refresh swaps in a new one meanwhile.
+        """
+        return self.rule_store.pinned() if self.rule_store is not None else nullcontext()
+
+    def fingerprint(self, raw_data):
+        """
+        Validate raw_data and fingerprint it under the current rules.
+        Returns (RawInputSchema, input_hash); input_hash is None for
+        pre-validated models, whose original bytes are gone.
+        """
+        if isinstance(raw_data, RawInputSchema):
+            return raw_data, None
+
+        with metrics.timer("validate"):
+            model = validate_raw_input(raw_data)
+        return model, input_fingerprint(raw_data, self.rules_version)
+
+    def process(self, raw_data, input_hash: str | None = None) -> dict:
+        """
+        raw_data: raw S3 bytes, a parsed dict or an already validated
+        RawInputSchema; bytes are validated directly by pydantic-core.
+        input_hash: fingerprint from fingerprint(), computed here if omitted.
+        """
+        with self.pinned_rules():
+            return self._process(raw_data, input_hash)
+
+    def _process(self, raw_data, input_hash: str | None) -> dict:
+        if input_hash is None and not isinstance(raw_data, RawInputSchema):
+            raw_data, input_hash = self.fingerprint(raw_data)
+
+        stats = {}
+        with metrics.timer("canonicalize"):
+            validated = self._canonicalize(validate_raw_input(raw_data), input_hash, stats)
+
+        # 5. Unit conversion (VALUE + UNIT ONLY)
+        with metrics.timer("convert"):
+            normalized_biomarkers = self.unit_converter.normalize_all(validated["biomarkers"], stats)
+
+        with metrics.timer("qc"):
+            validated = self._quality_check(validated, normalized_biomarkers)
+
+        self._flag_alias_review(validated, stats)
+        return self._log_summary(validated, stats)
+
+    def process_batch(self, raw_payloads) -> list:
+        """
+        Same as process() for many payloads, with unit conversion done by
+        the columnar engine in one vectorized pass when one is configured.
+
+        raw_payloads: a JSON array (bytes/str) or a list of dicts, both
+        validated in one call through the cached batch TypeAdapter, or a
+        list of raw bytes / models validated one by one.
+        The whole batch is processed under one rule snapshot. Envelopes
+        carry input_hash except for models and a JSON array passed as one
+        document, whose per-sample input is not available.
+        """
+        with self.pinned_rules():
+            return self._process_batch(raw_payloads)
+
+    def _process_batch(self, raw_payloads) -> list:
+        if isinstance(raw_payloads, (bytes, bytearray, memoryview, str)):
+            with metrics.timer("validate_batch"):
+                models = validate_raw_batch(raw_payloads)
+            input_hashes = [None] * len(models)
+        elif all(isinstance(raw_data, dict) for raw_data in raw_payloads):
+            with metrics.timer("validate_batch"):
+                models = validate_raw_batch(raw_payloads)
+            rules_version = self.rules_version
+            input_hashes = [input_fingerprint(raw_data, rules_version) for raw_data in raw_payloads]
+        else:
+            models, input_hashes = [], []
+            for raw_data in raw_payloads:
+                model, input_hash = self.fingerprint(raw_data)
+                models.append(model)
+                input_hashes.append(input_hash)
+
+        if self.columnar_converter is None:
+            return [self._process(model, input_hash) for model, input_hash in zip(models, input_hashes)]
+
+        stats_batch = [{} for _ in models]
+        with metrics.timer("canonicalize_batch"):
+            validated_batch = [
+                self._canonicalize(model, input_hash, stats)
+                for model, input_hash, stats in zip(models, input_hashes, stats_batch)
+            ]
+
+        # 5. Unit conversion across the whole batch
+        with metrics.timer("convert_batch"):
+            normalized_batch = self.columnar_converter.normalize_batch(
+                [validated["biomarkers"] for validated in validated_batch],
+                stats_batch
+            )
+
+        # 6. QC across the whole batch (plausibility in one vectorized pass)
+        with metrics.timer("qc_batch"):
+            qc_results = self.qc_engine.run_qc_batch([
+                (normalized_biomarkers, validated.get("metadata"))
+                for validated, normalized_biomarkers in zip(validated_batch, normalized_batch)
+            ])
+
+        for validated, (biomarkers, qc_summary), stats in zip(validated_batch, qc_results, stats_batch):
+            validated["biomarkers"] = biomarkers
+            validated["qc_summary"] = qc_summary
+            self._flag_alias_review(validated, stats)
+            self._log_summary(validated, stats)
+
+        return validated_batch
+
+    # ----------------------------------------------------------------------
+    # Steps 3-4: attach trace_id, canonicalize names
+    # (step 2, validation, happens in validate_raw_input / validate_raw_batch)
+    # ----------------------------------------------------------------------
+    def _canonicalize(self, model: RawInputSchema, input_hash: str | None = None,
+                      stats: dict | None = None) -> dict:
+        # one sampling decision per sample covers all its per-biomarker events
+        sample_detail()
+
+        # 3. Attach trace_id (+ provenance for idempotent re-runs)
+        validated = {
+            "user_id": model.user_id,
+            "sample_id": model.sample_id,
+            "trace_id": trace_id_generator(),
+        }
+        if self.rule_store is not None:
+            validated["rules_version"] = self.rules_version
+        if input_hash is not None:
+            validated["input_hash"] = input_hash
+
+        # 4. Canonicalize biomarker names
+        # read straight from the validated model: no .dict() round trip
+        biomarkers = model.biomarkers
+        canonical_biomarkers = []
+
+        review = {}
+        canonical_names = self.canonicalizer.map_names(list(biomarkers), review)
+        dropped = []
+
+        for raw_name, value in biomarkers.items():
+            canonical_name = canonical_names[raw_name]
+
+            if canonical_name is None:
+                # DROP biomarker cleanly (reported in the sample summary)
+                log_detail("biomarker dropped (no canonical mapping found)", raw_name=raw_name)
+                dropped.append(raw_name)
+                continue
+            canonical_biomarkers.append(
+                BiomarkerRecord(canonical_name, value.raw_value, value.raw_unit, value.is_range, value.comment)
+            )
+
+        validated["biomarkers"] = canonical_biomarkers
+        validated["metadata"] = model.metadata
+
+        if stats is not None:
+            stats["matched"] = len(canonical_biomarkers)
+            stats["dropped"] = dropped
+            stats["alias_review"] = review
+        return validated
+
+    # ----------------------------------------------------------------------
+    # Step 6: QC on the normalized biomarkers
+    # ----------------------------------------------------------------------
+    def _quality_check(self, validated: dict, normalized_biomarkers: list) -> dict:
+        validated["biomarkers"], qc_summary = self.qc_engine.run_qc(normalized_biomarkers, validated.get("metadata"))
+        validated["qc_summary"] = qc_summary
+
+        return validated
+
+    @staticmethod
+    def _flag_alias_review(validated: dict, stats: dict):
+        """
+        Fuzzy alias candidates are not canonical data: their biomarkers are
+        dropped and listed under qc_summary["alias_review"] for a human to
+        confirm (and add to cis_biomarker_alias_map).
+        """
+        review = stats.get("alias_review")
+        if review:
+            validated["qc_summary"]["alias_review"] = [
+                {"raw_name": raw_name, **candidate} for raw_name, candidate in review.items()
+            ]
+
+    # ----------------------------------------------------------------------
+    # One aggregated event per sample instead of one per biomarker
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _log_summary(validated: dict, stats: dict) -> dict:
+        dropped = stats.get("dropped", [])
+        converted = stats.get("converted", 0)
+        unchanged = stats.get("unchanged", 0)
+
+        metrics.incr("samples_processed")
+        metrics.incr("rule_alias_lookups", stats.get("matched", 0), result="hit")
+        metrics.incr("rule_alias_lookups", len(dropped), result="miss")
+        metrics.incr("rule_conversion_lookups", converted, result="hit")
+        metrics.incr("rule_conversion_lookups", unchanged, result="miss")
+
+        (logger.warning if dropped else logger.info)(
+            "sample processed",
+            sample_id=validated["sample_id"],
+            trace_id=validated["trace_id"],
+            matched=stats.get("matched", 0),
+            dropped=len(dropped),
+            dropped_names=dropped,
+            alias_review=len(stats.get("alias_review") or ()),
+            converted=converted,
+            unchanged=unchanged,
+            qc_status=validated["qc_summary"]["overall_status"]
+        )
+        return validated
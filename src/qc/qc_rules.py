@@ -0,0 +1,239 @@
+# src/qc/qc_rules.py
+
+import bisect
+import threading
+import numpy as np
+from src.repository.rule_store import normalize_key
+from src.canonicalizer.unit_graph import normalize_unit
+
+
+_ANY_UNIT = -1        # rule applies regardless of unit
+_UNKNOWN_UNIT = -2    # sample unit not referenced by any rule
+
+
+class PlausibilityIndex:
+    """
+    Precompiled biological plausibility bounds (cis_biomarker_plausibility_range).
+
+    Every biomarker with bounds gets a fixed column. For each stratum
+    seen in metadata, one row of lower/upper bounds and expected unit
+    codes is compiled once (most specific matching rule wins: sex + age >
+    sex or age > unstratified) and cached. A whole batch of samples is
+    then checked with a single gather + compare over (stratum row,
+    biomarker column) pairs.
+
+    A stratum is a sex named by some rule (or none) and an age band
+    between the rules' age bounds, not the raw metadata values: every
+    age in a band matches the same rules. The row count is therefore
+    bounded by the rule table, whatever the input.
+    """
+
+    def __init__(self, plausibility_rules):
+        self._rules = plausibility_rules
+        self.biomarker_index = {name: i for i, name in enumerate(sorted(plausibility_rules))}
+
+        self.unit_codes = {}
+        for rules in plausibility_rules.values():
+            for rule in rules:
+                if rule[0] is not None:
+                    self.unit_codes.setdefault(rule[0], len(self.unit_codes))
+
+        # the only distinctions any rule can make
+        self._sexes = frozenset(
+            rule[1] for rules in plausibility_rules.values() for rule in rules if rule[1] is not None
+        )
+        self._age_bounds = sorted({
+            bound for rules in plausibility_rules.values() for rule in rules
+            for bound in (rule[2], rule[3]) if bound is not None
+        })
+
+        self._lock = threading.Lock()
+        self._strata = {}                  # (sex, age band) -> row number
+        self._lo, self._hi, self._unit = (
+            np.empty((0, len(self.biomarker_index))),
+            np.empty((0, len(self.biomarker_index))),
+            np.empty((0, len(self.biomarker_index)), dtype=np.int64),
+        )
+
+    # ----------------------------------------------------------------------
+    # Stratum rows
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def stratum_key(metadata: dict | None):
+        metadata = metadata or {}
+
+        sex = metadata.get("sex")
+        sex = normalize_key(sex) if isinstance(sex, str) and sex.strip() else None
+
+        try:
+            age = float(metadata["age"]) if metadata.get("age") is not None else None
+        except (TypeError, ValueError):
+            age = None
+
+        return sex, age
+
+    def _age_band(self, age):
+        """
+        Band of `age` among the sorted rule bounds: 2i between bounds i-1
+        and i, 2i + 1 exactly on bound i (bounds are inclusive).
+        """
+        if age is None:
+            return None
+        i = bisect.bisect_left(self._age_bounds, age)
+        return 2 * i + (i < len(self._age_bounds) and self._age_bounds[i] == age)
+
+    def _stratum_row(self, sex, age) -> int:
+        # a sex no rule names matches exactly the rules None matches
+        key = (sex if sex in self._sexes else None, self._age_band(age))
+
+        row = self._strata.get(key)
+        if row is not None:
+            return row
+
+        with self._lock:
+            row = self._strata.get(key)
+            if row is not None:
+                return row
+
+            n = len(self.biomarker_index)
+            lo = np.full(n, -np.inf)
+            hi = np.full(n, np.inf)
+            unit = np.full(n, _ANY_UNIT, dtype=np.int64)
+
+            for name, column in self.biomarker_index.items():
+                best, best_specificity = None, -1
+
+                for rule in self._rules[name]:
+                    unit_key, rule_sex, age_min, age_max, _, _ = rule
+
+                    if rule_sex is not None and rule_sex != sex:
+                        continue
+                    if age_min is not None and (age is None or age < age_min):
+                        continue
+                    if age_max is not None and (age is None or age > age_max):
+                        continue
+
+                    specificity = (rule_sex is not None) + (age_min is not None or age_max is not None)
+                    if specificity > best_specificity:
+                        best, best_specificity = rule, specificity
+
+                if best is None:
+                    continue
+
+                unit_key, _, _, _, min_value, max_value = best
+                if min_value is not None:
+                    lo[column] = min_value
+                if max_value is not None:
+                    hi[column] = max_value
+                if unit_key is not None:
+                    unit[column] = self.unit_codes[unit_key]
+
+            # copy-on-write so concurrent readers keep a consistent matrix
+            self._lo = np.vstack([self._lo, lo])
+            self._hi = np.vstack([self._hi, hi])
+            self._unit = np.vstack([self._unit, unit])
+
+            row = len(self._strata)
+            self._strata[key] = row
+            return row
+
+    # ----------------------------------------------------------------------
+    # Vectorized evaluation
+    # samples: list of (normalized_biomarkers, metadata)
+    # returns: per sample {biomarker position: implausible-marker entry}
+    # ----------------------------------------------------------------------
+    def evaluate_batch(self, samples: list) -> list:
+        results = [{} for _ in samples]
+        if not self.biomarker_index:
+            return results
+
+        values, rows, columns, units, owners = [], [], [], [], []
+
+        for sample_no, (biomarkers, metadata) in enumerate(samples):
+            row = None
+
+            for position, biomarker in enumerate(biomarkers):
+                column = self.biomarker_index.get(normalize_key(biomarker.canonical_name))
+                if column is None:
+                    continue
+
+                value = biomarker.normalized_value
+                if biomarker.is_range:
+                    candidates = [value.get("min"), value.get("max")] if isinstance(value, dict) else []
+                else:
+                    candidates = [value]
+
+                candidates = [
+                    v for v in candidates
+                    if isinstance(v, (int, float)) and not isinstance(v, bool)
+                ]
+                if not candidates:
+                    continue
+
+                if row is None:
+                    row = self._stratum_row(*self.stratum_key(metadata))
+
+                unit = self.unit_codes.get(normalize_unit(biomarker.normalized_unit or ""), _UNKNOWN_UNIT)
+
+                for v in candidates:
+                    values.append(v)
+                    rows.append(row)
+                    columns.append(column)
+                    units.append(unit)
+                    owners.append((sample_no, position))
+
+        if not values:
+            return results
+
+        lo_matrix, hi_matrix, unit_matrix = self._lo, self._hi, self._unit
+
+        values = np.asarray(values, dtype=np.float64)
+        rows = np.asarray(rows, dtype=np.intp)
+        columns = np.asarray(columns, dtype=np.intp)
+        units = np.asarray(units, dtype=np.int64)
+
+        lo = lo_matrix[rows, columns]
+        hi = hi_matrix[rows, columns]
+        expected_unit = unit_matrix[rows, columns]
+
+        unit_ok = (expected_unit == _ANY_UNIT) | (expected_unit == units)
+        implausible = unit_ok & ((values < lo) | (values > hi))
+
+        for entry_no in np.flatnonzero(implausible).tolist():
+            sample_no, position = owners[entry_no]
+            if position in results[sample_no]:
+                continue
+
+            biomarker = samples[sample_no][0][position]
+            low, high = float(lo[entry_no]), float(hi[entry_no])
+
+            results[sample_no][position] = {
+                "biomarker": biomarker.canonical_name,
+                "value": biomarker.normalized_value,
+                "unit": biomarker.normalized_unit,
+                "plausible_min": low if np.isfinite(low) else None,
+                "plausible_max": high if np.isfinite(high) else None,
+                "reason": "below_plausible_min" if values[entry_no] < low else "above_plausible_max"
+            }
+
+        return results
+
+
+class DominantMarkerIndex:
+    """
+    Inverse index biomarker → buckets in which it is dominant, so the
+    critical-marker check walks the markers present in a sample instead
+    of every bucket's dominant set.
+    """
+
+    def __init__(self, bucket_to_dominant):
+        inverse = {}
+        pairs = []
+
+        for bucket in sorted(bucket_to_dominant):
+            for biomarker in sorted(bucket_to_dominant[bucket]):
+                inverse.setdefault(biomarker, []).append(bucket)
+                pairs.append((bucket, biomarker))
+
+        self.buckets_by_biomarker = {name: tuple(buckets) for name, buckets in inverse.items()}
+        self.pairs = tuple(pairs)
@@ -1,80 +1,94 @@
 # src/qc/qc_engine.py
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from src.repository.rule_store import RuleStore, SnapshotCache
+from src.qc.qc_rules import PlausibilityIndex, DominantMarkerIndex
 from src.logger.logging_config import logger
-from src.utils.unit_utils import db_connection
 
 
 class QCEngine:
     """
     QC Engine performs:
     - missing value validation
+    - biological plausibility validation (optionally sex/age stratified)
     - critical (dominant) biomarker validation per bucket
     - per-biomarker QC tagging
     - overall QC summary computation
 
     Data source:
-        cis_biomarker_weightage_mapping
+        cis_biomarker_weightage_mapping, cis_biomarker_plausibility_range
+        (via the shared RuleStore)
     """
 
-    def __init__(self, config):
+    def __init__(self, config, rule_store: RuleStore | None = None):
         self.config = config
-        self.conn = db_connection(config)
+        self.rule_store = rule_store or RuleStore(config)
 
-        # Load mapping from DB
-        (
-            self.bucket_to_dominant,
-            self.all_expected_biomarkers
-        ) = self._load_biomarker_rules()
+        # (PlausibilityIndex, DominantMarkerIndex) per snapshot, prebuilt on rule reload
+        self._compiled = SnapshotCache(self._compile)
+        self.rule_store.add_warmer(self._compiled.get)
 
     # ----------------------------------------------------------------------
-    # Load bucket → dominant biomarkers AND global expected biomarkers
+    # Bucket → dominant biomarkers AND global expected biomarkers
     # ----------------------------------------------------------------------
-    def _load_biomarker_rules(self):
-        query = """
-            SELECT biomarker_name, bucket_name, role
-            FROM cis_biomarker_weightage_mapping;
-        """
-
-        bucket_to_dominant = {}
-        all_expected = set()
-
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
-
-        for row in rows:
-            biomarker = row["biomarker_name"]
-            bucket = row["bucket_name"]
-            role = row["role"]
-
-            all_expected.add(biomarker)
-
-            if role == "Dominant":
-                bucket_to_dominant.setdefault(bucket, set()).add(biomarker)
+    @property
+    def bucket_to_dominant(self):
+        return self.rule_store.snapshot.bucket_to_dominant
 
-        logger.info("QC rules loaded",
-                    buckets=len(bucket_to_dominant),
-                    expected_biomarkers=len(all_expected))
+    @property
+    def all_expected_biomarkers(self):
+        return self.rule_store.snapshot.all_expected_biomarkers
 
-        return bucket_to_dominant, all_expected
+    # ----------------------------------------------------------------------
+    # Precompiled indexes, built once per rule snapshot
+    # ----------------------------------------------------------------------
+    def _indexes(self):
+        return self._compiled.get(self.rule_store.snapshot)
+
+    @staticmethod
+    def _compile(snapshot):
+        plausibility = PlausibilityIndex(snapshot.plausibility_rules)
+        dominant = DominantMarkerIndex(snapshot.bucket_to_dominant)
+        logger.info("QC indexes compiled",
+                    rules_version=snapshot.version,
+                    plausibility_biomarkers=len(snapshot.plausibility_rules),
+                    dominant_pairs=len(dominant.pairs))
+        return plausibility, dominant
 
     # ----------------------------------------------------------------------
     # QC evaluation for a full sample
     # ----------------------------------------------------------------------
-    def run_qc(self, normalized_biomarkers: list):
+    def run_qc(self, normalized_biomarkers: list, metadata: dict | None = None):
         """
-        normalized_biomarkers: list of dicts after unit conversion
+        normalized_biomarkers: BiomarkerRecords after unit conversion
+                               (qc_check is set in place)
+        metadata: sample metadata (sex/age select stratified bounds)
         Returns:
             updated biomarker list + qc_summary (dict)
         """
+        return self.run_qc_batch([(normalized_biomarkers, metadata)])[0]
+
+    def run_qc_batch(self, samples: list) -> list:
+        """
+        samples: list of (normalized_biomarkers, metadata)
+        Plausibility for the whole batch is evaluated in one vectorized pass.
+        Returns:
+            list of (updated biomarker list, qc_summary)
+        """
+        plausibility, dominant = self._indexes()
+        implausible_by_sample = plausibility.evaluate_batch(samples)
+
+        return [
+            self._summarize(normalized_biomarkers, implausible, dominant)
+            for (normalized_biomarkers, _), implausible in zip(samples, implausible_by_sample)
+        ]
+
+    def _summarize(self, normalized_biomarkers: list, implausible: dict, dominant: DominantMarkerIndex):
 
         qc_summary = {
             "missing_critical_markers": False,
             "missing_critical_biomarkers": [],
             "total_invalid_markers": 0,
-            "implausible_markers": [],      # future expansion
+            "implausible_markers": [],
             "overall_status": "valid"
         }
 
@@ -82,48 +96,59 @@ class QCEngine:
         # Step 1: Create quick lookup of biomarkers present in payload
         # ----------------------------------------------------------
         present_values = {
-            sample["canonical_name"]: sample
+            sample.canonical_name: sample
             for sample in normalized_biomarkers
         }
 
         present_names = set(present_values.keys())
 
         # ----------------------------------------------------------
-        # Step 2: Mark missing/invalid biomarkers
+        # Step 2: Mark missing/invalid/implausible biomarkers
         # ----------------------------------------------------------
-        for sample in normalized_biomarkers:
-            name = sample["canonical_name"]
-            value = sample["normalized_value"]
+        for position, sample in enumerate(normalized_biomarkers):
+            value = sample.normalized_value
 
-            if value is None or value == "" or (sample["is_range"] and value == {}):
-                sample["qc_check"] = "invalid"
+            if value is None or value == "" or (sample.is_range and value == {}):
+                sample.qc_check = "invalid"
                 qc_summary["total_invalid_markers"] += 1
+            elif position in implausible:
+                sample.qc_check = "implausible"
+                qc_summary["implausible_markers"].append(implausible[position])
             else:
-                sample["qc_check"] = "valid"
+                sample.qc_check = "valid"
 
         # ----------------------------------------------------------
         # Step 3: Validate dominant biomarkers per bucket
+        # (walks present markers via the inverse index)
         # ----------------------------------------------------------
-        for bucket, dom_set in self.bucket_to_dominant.items():
-            for biomarker in dom_set:
-                # If biomarker missing entirely
-                if biomarker not in present_names:
+        dominant_present = 0
+
+        for biomarker, s in present_values.items():
+            buckets = dominant.buckets_by_biomarker.get(biomarker)
+            if not buckets:
+                continue
+
+            dominant_present += len(buckets)
+
+            # If biomarker exists but invalid
+            if s.qc_check != "valid":
+                for bucket in buckets:
                     qc_summary["missing_critical_markers"] = True
                     qc_summary["missing_critical_biomarkers"].append({
                         "biomarker": biomarker,
                         "bucket": bucket,
-                        "reason": "not_collected"
+                        "reason": "value_implausible" if s.qc_check == "implausible" else "value_invalid"
                     })
-                    continue
 
-                # If biomarker exists but invalid
-                s = present_values[biomarker]
-                if s["qc_check"] != "valid":
+        # If some dominant biomarkers are missing entirely
+        if dominant_present < len(dominant.pairs):
+            for bucket, biomarker in dominant.pairs:
+                if biomarker not in present_names:
                     qc_summary["missing_critical_markers"] = True
                     qc_summary["missing_critical_biomarkers"].append({
                         "biomarker": biomarker,
                         "bucket": bucket,
-                        "reason": "value_invalid"
+                        "reason": "not_collected"
                     })
 
         # ----------------------------------------------------------
@@ -0,0 +1,83 @@
+# src/repository/biomarker_value_sink.py
+
+import io
+import csv
+from src.utils.metrics import metrics
+from src.utils.prepared_statements import PreparedStatement, execute_prepared
+
+
+class BiomarkerValueSink:
+    """
+    Narrow, typed copy of the normalized biomarkers: one row per biomarker
+    in structured_biomarker_values, so scoring can read one marker across
+    samples through an index instead of parsing every JSONB envelope.
+
+    Rows are written with COPY on the connection (and inside the
+    transaction) that upserts the envelopes, replacing the sample's
+    previous rows: the narrow table never disagrees with the envelope.
+    Only samples whose envelope was actually written are passed in, as
+    plain dicts (see envelope_to_dict).
+    """
+
+    TABLE = "structured_biomarker_values"
+
+    COLUMNS = (
+        "sample_id", "user_id", "position", "canonical_name",
+        "value", "value_min", "value_max", "unit", "qc_check", "rules_version",
+    )
+
+    DELETE_QUERY = f"""
+        DELETE FROM {TABLE}
+        WHERE sample_id = ANY(%s);
+    """
+
+    DELETE_STATEMENT = PreparedStatement("cis_delete_biomarker_values", DELETE_QUERY)
+
+    COPY_QUERY = f"""
+        COPY {TABLE} ({", ".join(COLUMNS)})
+        FROM STDIN WITH (FORMAT csv)
+    """
+
+    @staticmethod
+    def rows(sample: dict):
+        """One tuple per normalized biomarker, in COLUMNS order."""
+        sample_id = sample["sample_id"]
+        user_id = sample["user_id"]
+        rules_version = sample.get("rules_version")
+
+        for position, biomarker in enumerate(sample["biomarkers"]):
+            value = biomarker["normalized_value"]
+            if biomarker["is_range"]:
+                value, value_min, value_max = None, value["min"], value["max"]
+            else:
+                value_min = value_max = None
+
+            yield (
+                sample_id, user_id, position, biomarker["canonical_name"],
+                value, value_min, value_max,
+                biomarker["normalized_unit"], biomarker.get("qc_check"), rules_version,
+            )
+
+    def write(self, cur, samples: list) -> int:
+        """
+        Replace the rows of `samples` using the caller's cursor.
+        Returns the number of rows copied.
+        """
+        if not samples:
+            return 0
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        copied = 0
+        for sample in samples:
+            for row in self.rows(sample):
+                writer.writerow(row)            # None -> empty field -> NULL
+                copied += 1
+        buffer.seek(0)
+
+        with metrics.timer("db_copy_values"):
+            execute_prepared(cur, self.DELETE_STATEMENT, ([sample["sample_id"] for sample in samples],))
+            cur.copy_expert(self.COPY_QUERY, buffer)
+
+        metrics.incr("biomarker_values_copied", copied)
+        return copied
@@ -0,0 +1,233 @@
+# src/repository/dry_run_sink.py
+
+import os
+import re
+import json
+import tempfile
+import threading
+from collections import Counter
+from src.utils.metrics import metrics
+from src.schemas.biomarker_record import envelope_to_dict
+from src.logger.logging_config import logger
+from src.config.flags import config_flag
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^0-9A-Za-z._-]+")
+
+# differ on every run, never a rule change
+_VOLATILE_KEYS = ("trace_id", "input_hash", "rules_version")
+
+
+def _write_json(path: str, data):
+    """Atomic write (temp file + rename), sorted keys so runs diff cleanly."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".dry-run-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, sort_keys=True, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _by_name(biomarkers: list) -> dict:
+    """{canonical_name: biomarker}; repeated markers become "name#2", "name#3", ..."""
+    keyed = {}
+    seen = Counter()
+    for biomarker in biomarkers:
+        name = biomarker["canonical_name"]
+        seen[name] += 1
+        keyed[name if seen[name] == 1 else f"{name}#{seen[name]}"] = biomarker
+    return keyed
+
+
+def diff_envelopes(before: dict, after: dict) -> dict:
+    """
+    Differences between two structured envelopes of the same sample,
+    ignoring per-run fields. Empty dict when they are equivalent:
+
+        {"biomarkers": {"added": [...], "removed": [...],
+                        "changed": {name: {"before": ..., "after": ...}}},
+         "qc_summary": {field: {"before": ..., "after": ...}},
+         "fields":     {key: {"before": ..., "after": ...}}}
+    """
+    diff = {}
+
+    old, new = _by_name(before.get("biomarkers", [])), _by_name(after.get("biomarkers", []))
+    biomarkers = {
+        "added": sorted(new.keys() - old.keys()),
+        "removed": sorted(old.keys() - new.keys()),
+        "changed": {
+            name: {"before": old[name], "after": new[name]}
+            for name in sorted(old.keys() & new.keys())
+            if old[name] != new[name]
+        },
+    }
+    if any(biomarkers.values()):
+        diff["biomarkers"] = biomarkers
+
+    old_qc, new_qc = before.get("qc_summary") or {}, after.get("qc_summary") or {}
+    qc_summary = {
+        field: {"before": old_qc.get(field), "after": new_qc.get(field)}
+        for field in sorted(old_qc.keys() | new_qc.keys())
+        if old_qc.get(field) != new_qc.get(field)
+    }
+    if qc_summary:
+        diff["qc_summary"] = qc_summary
+
+    ignored = {"biomarkers", "qc_summary", *_VOLATILE_KEYS}
+    fields = {
+        key: {"before": before.get(key), "after": after.get(key)}
+        for key in sorted((before.keys() | after.keys()) - ignored)
+        if before.get(key) != after.get(key)
+    }
+    if fields:
+        diff["fields"] = fields
+
+    return diff
+
+
+class DryRunSink:
+    """
+    Stand-in for SampleRepository that never touches the database:
+    envelopes are written as local JSON files and, when a baseline is
+    given, compared with the envelope of the same sample there.
+
+        <DRY_RUN_OUTPUT_DIR>/samples/<sample_id>.json   every envelope
+        <DRY_RUN_OUTPUT_DIR>/diffs/<sample_id>.json     samples that differ
+                                                        from the baseline
+        <DRY_RUN_OUTPUT_DIR>/summary.json               counts, QC status
+                                                        transitions, changed
+                                                        biomarkers
+
+    The baseline is the output directory of an earlier dry run (e.g. with
+    the current rules), so a candidate rule set is validated by replaying
+    the same corpus twice. Per-run fields (trace_id, input_hash,
+    rules_version) are ignored when diffing.
+
+    get_input_hashes() reports nothing as stored, so every sample is
+    processed.
+
+    Config keys:
+        DRY_RUN_OUTPUT_DIR     output directory (required)
+        DRY_RUN_BASELINE_DIR   earlier dry-run output to diff against (optional)
+        DRY_RUN_WRITE_SAMPLES  write samples/ (default True; diffs and the
+                               summary are always written)
+        DB_WRITE_BATCH_SIZE    samples per persist batch (default 100)
+    """
+
+    def __init__(self, config: dict):
+        self.output_dir = os.path.abspath(config["DRY_RUN_OUTPUT_DIR"])
+        baseline_dir = config.get("DRY_RUN_BASELINE_DIR")
+        self.baseline_dir = os.path.abspath(baseline_dir) if baseline_dir else None
+        self.write_samples = config_flag(config, "DRY_RUN_WRITE_SAMPLES", True)
+        self.batch_size = int(config.get("DB_WRITE_BATCH_SIZE", 100))
+
+        if self.baseline_dir == self.output_dir:
+            raise ValueError("DRY_RUN_BASELINE_DIR must differ from DRY_RUN_OUTPUT_DIR")
+
+        os.makedirs(os.path.join(self.output_dir, "samples"), exist_ok=True)
+        os.makedirs(os.path.join(self.output_dir, "diffs"), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._qc_status = Counter()
+        self._qc_transitions = Counter()
+        self._biomarker_changes = Counter()
+
+    @staticmethod
+    def _filename(sample_id) -> str:
+        return f"{_UNSAFE_FILENAME_CHARS.sub('_', str(sample_id)).strip('_') or 'unknown'}.json"
+
+    # ----------------------------------------------------------------------
+    # SampleRepository API
+    # ----------------------------------------------------------------------
+    def get_input_hashes(self, sample_ids: list) -> dict:
+        return {}
+
+    def save_structured_sample(self, sample: dict):
+        self.save_structured_samples([sample])
+
+    def save_structured_samples(self, batch: list) -> dict:
+        """
+        Returns
+            {"new": [sample_id, ...], "changed": [sample_id, ...],
+             "unchanged": [sample_id, ...]}
+        (everything is "new" without a baseline).
+        """
+        report = {"new": [], "changed": [], "unchanged": []}
+
+        for sample in map(envelope_to_dict, batch):
+            name = self._filename(sample["sample_id"])
+            if self.write_samples:
+                _write_json(os.path.join(self.output_dir, "samples", name), sample)
+
+            baseline = self._baseline(name)
+            if baseline is None:
+                status, diff = "new", None
+            else:
+                # compare in JSON form, as the baseline was written
+                diff = diff_envelopes(baseline, json.loads(json.dumps(sample, default=str)))
+                status = "changed" if diff else "unchanged"
+
+            if diff:
+                _write_json(os.path.join(self.output_dir, "diffs", name),
+                            {"sample_id": sample["sample_id"], **diff})
+
+            report[status].append(sample["sample_id"])
+            self._tally(status, baseline, sample, diff)
+
+        metrics.incr("samples_dry_run", len(batch))
+        return report
+
+    # ----------------------------------------------------------------------
+    # Baseline + summary
+    # ----------------------------------------------------------------------
+    def _baseline(self, name: str) -> dict | None:
+        if self.baseline_dir is None:
+            return None
+        try:
+            with open(os.path.join(self.baseline_dir, "samples", name), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def _tally(self, status: str, baseline, sample: dict, diff):
+        status_after = sample["qc_summary"]["overall_status"]
+
+        with self._lock:
+            self._counts["samples"] += 1
+            self._counts[status] += 1
+            self._qc_status[status_after] += 1
+
+            if baseline is not None:
+                status_before = (baseline.get("qc_summary") or {}).get("overall_status")
+                if status_before != status_after:
+                    self._qc_transitions[f"{status_before} -> {status_after}"] += 1
+
+            for name in (diff or {}).get("biomarkers", {}).get("changed", ()):
+                self._biomarker_changes[name.split("#", 1)[0]] += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "output_dir": self.output_dir,
+                "baseline_dir": self.baseline_dir,
+                "samples": self._counts["samples"],
+                "new": self._counts["new"],
+                "changed": self._counts["changed"],
+                "unchanged": self._counts["unchanged"],
+                "qc_overall_status": dict(self._qc_status),
+                "qc_transitions": dict(self._qc_transitions),
+                "biomarker_changes": dict(self._biomarker_changes.most_common()),
+            }
+
+    def write_summary(self) -> dict:
+        """(Over)write summary.json with the totals so far; returns them."""
+        summary = self.summary()
+        _write_json(os.path.join(self.output_dir, "summary.json"), summary)
+
+        logger.info("dry run summary written", samples=summary["samples"], changed=summary["changed"],
+                    new=summary["new"], qc_transitions=summary["qc_transitions"])
+        return summary
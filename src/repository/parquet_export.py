@@ -0,0 +1,287 @@
+# src/repository/parquet_export.py
+
+import os
+import re
+import uuid
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from src.utils.metrics import metrics
+from src.schemas.biomarker_record import envelope_to_dict
+from src.logger.logging_config import logger
+
+_UNSAFE_PARTITION_CHARS = re.compile(r"[^0-9A-Za-z._-]+")
+
+PARTITION_KEYS = {
+    "date": "collection_date",
+    "lab": "lab",
+}
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        import pyarrow.fs as pafs
+    except ImportError:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package")
+    return pa, pq, pafs
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+class ParquetExportSink:
+    """
+    Columnar export of structured envelopes as partitioned Parquet files,
+    one row per sample:
+
+        sample_id, user_id, trace_id, rules_version, input_hash,
+        lab_name, sample_collected_at,
+        qc_overall_status, qc_missing_critical_markers,
+        qc_total_invalid_markers, qc_missing_critical_biomarkers,
+        qc_implausible_markers,
+        one struct column per known canonical biomarker
+            {value, min, max, unit, qc_check}   (null when not measured),
+        other_biomarkers   list of the same struct + name, for canonical
+                           names added after the export started
+
+    Envelopes are appended to per-partition column buffers; every
+    EXPORT_ROW_GROUP_SIZE rows a buffer is written as one row group.
+    Files are written under a temporary name and renamed when they are
+    closed, so readers never see partial files:
+
+        <EXPORT_PARQUET_PATH>/collection_date=2025-12-08/part-<run>.parquet
+
+    At most EXPORT_MAX_OPEN_PARTITIONS partitions hold a buffer or an open
+    writer; a new one first flushes, closes and publishes the least
+    recently used. Rows arriving later for a closed partition go to a
+    new file, part-<run>-<n>.parquet.
+
+    Used as (or next to) the persist stage: save_structured_samples()
+    has the same signature as SampleRepository's.
+
+    Config keys:
+        EXPORT_PARQUET_PATH         local directory or s3://bucket/prefix (required)
+        EXPORT_PARTITION_BY         "date" (metadata.sample_collected_at, default) or
+                                    "lab" (metadata.lab_name)
+        EXPORT_ROW_GROUP_SIZE       rows per row group (default 10000)
+        EXPORT_PARQUET_COMPRESSION  codec (default "zstd")
+        EXPORT_MAX_OPEN_PARTITIONS  partitions buffered / open at once (default 32)
+    """
+
+    def __init__(self, config: dict, biomarker_names):
+        pa, pq, pafs = _arrow()
+        self._pa, self._pq = pa, pq
+
+        partition_by = config.get("EXPORT_PARTITION_BY", "date")
+        if partition_by not in PARTITION_KEYS:
+            raise ValueError(f"unknown EXPORT_PARTITION_BY: {partition_by}")
+
+        self.partition_by = partition_by
+        self.row_group_size = max(int(config.get("EXPORT_ROW_GROUP_SIZE", 10000)), 1)
+        self.compression = config.get("EXPORT_PARQUET_COMPRESSION", "zstd")
+        self.max_open_partitions = max(int(config.get("EXPORT_MAX_OPEN_PARTITIONS", 32)), 1)
+        self.run_id = uuid.uuid4().hex
+
+        self.fs, self.root = pafs.FileSystem.from_uri(self._uri(config["EXPORT_PARQUET_PATH"]))
+
+        self.biomarker_names = tuple(sorted(biomarker_names))
+        self._biomarker_columns = {name: n for n, name in enumerate(self.biomarker_names)}
+
+        measurement = [
+            ("value", pa.float64()),
+            ("min", pa.float64()),
+            ("max", pa.float64()),
+            ("unit", pa.string()),
+            ("qc_check", pa.string()),
+        ]
+        self._measurement_type = pa.struct(measurement)
+        self._other_type = pa.list_(pa.struct([("name", pa.string())] + measurement))
+
+        self.schema = pa.schema(
+            [
+                ("sample_id", pa.string()),
+                ("user_id", pa.string()),
+                ("trace_id", pa.string()),
+                ("rules_version", pa.string()),
+                ("input_hash", pa.string()),
+                ("lab_name", pa.string()),
+                ("sample_collected_at", pa.string()),
+                ("qc_overall_status", pa.string()),
+                ("qc_missing_critical_markers", pa.bool_()),
+                ("qc_total_invalid_markers", pa.int32()),
+                ("qc_missing_critical_biomarkers", pa.list_(pa.struct([
+                    ("biomarker", pa.string()), ("bucket", pa.string()), ("reason", pa.string())
+                ]))),
+                ("qc_implausible_markers", pa.list_(pa.string())),
+            ]
+            + [(name, self._measurement_type) for name in self.biomarker_names]
+            + [("other_biomarkers", self._other_type)]
+        )
+        self._scalar_columns = len(self.schema) - len(self.biomarker_names) - 1
+
+        self._lock = threading.Lock()
+        self._buffers = {}          # partition value -> list of columns (lists)
+        self._writers = {}          # partition value -> (ParquetWriter, tmp path, final path)
+        self._open = OrderedDict()  # partitions with a buffer or writer, least recent first
+        self._files = {}            # partition value -> files opened so far
+        self._published = []
+        self.rows_written = 0
+
+    @staticmethod
+    def _uri(path: str) -> str:
+        return path if "://" in path else f"file://{os.path.abspath(path)}"
+
+    # ----------------------------------------------------------------------
+    # Sink API
+    # ----------------------------------------------------------------------
+    def save_structured_samples(self, batch: list) -> dict:
+        with self._lock:
+            for sample in map(envelope_to_dict, batch):
+                partition = self._partition(sample)
+                self._touch(partition)
+                columns = self._buffers.get(partition)
+                if columns is None:
+                    columns = self._buffers[partition] = [[] for _ in self.schema]
+
+                self._append(columns, sample)
+                if len(columns[0]) >= self.row_group_size:
+                    self._flush(partition)
+
+        metrics.incr("samples_exported", len(batch))
+        return {"exported": [sample["sample_id"] for sample in batch]}
+
+    def close(self) -> list:
+        """Flush every buffer, close the files and publish them. Returns the file paths."""
+        with self._lock:
+            for partition in list(self._open):
+                self._close_partition(partition)
+
+            published, self._published = self._published, []
+
+        logger.info("parquet export complete", files=len(published), rows=self.rows_written,
+                    partition_by=self.partition_by, run_id=self.run_id)
+        return published
+
+    # ----------------------------------------------------------------------
+    # Row → column buffers
+    # ----------------------------------------------------------------------
+    def _partition(self, sample: dict) -> str:
+        metadata = sample.get("metadata") or {}
+
+        if self.partition_by == "lab":
+            value = _UNSAFE_PARTITION_CHARS.sub("_", str(metadata.get("lab_name") or "")).strip("_")
+            return value.lower() or "unknown"
+
+        collected_at = str(metadata.get("sample_collected_at") or "")
+        try:
+            return datetime.fromisoformat(collected_at.replace("Z", "+00:00")).date().isoformat()
+        except ValueError:
+            # no usable collection time: partition by export date
+            return datetime.now(timezone.utc).date().isoformat()
+
+    def _append(self, columns: list, sample: dict):
+        metadata = sample.get("metadata") or {}
+        qc_summary = sample["qc_summary"]
+
+        scalars = (
+            sample["sample_id"],
+            sample["user_id"],
+            sample.get("trace_id"),
+            sample.get("rules_version"),
+            sample.get("input_hash"),
+            _text(metadata.get("lab_name")),
+            _text(metadata.get("sample_collected_at")),
+            qc_summary["overall_status"],
+            qc_summary["missing_critical_markers"],
+            qc_summary["total_invalid_markers"],
+            qc_summary["missing_critical_biomarkers"],
+            [marker["biomarker"] for marker in qc_summary["implausible_markers"]],
+        )
+        for column, value in zip(columns, scalars):
+            column.append(value)
+
+        measured = [None] * len(self.biomarker_names)
+        others = []
+
+        for biomarker in sample["biomarkers"]:
+            value = biomarker["normalized_value"]
+            entry = {
+                "value": None if biomarker["is_range"] else value,
+                "min": value.get("min") if biomarker["is_range"] else None,
+                "max": value.get("max") if biomarker["is_range"] else None,
+                "unit": biomarker["normalized_unit"],
+                "qc_check": biomarker.get("qc_check"),
+            }
+
+            position = self._biomarker_columns.get(biomarker["canonical_name"])
+            if position is None or measured[position] is not None:
+                # unknown to this export, or reported twice: keep, never drop
+                others.append({"name": biomarker["canonical_name"], **entry})
+            else:
+                measured[position] = entry
+
+        offset = self._scalar_columns
+        for position, entry in enumerate(measured):
+            columns[offset + position].append(entry)
+        columns[-1].append(others)
+
+    def _flush(self, partition: str):
+        columns = self._buffers.pop(partition, None)
+        if not columns or not columns[0]:
+            return
+
+        pa = self._pa
+        with metrics.timer("parquet_write"):
+            table = pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+                schema=self.schema
+            )
+            self._writer(partition).write_table(table, row_group_size=self.row_group_size)
+
+        self.rows_written += table.num_rows
+
+    # ----------------------------------------------------------------------
+    # Open partitions: bounded, least recently used closed first
+    # ----------------------------------------------------------------------
+    def _touch(self, partition: str):
+        if partition in self._open:
+            self._open.move_to_end(partition)
+            return
+
+        while len(self._open) >= self.max_open_partitions:
+            evicted = next(iter(self._open))
+            self._close_partition(evicted)
+            metrics.incr("parquet_partitions_evicted")
+
+        self._open[partition] = None
+
+    def _close_partition(self, partition: str):
+        self._flush(partition)
+        self._open.pop(partition, None)
+
+        entry = self._writers.pop(partition, None)
+        if entry is not None:
+            writer, tmp_path, final_path = entry
+            writer.close()
+            self.fs.move(tmp_path, final_path)
+            self._published.append(final_path)
+
+    def _writer(self, partition: str):
+        entry = self._writers.get(partition)
+        if entry is None:
+            directory = f"{self.root}/{PARTITION_KEYS[self.partition_by]}={partition}"
+            self.fs.create_dir(directory, recursive=True)
+
+            n = self._files.get(partition, 0)
+            self._files[partition] = n + 1
+            name = f"part-{self.run_id}-{n}" if n else f"part-{self.run_id}"
+
+            final_path = f"{directory}/{name}.parquet"
+            tmp_path = f"{directory}/.{name}.parquet.tmp"
+            writer = self._pq.ParquetWriter(tmp_path, self.schema, filesystem=self.fs,
+                                            compression=self.compression)
+            entry = self._writers[partition] = (writer, tmp_path, final_path)
+        return entry[0]
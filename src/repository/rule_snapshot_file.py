@@ -0,0 +1,155 @@
+# src/repository/rule_snapshot_file.py
+"""
+Compiled, versioned rule snapshot file.
+
+Layout (little-endian):
+    header   magic "CISRULES" | format u16 | reserved u16 | version_len u32
+             | sha256 (32 bytes) | payload_len u64
+    version  rules version string (utf-8)
+    payload  canonical JSON of RuleSnapshot.to_payload() (utf-8, sorted keys)
+
+The sha256 covers version + payload. The file is read through mmap and
+the rules version can be checked from the header alone, without
+parsing the payload. Identical rules always produce byte-identical files.
+
+CLI:
+    python -m src.repository.rule_snapshot_file build --output rules.snapshot
+    python -m src.repository.rule_snapshot_file inspect rules.snapshot
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import argparse
+import tempfile
+
+MAGIC = b"CISRULES"
+FORMAT_VERSION = 2     # 2: normalize_unit keys + precomputed conversion closure
+HEADER = struct.Struct("<8sHHI32sQ")
+
+
+def encode(payload: dict) -> bytes:
+    """Serialize a snapshot payload into the on-disk layout."""
+    version = (payload.get("version") or "").encode("utf-8")
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    digest = hashlib.sha256(version + body).digest()
+
+    return HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(version), digest, len(body)) + version + body
+
+
+def write(path: str, payload: dict) -> str:
+    """
+    Atomically write the snapshot file (temp file + rename).
+    Returns the hex checksum.
+    """
+    data = encode(payload)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".rules-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return HEADER.unpack_from(data, 0)[4].hex()
+
+
+def peek_version(path: str) -> str | None:
+    """
+    Read only the header + version string.
+    Returns None if the file is missing or not a valid snapshot.
+    """
+    try:
+        with open(path, "rb") as fh:
+            header = fh.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None
+
+            magic, fmt, _, version_len, _, _ = HEADER.unpack(header)
+            if magic != MAGIC or fmt != FORMAT_VERSION:
+                return None
+
+            return fh.read(version_len).decode("utf-8")
+
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def read(path: str) -> dict:
+    """
+    Memory-map the file, verify its checksum and return the payload.
+    Raises ValueError if the file is not a valid, intact snapshot.
+    """
+    with open(path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(mm) < HEADER.size:
+                raise ValueError(f"rule snapshot too short: {path}")
+
+            magic, fmt, _, version_len, digest, payload_len = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or fmt != FORMAT_VERSION:
+                raise ValueError(f"not a rule snapshot (format {fmt}): {path}")
+
+            start = HEADER.size
+            end = start + version_len + payload_len
+            if len(mm) != end:
+                raise ValueError(f"rule snapshot truncated: {path}")
+
+            view = memoryview(mm)
+            try:
+                if hashlib.sha256(view[start:end]).digest() != digest:
+                    raise ValueError(f"rule snapshot checksum mismatch: {path}")
+
+                return json.loads(bytes(view[start + version_len:end]))
+            finally:
+                view.release()
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect compiled CIS rule snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="compile the current DB rules into a snapshot file")
+    build_cmd.add_argument("--output", required=True)
+
+    inspect_cmd = commands.add_parser("inspect", help="verify a snapshot file and print its summary")
+    inspect_cmd.add_argument("path")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from src.config.config_loader import get_ingestion_config
+        from src.repository.rule_store import RuleStore
+
+        config = get_ingestion_config()
+        config["RULE_SNAPSHOT_PATH"] = None     # always compile from the database
+
+        snapshot = RuleStore(config).snapshot
+        checksum = write(args.output, snapshot.to_payload())
+        print(json.dumps({"path": args.output, "version": snapshot.version, "sha256": checksum}))
+        return 0
+
+    payload = read(args.path)
+    print(json.dumps({
+        "path": args.path,
+        "version": payload.get("version"),
+        "aliases": len(payload["alias_map"]),
+        "conversion_rules": len(payload["conversion_rules"]),
+        "buckets": len(payload["bucket_to_dominant"]),
+        "expected_biomarkers": len(payload["all_expected_biomarkers"]),
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,489 @@
+# src/repository/rule_store.py
+
+import time
+import hashlib
+import threading
+import contextvars
+from contextlib import contextmanager
+from types import MappingProxyType
+from src.repository import rule_snapshot_file
+from src.canonicalizer.unit_graph import normalize_unit, build_conversion_closure
+from src.utils.unit_utils import db_connection
+from src.utils.db_pool import CountingRealDictCursor
+from src.utils.prepared_statements import PreparedStatement, execute_prepared
+from src.utils.metrics import metrics
+from src.logger.logging_config import logger
+
+
+def normalize_key(name: str) -> str:
+    """
+    Normalized lookup key shared by every rule index
+    (alias names, biomarker names and units).
+    """
+    return name.strip().lower()
+
+
+class RuleSnapshot:
+    """
+    Immutable, in-memory view of all ingestion rules.
+
+    Indexes:
+        alias_map               normalized alias -> canonical name
+        conversion_map          (normalized biomarker, normalize_unit(unit_from)) -> rule,
+                                including composed multi-hop conversions
+        bucket_to_dominant      bucket -> frozenset of dominant biomarkers
+        all_expected_biomarkers frozenset of every mapped biomarker
+        plausibility_rules      normalized biomarker -> tuple of
+                                (unit, sex, age_min, age_max, min_value, max_value)
+        version                 rules version the snapshot was built from (or None)
+    """
+
+    __slots__ = (
+        "alias_map",
+        "conversion_map",
+        "bucket_to_dominant",
+        "all_expected_biomarkers",
+        "plausibility_rules",
+        "version",
+    )
+
+    def __init__(self, alias_map, conversion_map, bucket_to_dominant, all_expected_biomarkers,
+                 version=None, plausibility_rules=None):
+        object.__setattr__(self, "alias_map", MappingProxyType(dict(alias_map)))
+        object.__setattr__(self, "conversion_map", MappingProxyType({
+            key: MappingProxyType(dict(rule)) for key, rule in conversion_map.items()
+        }))
+        object.__setattr__(self, "bucket_to_dominant", MappingProxyType({
+            bucket: frozenset(markers) for bucket, markers in bucket_to_dominant.items()
+        }))
+        object.__setattr__(self, "all_expected_biomarkers", frozenset(all_expected_biomarkers))
+        object.__setattr__(self, "plausibility_rules", MappingProxyType({
+            biomarker: tuple(tuple(rule) for rule in rules)
+            for biomarker, rules in (plausibility_rules or {}).items()
+        }))
+        object.__setattr__(self, "version", version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuleSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("RuleSnapshot is immutable")
+
+    def __reduce__(self):
+        # mappingproxy is not picklable; ship plain containers and re-freeze
+        return RuleSnapshot.from_payload, (self.to_payload(),)
+
+    # ----------------------------------------------------------------------
+    # Deterministic plain-data form (pickling, on-disk snapshot files)
+    # ----------------------------------------------------------------------
+    def to_payload(self) -> dict:
+        return {
+            "version": self.version,
+            "alias_map": dict(sorted(self.alias_map.items())),
+            "conversion_rules": sorted(
+                [biomarker, unit_from, rule["unit_to"], rule["factor"], rule["offset"]]
+                for (biomarker, unit_from), rule in self.conversion_map.items()
+            ),
+            "bucket_to_dominant": {
+                bucket: sorted(markers)
+                for bucket, markers in sorted(self.bucket_to_dominant.items())
+            },
+            "all_expected_biomarkers": sorted(self.all_expected_biomarkers),
+            "plausibility_rules": sorted(
+                ([biomarker, *rule] for biomarker, rules in self.plausibility_rules.items() for rule in rules),
+                key=repr
+            ),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "RuleSnapshot":
+        plausibility_rules = {}
+        for biomarker, *rule in payload.get("plausibility_rules", []):
+            plausibility_rules.setdefault(biomarker, []).append(rule)
+
+        return cls(
+            payload["alias_map"],
+            {
+                (biomarker, unit_from): {"unit_to": unit_to, "factor": factor, "offset": offset}
+                for biomarker, unit_from, unit_to, factor, offset in payload["conversion_rules"]
+            },
+            payload["bucket_to_dominant"],
+            payload["all_expected_biomarkers"],
+            version=payload.get("version"),
+            plausibility_rules=plausibility_rules
+        )
+
+
+class SnapshotCache:
+    """
+    Per-snapshot derived structures (compiled indexes, resolvers) for the
+    most recent `size` snapshots, keyed by snapshot identity. Keeping more
+    than one lets samples pinned to the previous snapshot finish without
+    forcing a rebuild while a new one is warmed or swapped in.
+    """
+
+    def __init__(self, build, size: int = 2):
+        self._build = build
+        self._size = size
+        self._lock = threading.Lock()
+        self._entries = ()              # ((snapshot, built), ...), newest first
+
+    def get(self, snapshot: RuleSnapshot):
+        for cached, built in self._entries:
+            if cached is snapshot:
+                return built
+
+        with self._lock:
+            for cached, built in self._entries:
+                if cached is snapshot:
+                    return built
+
+            built = self._build(snapshot)
+            self._entries = ((snapshot, built),) + self._entries[:self._size - 1]
+            return built
+
+
+class RuleStore:
+    """
+    Loads cis_biomarker_alias_map, cis_unit_conversion,
+    cis_biomarker_weightage_mapping and cis_biomarker_plausibility_range
+    in a single bootstrap and serves them as one immutable RuleSnapshot
+    shared by NameMapper, UnitConversionEngine and QCEngine.
+
+    cis_biomarker_plausibility_range is optional: databases without it
+    load no plausibility rules and their rules version is unchanged.
+    """
+
+    ALIAS_QUERY = """
+        SELECT alias_name, canonical_name
+        FROM cis_biomarker_alias_map
+        WHERE is_active = TRUE;
+    """
+
+    CONVERSION_QUERY = """
+        SELECT biomarker_name, unit_from, unit_to, factor, additive_offset
+        FROM cis_unit_conversion
+        WHERE is_active = TRUE;
+    """
+
+    WEIGHTAGE_QUERY = """
+        SELECT biomarker_name, bucket_name, role
+        FROM cis_biomarker_weightage_mapping;
+    """
+
+    PLAUSIBILITY_QUERY = """
+        SELECT biomarker_name, unit, sex, age_min, age_max, min_value, max_value
+        FROM cis_biomarker_plausibility_range
+        WHERE is_active = TRUE;
+    """
+
+    # Change fingerprint: md5 over the ordered row texts of each rule table.
+    # Content-based, so unlike xmin it survives xid wraparound and
+    # VACUUM FREEZE; rule tables are small, so the scan stays cheap.
+    RULES_VERSION_QUERY = """
+        SELECT
+            (SELECT coalesce(md5(string_agg(t::text, '|' ORDER BY t::text)), '')
+             FROM cis_biomarker_alias_map t)         AS alias_version,
+            (SELECT coalesce(md5(string_agg(t::text, '|' ORDER BY t::text)), '')
+             FROM cis_unit_conversion t)             AS conversion_version,
+            (SELECT coalesce(md5(string_agg(t::text, '|' ORDER BY t::text)), '')
+             FROM cis_biomarker_weightage_mapping t) AS weightage_version,
+            to_regclass('cis_biomarker_plausibility_range') IS NOT NULL AS plausibility_enabled;
+    """
+
+    # optional table: only queried when RULES_VERSION_QUERY found it
+    PLAUSIBILITY_VERSION_QUERY = """
+        SELECT coalesce(md5(string_agg(t::text, '|' ORDER BY t::text)), '') AS plausibility_version
+        FROM cis_biomarker_plausibility_range t;
+    """
+
+    # polled by every refresh check: parsed once per pooled connection
+    RULES_VERSION_STATEMENT = PreparedStatement("cis_rules_version", RULES_VERSION_QUERY)
+    PLAUSIBILITY_VERSION_STATEMENT = PreparedStatement("cis_plausibility_version", PLAUSIBILITY_VERSION_QUERY)
+
+    def __init__(self, config, snapshot: RuleSnapshot | None = None):
+        """
+        snapshot: reuse an already-built snapshot (e.g. inside worker
+        processes) instead of bootstrapping from the database.
+
+        Config keys (optional):
+            RULE_SNAPSHOT_PATH              compiled rule snapshot file; used when its
+                                            rules version matches the database, rebuilt
+                                            from the database otherwise
+            RULES_REFRESH_INTERVAL_SECONDS  minimum seconds between rules-version
+                                            polls (default 60; 0 disables refresh)
+        """
+        self.config = config
+        self.refresh_interval = float(config.get("RULES_REFRESH_INTERVAL_SECONDS", 60) or 0)
+
+        self._pinned = contextvars.ContextVar(f"pinned_rules_{id(self)}", default=None)
+        self._refresh_lock = threading.Lock()
+        self._last_refresh_check = time.monotonic()
+        self._warmers = []
+        self._poller = None
+        self._poller_stop = threading.Event()
+
+        self._snapshot = snapshot if snapshot is not None else self._load()
+
+    @classmethod
+    def from_snapshot_file(cls, config, path: str) -> "RuleStore":
+        """
+        Offline store over a compiled snapshot file: no database access,
+        refresh disabled (e.g. dry-run replays of candidate rules).
+        """
+        snapshot = RuleSnapshot.from_payload(rule_snapshot_file.read(path))
+        metrics.incr("rule_snapshot_loads", source="file")
+        logger.info("rule store loaded offline from snapshot file", path=path, version=snapshot.version)
+
+        store = cls(config, snapshot=snapshot)
+        store.refresh_interval = 0
+        return store
+
+    @property
+    def snapshot(self) -> RuleSnapshot:
+        """The snapshot pinned in this context, else the current one."""
+        pinned = self._pinned.get()
+        return pinned if pinned is not None else self._snapshot
+
+    @contextmanager
+    def pinned(self):
+        """
+        Pin the current snapshot for the calling thread/context, so every
+        engine sees one consistent rules version even if a refresh swaps
+        the snapshot meanwhile. Nested pins keep the outer snapshot.
+        """
+        token = self._pinned.set(self.snapshot)
+        try:
+            yield self._pinned.get()
+        finally:
+            self._pinned.reset(token)
+
+    # ----------------------------------------------------------------------
+    # Hot reload: version poll → background build → atomic swap
+    # ----------------------------------------------------------------------
+    def add_warmer(self, warm):
+        """
+        Register warm(snapshot), called with every new snapshot before it
+        is swapped in, so engines precompile their indexes off the hot path.
+        """
+        self._warmers.append(warm)
+
+    def refresh(self) -> bool:
+        """
+        Reload if the database rules version differs from the current
+        snapshot. Returns True if a new snapshot was swapped in.
+        On any error the current snapshot stays in service.
+        """
+        with self._refresh_lock:
+            self._last_refresh_check = time.monotonic()
+            current = self._snapshot
+
+            try:
+                db_version = self.fetch_rules_version()
+                if db_version == current.version:
+                    return False
+
+                snapshot = self._load()
+                for warm in self._warmers:
+                    warm(snapshot)
+
+            except Exception as e:
+                metrics.incr("rule_refreshes", result="error")
+                logger.error("rule refresh failed, keeping current rules",
+                             version=current.version, error=str(e))
+                return False
+
+            # single reference assignment: readers see old or new, never a mix
+            self._snapshot = snapshot
+            metrics.incr("rule_refreshes", result="swapped")
+            logger.info("rule snapshot swapped", old_version=current.version, new_version=snapshot.version)
+            return True
+
+    def refresh_if_due(self) -> bool:
+        """refresh() at most once per RULES_REFRESH_INTERVAL_SECONDS."""
+        if not self.refresh_interval or time.monotonic() - self._last_refresh_check < self.refresh_interval:
+            return False
+        return self.refresh()
+
+    def start_refresh_poller(self):
+        """Poll for rule changes from a daemon thread (long-running workers)."""
+        if not self.refresh_interval or self._poller is not None:
+            return
+
+        def poll():
+            while not self._poller_stop.wait(self.refresh_interval):
+                self.refresh()
+
+        self._poller_stop.clear()
+        self._poller = threading.Thread(target=poll, name="rule-refresh", daemon=True)
+        self._poller.start()
+        logger.info("rule refresh poller started", interval_seconds=self.refresh_interval)
+
+    def stop_refresh_poller(self):
+        if self._poller is not None:
+            self._poller_stop.set()
+            self._poller.join()
+            self._poller = None
+
+    # ----------------------------------------------------------------------
+    # Bootstrap: snapshot file if current, else one connection for all tables
+    # ----------------------------------------------------------------------
+    def _load(self) -> RuleSnapshot:
+        snapshot_path = self.config.get("RULE_SNAPSHOT_PATH")
+
+        if snapshot_path:
+            db_version = self.fetch_rules_version()
+            file_version = rule_snapshot_file.peek_version(snapshot_path)
+
+            if file_version is not None and file_version == db_version:
+                try:
+                    snapshot = RuleSnapshot.from_payload(rule_snapshot_file.read(snapshot_path))
+                    metrics.incr("rule_snapshot_loads", source="file")
+                    logger.info("rule store loaded from snapshot file", path=snapshot_path, version=db_version)
+                    return snapshot
+                except ValueError as e:
+                    logger.warning("rule snapshot file unreadable", path=snapshot_path, error=str(e))
+
+            logger.info("rule snapshot file stale or missing, rebuilding",
+                        path=snapshot_path, file_version=file_version, db_version=db_version)
+
+        with metrics.timer("rule_load"):
+            snapshot = self.load_from_db()
+        metrics.incr("rule_snapshot_loads", source="db")
+
+        if snapshot_path:
+            # best effort: the file only speeds up the next start
+            try:
+                rule_snapshot_file.write(snapshot_path, snapshot.to_payload())
+            except OSError as e:
+                logger.warning("rule snapshot file not written", path=snapshot_path, error=str(e))
+
+        return snapshot
+
+    def load_from_db(self) -> RuleSnapshot:
+        with db_connection(self.config) as conn:
+            with conn.cursor(cursor_factory=CountingRealDictCursor) as cur:
+                # version first, so the snapshot is never newer than its stamp
+                version, plausibility_enabled = self._fetch_version(cur)
+
+                cur.execute(self.ALIAS_QUERY)
+                alias_rows = cur.fetchall()
+
+                cur.execute(self.CONVERSION_QUERY)
+                conversion_rows = cur.fetchall()
+
+                cur.execute(self.WEIGHTAGE_QUERY)
+                weightage_rows = cur.fetchall()
+
+                plausibility_rows = []
+                if plausibility_enabled:
+                    cur.execute(self.PLAUSIBILITY_QUERY)
+                    plausibility_rows = cur.fetchall()
+
+        snapshot = self.build_snapshot(alias_rows, conversion_rows, weightage_rows, version, plausibility_rows)
+
+        logger.info(
+            "rule store loaded",
+            version=version,
+            aliases=len(snapshot.alias_map),
+            conversion_rules=len(snapshot.conversion_map),
+            buckets=len(snapshot.bucket_to_dominant),
+            expected_biomarkers=len(snapshot.all_expected_biomarkers),
+            plausibility_biomarkers=len(snapshot.plausibility_rules)
+        )
+        return snapshot
+
+    def fetch_rules_version(self) -> str:
+        """One cheap query returning the current rules version fingerprint."""
+        with db_connection(self.config) as conn:
+            with conn.cursor(cursor_factory=CountingRealDictCursor) as cur:
+                version, _ = self._fetch_version(cur)
+                return version
+
+    def _fetch_version(self, cur) -> tuple:
+        """(rules version, whether cis_biomarker_plausibility_range exists)."""
+        execute_prepared(cur, self.RULES_VERSION_STATEMENT)
+        row = dict(cur.fetchone())
+
+        enabled = bool(row.pop("plausibility_enabled"))
+        if enabled:
+            execute_prepared(cur, self.PLAUSIBILITY_VERSION_STATEMENT)
+            row.update(cur.fetchone())
+
+        return self._version_from_row(row), enabled
+
+    @staticmethod
+    def _version_from_row(row) -> str:
+        parts = [
+            row["alias_version"],
+            row["conversion_version"],
+            row["weightage_version"],
+        ]
+        # absent table: same fingerprint as before the table existed
+        if row.get("plausibility_version") is not None:
+            parts.append(row["plausibility_version"])
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def build_snapshot(alias_rows, conversion_rows, weightage_rows, version=None, plausibility_rows=()) -> RuleSnapshot:
+        """
+        Build the hashed indexes from raw table rows.
+        """
+        alias_map = {}
+        for row in alias_rows:
+            # first active alias wins, matching the previous LIMIT 1 lookup
+            alias_map.setdefault(normalize_key(row["alias_name"]), row["canonical_name"])
+
+        conversion_map = {}
+        for row in conversion_rows:
+            biomarker = normalize_key(row["biomarker_name"])
+            unit_from = normalize_unit(row["unit_from"])
+
+            conversion_map[(biomarker, unit_from)] = {
+                "unit_to": row["unit_to"],
+                "factor": float(row["factor"]),
+                "offset": float(row["additive_offset"])
+            }
+
+        # every reachable unit, composed once here: one lookup at conversion time
+        conversion_map = build_conversion_closure(conversion_map)
+
+        bucket_to_dominant = {}
+        all_expected = set()
+        for row in weightage_rows:
+            biomarker = row["biomarker_name"]
+            all_expected.add(biomarker)
+
+            if row["role"] == "Dominant":
+                bucket_to_dominant.setdefault(row["bucket_name"], set()).add(biomarker)
+
+        plausibility_rules = {}
+        for row in plausibility_rows:
+            plausibility_rules.setdefault(normalize_key(row["biomarker_name"]), []).append((
+                normalize_unit(row["unit"]) if row["unit"] else None,
+                normalize_key(row["sex"]) if row["sex"] else None,
+                float(row["age_min"]) if row["age_min"] is not None else None,
+                float(row["age_max"]) if row["age_max"] is not None else None,
+                float(row["min_value"]) if row["min_value"] is not None else None,
+                float(row["max_value"]) if row["max_value"] is not None else None,
+            ))
+
+        return RuleSnapshot(
+            alias_map, conversion_map, bucket_to_dominant, all_expected,
+            version, plausibility_rules
+        )
+
+    # ----------------------------------------------------------------------
+    # Alias lookups (no network access)
+    # ----------------------------------------------------------------------
+    def map_name(self, raw_name: str) -> str | None:
+        return self.snapshot.alias_map.get(normalize_key(raw_name))
+
+    def map_names(self, raw_names: list, review: dict | None = None) -> dict:
+        """
+        Batch alias resolution (exact only, so `review` is never filled;
+        accepted for NameMapper compatibility).
+        Returns {raw_name: canonical_name or None} in input order.
+        """
+        alias_map = self.snapshot.alias_map
+        return {raw_name: alias_map.get(normalize_key(raw_name)) for raw_name in raw_names}
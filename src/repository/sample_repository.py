@@ -1,63 +1,208 @@
 # src/repository/sample_repository.py
 
 import json
+from psycopg2.extras import execute_values
 from src.utils.unit_utils import db_connection
+from src.utils.prepared_statements import PreparedStatement, execute_prepared
+from src.utils.content_hash import envelope_content_hash
+from src.schemas.biomarker_record import envelope_to_dict
+from src.repository.biomarker_value_sink import BiomarkerValueSink
+from src.utils.metrics import metrics
 from src.logger.logging_config import logger
+from src.config.flags import config_flag
 
 
 class SampleRepository:
 
+    # Unchanged rows (same content and input fingerprint) are left untouched:
+    # no new tuple version, no WAL, no index churn
+    UPSERT_CONFLICT_CLAUSE = """
+        ON CONFLICT (sample_id) DO UPDATE SET
+            trace_id           = EXCLUDED.trace_id,
+            structured_payload = EXCLUDED.structured_payload,
+            qc_overall_status  = EXCLUDED.qc_overall_status,
+            version            = EXCLUDED.version,
+            content_hash       = EXCLUDED.content_hash,
+            input_hash         = EXCLUDED.input_hash,
+            rules_version      = EXCLUDED.rules_version
+        WHERE structured_biomarker_samples.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+           OR structured_biomarker_samples.input_hash   IS DISTINCT FROM EXCLUDED.input_hash
+    """
+
+    UPSERT_QUERY = """
+        INSERT INTO structured_biomarker_samples
+        (
+            sample_id, user_id, trace_id,
+            structured_payload, version, qc_overall_status,
+            content_hash, input_hash, rules_version
+        )
+        VALUES (%s, %s, %s, %s::jsonb, %s, %s, %s, %s, %s)
+    """ + UPSERT_CONFLICT_CLAUSE + ";"
+
+    BULK_UPSERT_QUERY = """
+        INSERT INTO structured_biomarker_samples
+        (
+            sample_id, user_id, trace_id,
+            structured_payload, version, qc_overall_status,
+            content_hash, input_hash, rules_version
+        )
+        VALUES %s
+    """ + UPSERT_CONFLICT_CLAUSE + """
+        RETURNING sample_id, (xmax = 0) AS inserted;
+    """
+
+    BULK_UPSERT_TEMPLATE = "(%s, %s, %s, %s::jsonb, %s, %s, %s, %s, %s)"
+
+    INPUT_HASH_QUERY = """
+        SELECT sample_id, input_hash
+        FROM structured_biomarker_samples
+        WHERE sample_id = ANY(%s);
+    """
+
+    # per-sample hot path: parsed once per pooled connection
+    UPSERT_STATEMENT = PreparedStatement("cis_upsert_sample", UPSERT_QUERY)
+    INPUT_HASH_STATEMENT = PreparedStatement("cis_input_hashes", INPUT_HASH_QUERY)
+
     def __init__(self, config):
+        """
+        Config keys (optional):
+            DB_WRITE_BATCH_SIZE      samples per upsert transaction (default 100)
+            BIOMARKER_VALUES_ENABLED also COPY typed per-biomarker rows into
+                                     structured_biomarker_values, in the same
+                                     transaction (default False)
+        """
         self.config = config
-        self.conn = db_connection(config)
+        self.batch_size = int(config.get("DB_WRITE_BATCH_SIZE", 100))
+        self.value_sink = BiomarkerValueSink() if config_flag(config, "BIOMARKER_VALUES_ENABLED") else None
+
+    @staticmethod
+    def _row(sample: dict) -> tuple:
+        sample = envelope_to_dict(sample)
+        return (
+            sample['sample_id'],
+            sample['user_id'],
+            sample['trace_id'],
+            json.dumps(sample),
+            'v1.0',
+            sample['qc_summary']['overall_status'],
+            envelope_content_hash(sample),
+            sample.get('input_hash'),
+            sample.get('rules_version')
+        )
+
+    # ----------------------------------------------------------------------
+    # Idempotency: stored input fingerprints
+    # ----------------------------------------------------------------------
+    def get_input_hashes(self, sample_ids: list) -> dict:
+        """
+        Returns {sample_id: input_hash} for the already stored samples.
+        """
+        if not sample_ids:
+            return {}
+
+        with metrics.timer("idempotency_lookup"):
+            with db_connection(self.config) as conn:
+                with conn.cursor() as cur:
+                    execute_prepared(cur, self.INPUT_HASH_STATEMENT, (list(sample_ids),))
+                    return dict(cur.fetchall())
 
     def save_structured_sample(self, sample: dict):
         """
         Inserts the final structured CIS envelope into structured_biomarker_samples.
+        An identical envelope already stored is left untouched.
         """
+        sample = envelope_to_dict(sample)
         sample_id = sample['sample_id']
         user_id = sample['user_id']
-        trace_id = sample['trace_id']
         qc_overall_status = sample['qc_summary']['overall_status']
-        version = 'v1.0'
-
-        query = """
-            INSERT INTO structured_biomarker_samples 
-            (
-                sample_id, user_id, trace_id,
-                structured_payload, version, qc_overall_status
-            )
-            VALUES (%s, %s, %s, %s::jsonb, %s, %s)
-            ON CONFLICT (sample_id) DO UPDATE SET
-                structured_payload = EXCLUDED.structured_payload,
-                qc_overall_status  = EXCLUDED.qc_overall_status,
-                version            = EXCLUDED.version;
-        """
 
         try:
-            with self.conn.cursor() as cur:
-                cur.execute(
-                    query,
-                    (
-                        sample_id,
-                        user_id,
-                        trace_id,
-                        json.dumps(sample),
-                        version,
-                        qc_overall_status
-                    )
-                )
-            self.conn.commit()
+            # borrowed connection commits on exit, rolls back on error
+            with metrics.timer("db_upsert"):
+                with db_connection(self.config) as conn:
+                    with conn.cursor() as cur:
+                        execute_prepared(cur, self.UPSERT_STATEMENT, self._row(sample))
+                        written = cur.rowcount
+                        if written and self.value_sink is not None:
+                            self.value_sink.write(cur, [sample])
 
-            logger.info(
-                "structured sample stored successfully",
-                sample_id=sample_id,
-                user_id=user_id,
-                status=qc_overall_status
-            )
+            metrics.incr("samples_stored", result="written" if written else "unchanged")
+
+            if written:
+                logger.info(
+                    "structured sample stored successfully",
+                    sample_id=sample_id,
+                    user_id=user_id,
+                    status=qc_overall_status
+                )
+            else:
+                logger.info("structured sample unchanged, write skipped", sample_id=sample_id)
             return True
 
         except Exception as e:
-            self.conn.rollback()
             logger.error("failed to save structured sample", error=str(e))
             raise
+
+    # ----------------------------------------------------------------------
+    # Bulk upsert: one multi-row statement and one transaction per batch
+    # ----------------------------------------------------------------------
+    def save_structured_samples(self, batch: list) -> dict:
+        """
+        Upserts many structured CIS envelopes.
+        Samples are written in chunks of DB_WRITE_BATCH_SIZE, each chunk as a
+        single multi-row INSERT ... ON CONFLICT inside its own transaction.
+
+        Returns:
+            {"inserted": [sample_id, ...], "updated": [sample_id, ...],
+             "unchanged": [sample_id, ...]}
+        """
+        report = {"inserted": [], "updated": [], "unchanged": []}
+
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+
+            # a single statement cannot touch the same row twice → last one wins
+            rows, samples = {}, {}
+            for sample in map(envelope_to_dict, chunk):
+                rows[sample['sample_id']] = self._row(sample)
+                samples[sample['sample_id']] = sample
+
+            try:
+                with metrics.timer("db_upsert_batch"):
+                    with db_connection(self.config) as conn:
+                        with conn.cursor() as cur:
+                            results = execute_values(
+                                cur,
+                                self.BULK_UPSERT_QUERY,
+                                list(rows.values()),
+                                template=self.BULK_UPSERT_TEMPLATE,
+                                page_size=len(rows),
+                                fetch=True
+                            )
+                            if self.value_sink is not None:
+                                self.value_sink.write(cur, [samples[sample_id] for sample_id, _ in results])
+
+            except Exception as e:
+                logger.error("failed to save structured sample batch", error=str(e), batch_size=len(rows))
+                raise
+
+            # rows skipped by the conflict WHERE clause are not returned
+            written = set()
+            for sample_id, inserted in results:
+                report["inserted" if inserted else "updated"].append(sample_id)
+                written.add(sample_id)
+
+            unchanged = [sample_id for sample_id in rows if sample_id not in written]
+            report["unchanged"].extend(unchanged)
+            metrics.incr("samples_stored", len(written), result="written")
+            metrics.incr("samples_stored", len(unchanged), result="unchanged")
+
+            logger.info(
+                "structured sample batch stored successfully",
+                batch_size=len(rows),
+                inserted=sum(1 for _, inserted in results if inserted),
+                updated=sum(1 for _, inserted in results if not inserted),
+                unchanged=len(unchanged)
+            )
+
+        return report
@@ -0,0 +1,67 @@
+# src/schemas/biomarker_record.py
+
+
+class BiomarkerRecord:
+    """
+    One biomarker as it moves through canonicalization → conversion → QC.
+
+    A single __slots__ object per biomarker, updated in place by every
+    step instead of a fresh dict per step. normalized_value /
+    normalized_unit start as the raw reading (the no-conversion case) and
+    are overwritten only when a conversion rule applies; qc_check is set
+    by QC.
+
+    Records are internal: sinks convert them with to_dict() /
+    envelope_to_dict() at the persistence boundary.
+    """
+
+    __slots__ = (
+        "canonical_name",
+        "raw_value",
+        "raw_unit",
+        "is_range",
+        "comment",
+        "normalized_value",
+        "normalized_unit",
+        "qc_check",
+    )
+
+    def __init__(self, canonical_name: str, raw_value, raw_unit: str, is_range: bool, comment: str = ""):
+        self.canonical_name = canonical_name
+        self.raw_value = raw_value
+        self.raw_unit = raw_unit
+        self.is_range = is_range
+        self.comment = comment
+        self.normalized_value = raw_value
+        self.normalized_unit = raw_unit
+        self.qc_check = None
+
+    def to_dict(self) -> dict:
+        """Envelope form of a normalized biomarker."""
+        result = {
+            "canonical_name": self.canonical_name,
+            "normalized_value": self.normalized_value,
+            "normalized_unit": self.normalized_unit,
+            "is_range": self.is_range,
+            "comment": self.comment,
+        }
+        if self.qc_check is not None:
+            result["qc_check"] = self.qc_check
+        return result
+
+    def __repr__(self):
+        return f"BiomarkerRecord({self.to_dict()!r})"
+
+
+def envelope_to_dict(sample: dict) -> dict:
+    """
+    JSON-ready copy of a structured envelope: records become dicts,
+    everything else is shared. Envelopes that are already plain pass through.
+    """
+    return {
+        **sample,
+        "biomarkers": [
+            biomarker.to_dict() if isinstance(biomarker, BiomarkerRecord) else biomarker
+            for biomarker in sample["biomarkers"]
+        ],
+    }
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, field_validator, model_validator
-from typing import Dict, Any, Optional, Union
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
+from typing import Dict, Any, List, Optional, Union
 
 
 class BiomarkerValueSchema(BaseModel):
@@ -8,18 +8,20 @@ class BiomarkerValueSchema(BaseModel):
     is_range: bool
     comment: Optional[str] = ""
 
-    @field_validator("raw_value")
-    def validate_raw_value(cls, v, info):
-        is_range = info.data.get("is_range", False)
+    # runs after all fields: is_range is declared after raw_value, so a
+    # field validator on raw_value would never see it
+    @model_validator(mode="after")
+    def validate_raw_value(self):
+        v = self.raw_value
 
-        if is_range:
+        if self.is_range:
             if not isinstance(v, dict) or "min" not in v or "max" not in v:
                 raise ValueError("Range biomarkers require raw_value={min,max}")
         else:
             if not isinstance(v, (int, float)):
                 raise ValueError("raw_value must be numeric when is_range=false")
 
-        return v
+        return self
 
 
 class RawInputSchema(BaseModel):
@@ -36,4 +38,31 @@ class RawInputSchema(BaseModel):
             data["trace_id"] = None   # always override
         return data
 
-    model_config = {"extra": "ignore"}
\ No newline at end of file
+    model_config = {"extra": "ignore"}
+
+
+# Built once: schema compilation is the expensive part of a TypeAdapter
+RawInputBatchAdapter = TypeAdapter(List[RawInputSchema])
+
+
+def validate_raw_input(raw) -> RawInputSchema:
+    """
+    Validate one raw sample without intermediate copies:
+    bytes/str are parsed and validated in a single pydantic-core pass,
+    dicts are validated directly, models are passed through.
+    """
+    if isinstance(raw, RawInputSchema):
+        return raw
+    if isinstance(raw, (bytes, bytearray, memoryview, str)):
+        return RawInputSchema.model_validate_json(raw)
+    return RawInputSchema.model_validate(raw)
+
+
+def validate_raw_batch(raw) -> List[RawInputSchema]:
+    """
+    Validate many samples in one call through the cached batch adapter:
+    a JSON array (bytes/str) or a list of dicts.
+    """
+    if isinstance(raw, (bytes, bytearray, memoryview, str)):
+        return RawInputBatchAdapter.validate_json(raw)
+    return RawInputBatchAdapter.validate_python(raw)
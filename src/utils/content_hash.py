@@ -0,0 +1,45 @@
+# src/utils/content_hash.py
+
+import json
+import hashlib
+
+# Provenance fields that differ between runs of identical content
+VOLATILE_ENVELOPE_FIELDS = ("trace_id", "input_hash")
+
+
+def canonical_json(obj) -> bytes:
+    """
+    Deterministic serialization: sorted keys, no whitespace, UTF-8.
+    Equal content always yields identical bytes.
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def content_hash(obj) -> str:
+    return hashlib.sha256(canonical_json(obj)).hexdigest()
+
+
+def envelope_content_hash(envelope: dict) -> str:
+    """Hash of the structured envelope, ignoring per-run provenance fields."""
+    return content_hash({
+        key: value for key, value in envelope.items()
+        if key not in VOLATILE_ENVELOPE_FIELDS
+    })
+
+
+def input_fingerprint(raw, rules_version: str | None) -> str:
+    """
+    Fingerprint of a raw input under a given rules version.
+    Raw bytes are hashed as-is (no parse); dicts are hashed canonically.
+    The same input under the same rules always produces the same envelope,
+    so a matching fingerprint means the sample can be skipped.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    if not isinstance(raw, (bytes, bytearray, memoryview)):
+        raw = canonical_json(raw)
+
+    digest = hashlib.sha256(raw)
+    digest.update(b"|rules:")
+    digest.update((rules_version or "").encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,253 @@
+# src/utils/db_pool.py
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import OperationalError, InterfaceError
+from psycopg2.extensions import connection, cursor, TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extras import RealDictCursor
+from src.utils.metrics import metrics
+from src.logger.logging_config import logger
+from src.config.flags import config_flag
+
+
+class _RoundTripCounter:
+    """Counts every statement sent to the server (db_round_trips metric)."""
+
+    def execute(self, query, vars=None):
+        metrics.incr("db_round_trips")
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        metrics.incr("db_round_trips")
+        return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        metrics.incr("db_round_trips")
+        return super().copy_expert(sql, file, size)
+
+
+class CountingCursor(_RoundTripCounter, cursor):
+    pass
+
+
+class CountingRealDictCursor(_RoundTripCounter, RealDictCursor):
+    pass
+
+
+class PreparingConnection(connection):
+    """
+    Connection carrying the names of the statements PREPAREd on its
+    session (see execute_prepared). Pooled connections live across
+    checkouts, so each hot statement is prepared once per connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe PostgreSQL connection pool shared by every component.
+
+    Config keys (all optional):
+        DB_POOL_MIN_SIZE              connections opened up front (default 1)
+        DB_POOL_MAX_SIZE              hard cap on open connections (default 5)
+        DB_POOL_TIMEOUT               seconds to wait for a free connection (default 30)
+        DB_POOL_HEALTH_CHECK_INTERVAL idle seconds after which a checkout runs SELECT 1 (default 5)
+        DB_CONNECT_RETRIES            reconnect attempts on failure (default 2)
+        DB_CONNECT_TIMEOUT            libpq connect timeout (default 5)
+        DB_SSLMODE                    libpq sslmode (default "require")
+        DB_PREPARED_STATEMENTS        prepare hot statements once per connection
+                                      (default True; turn off behind a
+                                      transaction-mode pooler such as PgBouncer,
+                                      where sessions are not kept per client)
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.min_size = int(config.get("DB_POOL_MIN_SIZE", 1))
+        self.max_size = max(int(config.get("DB_POOL_MAX_SIZE", 5)), self.min_size, 1)
+        self.checkout_timeout = float(config.get("DB_POOL_TIMEOUT", 30))
+        self.health_check_interval = float(config.get("DB_POOL_HEALTH_CHECK_INTERVAL", 5))
+        self.connect_retries = int(config.get("DB_CONNECT_RETRIES", 2))
+        self.prepared_statements = config_flag(config, "DB_PREPARED_STATEMENTS", True)
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._idle = deque()            # (conn, released_at), most recent on the right
+        self._closed = False
+
+        for _ in range(self.min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+
+        logger.info("db connection pool created", min_size=self.min_size, max_size=self.max_size)
+
+    # ----------------------------------------------------------------------
+    # Public API
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for one unit of work.
+        Commits on clean exit, rolls back on error, and always returns
+        the connection (or discards it if it is broken).
+        """
+        if self._closed:
+            raise RuntimeError("Database connection pool is closed")
+
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise RuntimeError(
+                f"Database connection pool exhausted (max_size={self.max_size}, "
+                f"waited {self.checkout_timeout}s)"
+            )
+
+        conn = None
+        broken = False
+        try:
+            conn = self._checkout()
+            yield conn
+            if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                metrics.incr("db_round_trips")
+            conn.commit()
+
+        except (OperationalError, InterfaceError):
+            broken = True
+            raise
+
+        except Exception:
+            if conn is not None and not conn.closed:
+                try:
+                    conn.rollback()
+                except (OperationalError, InterfaceError):
+                    broken = True
+            raise
+
+        finally:
+            if conn is not None:
+                self._release(conn, broken)
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection; borrowed ones are closed on return."""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+
+        for conn, _ in idle:
+            self._discard(conn)
+
+    # ----------------------------------------------------------------------
+    # Internals
+    # ----------------------------------------------------------------------
+    def _connect(self):
+        try:
+            return psycopg2.connect(
+                host=self.config["RDS_HOST"],
+                port=self.config["RDS_PORT"],
+                dbname=self.config["RDS_DB"],
+                user=self.config["RDS_USER"],
+                password=self.config["RDS_PASSWORD"],
+                connect_timeout=int(self.config.get("DB_CONNECT_TIMEOUT", 5)),   # prevent long hangs
+                sslmode=self.config.get("DB_SSLMODE", "require"),                # RDS best practice
+                cursor_factory=CountingCursor,
+                connection_factory=PreparingConnection if self.prepared_statements else connection
+            )
+
+        except OperationalError as e:
+            raise RuntimeError(f"Database connection failed: {str(e)}")
+
+    def _connect_with_retry(self):
+        attempt = 0
+        while True:
+            try:
+                return self._connect()
+            except RuntimeError as e:
+                if attempt >= self.connect_retries:
+                    raise
+                attempt += 1
+                logger.warning("db connect failed, retrying", attempt=attempt, error=str(e))
+                time.sleep(0.2 * attempt)
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+
+            if entry is None:
+                return self._connect_with_retry()
+
+            conn, released_at = entry
+            if self._is_healthy(conn, time.monotonic() - released_at):
+                return conn
+
+            logger.warning("discarding unhealthy pooled connection")
+            self._discard(conn)
+
+    def _is_healthy(self, conn, idle_seconds: float) -> bool:
+        if conn.closed:
+            return False
+
+        if idle_seconds < self.health_check_interval:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+
+        except (OperationalError, InterfaceError):
+            return False
+
+    def _release(self, conn, broken: bool):
+        if self._closed or broken or conn.closed \
+                or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+            self._discard(conn)
+            return
+
+        if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+# ----------------------------------------------------------------------
+# Process-wide registry: one pool per database target
+# ----------------------------------------------------------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(config) -> ConnectionPool:
+    """Return the shared pool for the configured database, creating it once."""
+    key = (config["RDS_HOST"], config["RDS_PORT"], config["RDS_DB"], config["RDS_USER"])
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(config)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
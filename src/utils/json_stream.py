@@ -0,0 +1,155 @@
+# src/utils/json_stream.py
+
+import json
+import codecs
+
+_WHITESPACE = " \t\r\n"
+
+
+class MalformedLine(json.JSONDecodeError):
+    """
+    Yielded by iter_json_documents() in place of an NDJSON line that does
+    not parse, so the valid lines around it are still ingested.
+    """
+
+
+class _StreamPosition:
+    """Line / column / char offset of the start of the parse buffer in the whole stream."""
+
+    __slots__ = ("char", "line", "column")
+
+    def __init__(self):
+        self.char, self.line, self.column = 0, 1, 1
+
+    def advance(self, buffer: str, end: int):
+        """buffer[:end] is being dropped."""
+        newlines = buffer.count("\n", 0, end)
+        if newlines:
+            self.line += newlines
+            self.column = end - buffer.rindex("\n", 0, end)
+        else:
+            self.column += end
+        self.char += end
+
+    def error(self, msg: str, buffer: str, pos: int, cls=json.JSONDecodeError) -> json.JSONDecodeError:
+        """JSONDecodeError (or `cls`) for buffer[pos], positioned in the whole stream."""
+        error = cls(msg, buffer, pos)
+        if buffer.count("\n", 0, pos):
+            error.colno = pos - buffer.rindex("\n", 0, pos)
+        else:
+            error.colno = self.column + pos
+        error.lineno = self.line + buffer.count("\n", 0, pos)
+        error.pos = self.char + pos
+        error.args = (f"{msg}: line {error.lineno} column {error.colno} (char {error.pos})",)
+        return error
+
+
+def iter_json_documents(chunks, max_document_bytes: int = 16 * 1024 * 1024):
+    """
+    Incrementally parse a byte stream into JSON objects, one at a time.
+
+    Accepts, without reading the whole stream into memory:
+        - a single JSON object (pretty-printed or not)
+        - NDJSON / JSON Lines (one object per line)
+        - concatenated objects separated by whitespace
+        - a top-level JSON array of objects
+
+    chunks: iterable of bytes (e.g. StreamingBody.iter_chunks())
+
+    A line of an NDJSON stream that does not parse is yielded as a
+    MalformedLine (with its line / column in the whole stream) and
+    parsing resumes on the next line. A stream is NDJSON once a document
+    fits on one line, or when the very first line is bad but followed by
+    more lines.
+
+    Anything else malformed or truncated (a single document, an array)
+    raises json.JSONDecodeError, positioned in the whole stream; a
+    document larger than max_document_bytes raises ValueError. A parse
+    error followed by a newline cannot be cured by more bytes, so it is
+    reported right away instead of buffering up to the limit.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    buffer = ""
+    position = _StreamPosition()
+    in_array = None         # None = not yet known, True = inside [...], False = plain stream
+    array_closed = False
+    ndjson = False          # plain stream seen to hold one document per line
+
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        pos = 0
+
+        while True:
+            # skip separators
+            while pos < len(buffer) and (buffer[pos] in _WHITESPACE or (in_array and buffer[pos] == ",")):
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            if array_closed:
+                raise position.error("Extra data after top-level array", buffer, pos)
+
+            if in_array is None:
+                in_array = buffer[pos] == "["
+                if in_array:
+                    pos += 1
+                    continue
+
+            if in_array and buffer[pos] == "]":
+                array_closed = True
+                pos += 1
+                continue
+
+            try:
+                document, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # a truncated document only fails on its last line: without
+                # a newline after the error position, wait for more bytes
+                if buffer.find("\n", e.pos) == -1:
+                    if len(buffer) - pos > max_document_bytes:
+                        raise ValueError(f"JSON document exceeds {max_document_bytes} bytes")
+                    break
+
+                # malformed input: one bad NDJSON line, or the whole object
+                line_end = buffer.find("\n", pos)
+                if in_array or not (ndjson or e.pos <= line_end):
+                    raise position.error(e.msg, buffer, e.pos) from None
+
+                # an unterminated line fails at the start of the next one
+                yield position.error(e.msg, buffer, min(e.pos, line_end), MalformedLine)
+                pos = line_end + 1
+                continue
+
+            # a trailing bare scalar could still be growing; objects cannot
+            if not isinstance(document, dict):
+                raise position.error("Expected a JSON object per sample", buffer, pos)
+
+            if not in_array and buffer.find("\n", pos, end) == -1:
+                ndjson = True
+
+            yield document
+            pos = end
+
+        position.advance(buffer, pos)
+        buffer = buffer[pos:]
+
+    buffer += text_decoder.decode(b"", final=True)
+    separators = _WHITESPACE + ("," if in_array else "")
+
+    if buffer.strip(separators):
+        start = len(buffer) - len(buffer.lstrip(separators))
+        try:
+            # surfaces the real parse error for the dangling fragment
+            decoder.raw_decode(buffer, start)
+        except json.JSONDecodeError as e:
+            if ndjson and not in_array:
+                # unterminated last line of an NDJSON stream
+                yield position.error(e.msg, buffer, e.pos, MalformedLine)
+                return
+            raise position.error(e.msg, buffer, e.pos) from None
+        raise position.error("Unexpected trailing data", buffer, start)
+
+    if in_array and not array_closed:
+        raise position.error("Unterminated top-level array", buffer, len(buffer))
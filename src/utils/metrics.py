@@ -0,0 +1,243 @@
+# src/utils/metrics.py
+
+import json
+import sys
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Latency buckets (ms), upper bounds; +Inf is implicit
+DEFAULT_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+METRIC_PREFIX = "cis_ingestion"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus semantics, non-cumulative storage)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum, 3),
+            "mean_ms": round(self.sum / self.count, 3) if self.count else None,
+            "min_ms": _round(self.min),
+            "max_ms": _round(self.max),
+            "p50_ms": _round(self.quantile(0.50)),
+            "p99_ms": _round(self.quantile(0.99)),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process counters and per-stage latency histograms.
+
+    - timer(stage) / observe(stage, ms): latency per pipeline stage
+    - incr(name, value, **labels): monotonically increasing counters
+    - snapshot(): plain dict, including derived ratios
+    - to_prometheus() / to_emf(): export formats, write() to a file
+
+    Thread-safe; each process has its own registry (in process mode the
+    worker processes' validation/normalization timings are not included).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._started_at = time.time()
+
+    # ----------------------------------------------------------------------
+    # Recording
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def timer(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - started) * 1000)
+
+    def observe(self, stage: str, value_ms: float):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(value_ms)
+
+    def incr(self, name: str, value: int = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+            self._started_at = time.time()
+
+    # ----------------------------------------------------------------------
+    # Snapshot API
+    # ----------------------------------------------------------------------
+    def counter(self, name: str, **labels) -> int:
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def _counter_total(self, name: str) -> int:
+        return sum(value for (counter, _), value in self._counters.items() if counter == name)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {stage: h.to_dict() for stage, h in sorted(self._histograms.items())}
+            counters = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                label = ",".join(f"{k}={v}" for k, v in labels)
+                counters[f"{name}{{{label}}}" if label else name] = value
+
+            samples = self._counter_total("samples_processed")
+            derived = {
+                "db_round_trips_per_sample": _ratio(self._counter_total("db_round_trips"), samples),
+                "s3_bytes_per_sample": _ratio(self._counter_total("s3_bytes_read"), samples),
+                "alias_hit_rate": _hit_rate(self._counters, "rule_alias_lookups"),
+                "conversion_rule_hit_rate": _hit_rate(self._counters, "rule_conversion_lookups"),
+                "rule_snapshot_file_hit_rate": _hit_rate(self._counters, "rule_snapshot_loads",
+                                                         hit="file", label="source"),
+            }
+
+            return {
+                "window_seconds": round(time.time() - self._started_at, 3),
+                "stages": stages,
+                "counters": counters,
+                "derived": derived,
+            }
+
+    # ----------------------------------------------------------------------
+    # Export formats
+    # ----------------------------------------------------------------------
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (e.g. for node_exporter textfile)."""
+        lines = []
+        with self._lock:
+            name = f"{METRIC_PREFIX}_stage_latency_ms"
+            lines.append(f"# TYPE {name} histogram")
+            for stage, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip([str(b) for b in h.buckets] + ["+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum:.3f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+
+            typed = set()
+            for (counter, labels), value in sorted(self._counters.items()):
+                metric = f"{METRIC_PREFIX}_{counter}_total"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                label = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{metric}{{{label}}} {value}" if label else f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def to_emf(self, namespace: str = "CISIngestion") -> dict:
+        """CloudWatch embedded metric format: one document, no dimensions."""
+        snapshot = self.snapshot()
+        document = {}
+        definitions = []
+
+        for stage, h in snapshot["stages"].items():
+            for stat in ("count", "mean_ms", "p99_ms", "max_ms"):
+                key = f"{stage}_{stat}"
+                document[key] = h[stat] or 0
+                definitions.append({"Name": key, "Unit": "Count" if stat == "count" else "Milliseconds"})
+
+        for counter, value in snapshot["counters"].items():
+            # rule_alias_lookups{result=hit} -> rule_alias_lookups.result_hit
+            key = counter.replace("{", ".").replace("}", "").replace("=", "_").replace(",", ".")
+            document[key] = value
+            definitions.append({"Name": key, "Unit": "Bytes" if "bytes" in counter else "Count"})
+
+        for ratio, value in snapshot["derived"].items():
+            if value is not None:
+                document[ratio] = value
+                definitions.append({"Name": ratio, "Unit": "None"})
+
+        document["_aws"] = {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": namespace,
+                "Dimensions": [[]],
+                "Metrics": definitions,
+            }],
+        }
+        return document
+
+    def write(self, path: str, fmt: str = "prometheus"):
+        """
+        fmt: "prometheus" (text) or "emf" (one JSON line).
+        path "-" writes to stdout, where Lambda picks EMF lines up.
+        """
+        if fmt == "emf":
+            text = json.dumps(self.to_emf()) + "\n"
+        elif fmt == "prometheus":
+            text = self.to_prometheus()
+        else:
+            raise ValueError(f"Unknown metrics format: {fmt}")
+
+        if path == "-":
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _round(value, digits: int = 3):
+    return round(value, digits) if value is not None else None
+
+
+def _ratio(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def _hit_rate(counters: dict, name: str, hit: str = "hit", label: str = "result"):
+    hits = total = 0
+    for (counter, labels), value in counters.items():
+        if counter != name:
+            continue
+        total += value
+        if dict(labels).get(label) == hit:
+            hits += value
+    return _ratio(hits, total)
+
+
+# process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,64 @@
+# src/utils/prepared_statements.py
+
+import re
+import threading
+from src.utils.metrics import metrics
+
+_PLACEHOLDER = re.compile(r"%s")
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class PreparedStatement:
+    """
+    A hot query, PREPAREd once per pooled connection and then run with
+    EXECUTE <name>, so Postgres parses and analyzes it only once per
+    session instead of on every call.
+
+    query keeps psycopg2 %s placeholders (it is also the plain fallback);
+    they become $1..$n in the PREPARE, parameter types are inferred by
+    the server. Names are process-wide and must be unique per query.
+    """
+
+    __slots__ = ("name", "query", "prepare_sql", "execute_sql")
+
+    def __init__(self, name: str, query: str):
+        with _registry_lock:
+            registered = _registry.setdefault(name, query)
+        if registered != query:
+            raise ValueError(f"prepared statement {name!r} already registered with another query")
+
+        arity = query.count("%s")
+        numbers = iter(range(1, arity + 1))
+
+        self.name = name
+        self.query = query
+        self.prepare_sql = f"PREPARE {name} AS " + _PLACEHOLDER.sub(lambda _: f"${next(numbers)}", query)
+        self.execute_sql = f"EXECUTE {name} ({', '.join(['%s'] * arity)})" if arity else f"EXECUTE {name}"
+
+    def __repr__(self):
+        return f"PreparedStatement({self.name!r})"
+
+
+def execute_prepared(cur, statement: PreparedStatement, vars=None):
+    """
+    Run `statement` on the cursor's connection, preparing it first if this
+    session has not seen it yet. Connections without a statement cache
+    (DB_PREPARED_STATEMENTS off, or not from the shared pool) run the
+    plain query instead.
+    """
+    prepared = getattr(cur.connection, "prepared_statements", None)
+    if prepared is None:
+        return cur.execute(statement.query, vars)
+
+    if statement.name not in prepared:
+        with metrics.timer("db_prepare"):
+            cur.execute(statement.prepare_sql)
+        # session-scoped: survives commit / rollback, gone with the connection
+        prepared.add(statement.name)
+        metrics.incr("db_prepared_statements", result="prepared")
+    else:
+        metrics.incr("db_prepared_statements", result="reused")
+
+    return cur.execute(statement.execute_sql, vars)
@@ -0,0 +1,73 @@
+# src/utils/s3_client.py
+
+import threading
+from src.logger.logging_config import logger
+
+
+# ----------------------------------------------------------------------
+# Process-wide registry: one tuned client per S3 target
+# ----------------------------------------------------------------------
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_s3_client(config):
+    """
+    Return the shared S3 client for the configured region/endpoint,
+    creating it once. boto3 clients are thread-safe; sharing one keeps
+    a single warm HTTP connection pool for every loader and worker thread.
+
+    Config keys (all optional):
+        S3_ENDPOINT_URL          alternative endpoint (MinIO, moto server, ...)
+        S3_MAX_POOL_CONNECTIONS  HTTP connection pool size (default
+                                 BATCH_FETCH_WORKERS * S3_RANGE_WORKERS, i.e.
+                                 64, so parallel range GETs never queue for
+                                 a connection)
+        S3_CONNECT_TIMEOUT       seconds (default 5)
+        S3_READ_TIMEOUT          seconds (default 60)
+        S3_MAX_ATTEMPTS          retry attempts, adaptive mode (default 5)
+    """
+    endpoint_url = config.get("S3_ENDPOINT_URL") or None
+    key = (config["REGION"], endpoint_url)
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _create_client(config, endpoint_url)
+            _clients[key] = client
+        return client
+
+
+def _create_client(config, endpoint_url):
+    import boto3    # deferred: keeps the import phase of cold starts small
+    from botocore.config import Config
+
+    max_pool_connections = int(
+        config.get("S3_MAX_POOL_CONNECTIONS")
+        # every fetch worker may run S3_RANGE_WORKERS ranged GETs at once
+        or int(config.get("BATCH_FETCH_WORKERS", 8)) * max(int(config.get("S3_RANGE_WORKERS", 8)), 1)
+    )
+
+    client = boto3.client(
+        "s3",
+        region_name=config["REGION"],
+        endpoint_url=endpoint_url,
+        config=Config(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=True,
+            connect_timeout=float(config.get("S3_CONNECT_TIMEOUT", 5)),
+            read_timeout=float(config.get("S3_READ_TIMEOUT", 60)),
+            retries={"max_attempts": int(config.get("S3_MAX_ATTEMPTS", 5)), "mode": "adaptive"},
+            # path-style addressing works with local endpoints without DNS tricks
+            s3={"addressing_style": "path"} if endpoint_url else None,
+        )
+    )
+
+    logger.info("s3 client created", region=config["REGION"], endpoint_url=endpoint_url,
+                max_pool_connections=max_pool_connections)
+    return client
+
+
+def reset_s3_clients():
+    with _clients_lock:
+        _clients.clear()